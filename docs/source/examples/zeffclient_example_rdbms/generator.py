@@ -2,17 +2,33 @@
 """Zeff record config generator for HousePrice records."""
 import logging
 import sqlite3
+import urllib.parse
 
 LOGGER = logging.getLogger("zeffclient.record.generator")
 
+# Rows fetched from the database in each round trip.
+ARRAYSIZE = 256
 
-def HousePriceRecordGenerator(arg: str):
-    """Return house primary key value."""
+
+def HousePriceRecordGenerator(arg: str, arraysize: int = None):
+    """Return house primary key value.
+
+    :param arg: Path of the database, optionally followed by
+        ``?arraysize=N`` (e.g. ``records_config_arg = db.sqlite3?arraysize=1024``).
+
+    :param arraysize: Number of rows to fetch at a time. The default is
+        the ``arraysize`` of ``arg`` or ``ARRAYSIZE``.
+    """
+    arg, _, query = arg.partition("?")
+    if arraysize is None:
+        params = urllib.parse.parse_qs(query)
+        arraysize = int(params.get("arraysize", [ARRAYSIZE])[0])
     LOGGER.debug("Open database connection to %s", arg)
     conn = sqlite3.connect(arg)
     conn.row_factory = sqlite3.Row
 
     cursor = conn.cursor()
+    cursor.arraysize = arraysize
     cursor.execute("SELECT id FROM properties")
     rows = cursor.fetchmany()
     while rows:
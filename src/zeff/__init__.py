@@ -30,6 +30,9 @@ Loggers
 - ``zeffclient.record.uploader``
     Logger used by the record upload subsystem.
 
+- ``zeffclient.record.pipeline``
+    Logger used by the threaded pipeline runtime.
+
 """
 __author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
 __copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
@@ -47,18 +50,56 @@ __license__ = """
     limitations under the License.
 """
 
-import pkg_resources
-
-try:
-    __version__ = pkg_resources.get_distribution("ZeffClient").version
-except pkg_resources.DistributionNotFound as err:
-    __version__ = "0.0.0"
-
+import importlib
 
-from .pipeline import Counter, record_builder_generator, validation_generator
+from .pipeline import Counter, shard_generator, prefetch
+from .pipeline import record_builder_generator, validation_generator
 from .pipeline_observation import *
+from .pipeline_events import *
+from .pipeline_runtime import *
 
 # pylint: disable=duplicate-code
 
-from .uploader import Uploader
-from .predictor import Predictor
+# Pipeline stages that talk to Zeff Cloud import ``requests`` and the
+# cloud modules, so they are imported on first use.
+LAZY_ATTRIBUTES = {
+    "Uploader": ".uploader",
+    "UploadIndex": ".uploadindex",
+    "Predictor": ".predictor",
+}
+
+
+def distribution_version() -> str:
+    """Return version of the installed ZeffClient distribution."""
+    # pylint: disable=import-outside-toplevel
+    try:
+        from importlib import metadata
+    except ImportError:  # Python 3.7
+        import importlib_metadata as metadata  # type: ignore
+    try:
+        return metadata.version("ZeffClient")
+    except metadata.PackageNotFoundError:
+        return "0.0.0"
+
+
+def __getattr__(name):
+    """Import a lazy attribute on first access.
+
+    ``__version__`` is also looked up on first access as reading
+    distribution metadata is slow.
+    """
+    if name == "__version__":
+        value = distribution_version()
+        globals()[name] = value
+        return value
+    module = LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """Return module attributes including lazy attributes."""
+    return sorted(set(globals()) | set(LAZY_ATTRIBUTES) | {"__version__"})
@@ -61,6 +61,27 @@ Sub-commands
     ``predict``
         Upload record to infer a prediction.
 
+    ``run``
+        Upload training records, start training when the last upload
+        is acknowledged, then predict with the trained model.
+
+    ``mock-server``
+        Run a local in-memory Zeff Cloud stand-in for testing.
+
+    ``serve``
+        Run a daemon on a local Unix socket that keeps configuration,
+        record builders, Zeff Cloud connections, and dataset and model
+        metadata warm between requests.
+
+
+Environment
+===========
+
+    ``ZEFF_SERVE_SOCKET``
+        Path to the Unix socket of a ``zeff serve`` daemon. When set,
+        ``upload`` and ``predict`` are forwarded to the daemon, and
+        run locally if no daemon is listening.
+
 
 Configuration
 =============
@@ -154,17 +175,88 @@ import datetime
 import ast
 import pathlib
 import argparse
+import importlib
 
-from zeff import __version__
+from .actions import VersionAction
+from .logqueue import queue_file_handlers
 
 from .configuration import *
-from .init import *
-from .models import *
-from .upload import *
-from .train import *
-from .predict import *
 from .record_builders import *
 
+# Sub-commands as ``(name, module, subparser, uses config, help)``. Only
+# the module of the sub-command being run is imported, the others are
+# added as placeholders with ``help`` so they are listed in usage.
+SUBCOMMANDS = [
+    (
+        "init",
+        ".init",
+        "init_subparser",
+        False,
+        "Setup a new project in the current directory.",
+    ),
+    ("models", ".models", "models_subparser", True, "Manage dataset models."),
+    (
+        "upload",
+        ".upload",
+        "upload_subparser",
+        True,
+        "Build, validate, and upload training records.",
+    ),
+    ("train", ".train", "train_subparser", True, "Control training sessions."),
+    (
+        "predict",
+        ".predict",
+        "predict_subparser",
+        True,
+        "Upload record to infer a prediction.",
+    ),
+    (
+        "run",
+        ".run",
+        "run_subparser",
+        True,
+        "Upload training records, train, then predict.",
+    ),
+    (
+        "mock-server",
+        ".mockserver",
+        "mockserver_subparser",
+        False,
+        "Run a local in-memory Zeff Cloud stand-in for testing.",
+    ),
+    (
+        "serve",
+        ".serve",
+        "serve_subparser",
+        False,
+        "Run a daemon that serves forwarded upload and predict requests.",
+    ),
+]
+
+
+def __getattr__(name):
+    """Import a sub-command's subparser function on first access."""
+    for _, module, subparser, _, _ in SUBCOMMANDS:
+        if name == subparser:
+            return getattr(importlib.import_module(module, __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def selected_subcommand(args):
+    """Return name of the sub-command in command line ``args``.
+
+    :return: The sub-command name, or ``None`` if ``args`` do not
+        name a known sub-command.
+    """
+    names = {name for name, *_ in SUBCOMMANDS}
+    args = iter(args)
+    for arg in args:
+        if arg == "--verbose":
+            next(args, None)
+        elif not arg.startswith("-"):
+            return arg if arg in names else None
+    return None
+
 
 def configure_logging():
     """Configure the logging system.
@@ -174,6 +266,10 @@ def configure_logging():
     if it exists, or from ``logging_default.txt`` in the same
     directory as this source file.
 
+    Unless the schema has ``'queue': False``, file handlers of the
+    root logger and each configured logger are moved to a listener
+    thread so disk writes are not made by the pipeline.
+
     .. caution:: This method should be called before ``parse_commandline``.
     """
 
@@ -206,6 +302,8 @@ def configure_logging():
         except OSError as err:
             print(f"Unable to configure logging: {err}", file=sys.stderr)
             sys.exit(errno.EIO)
+    if conf.get("queue", True):
+        queue_file_handlers([""] + list(conf.get("loggers", {}).keys()))
 
 
 def parse_commandline(args=None, config=None):
@@ -227,9 +325,7 @@ def parse_commandline(args=None, config=None):
     if config is None:
         config = load_configuration()
     parser = argparse.ArgumentParser()
-    parser.add_argument(
-        "--version", action="version", version=f"%(prog)s {__version__}"
-    )
+    parser.add_argument("--version", action=VersionAction)
     parser.add_argument(
         "--verbose",
         type=str,
@@ -239,11 +335,16 @@ def parse_commandline(args=None, config=None):
     )
 
     subparsers = parser.add_subparsers(help="sub-command help")
-    init_subparser(subparsers)
-    models_subparser(subparsers, config)
-    upload_subparser(subparsers, config)
-    train_subparser(subparsers, config)
-    predict_subparser(subparsers, config)
+    selected = selected_subcommand(sys.argv[1:] if args is None else args)
+    for name, module, subparser, uses_config, help_text in SUBCOMMANDS:
+        if name != selected:
+            subparsers.add_parser(name, help=help_text)
+            continue
+        subparser = getattr(importlib.import_module(module, __name__), subparser)
+        if uses_config:
+            subparser(subparsers, config)
+        else:
+            subparser(subparsers)
     options = parser.parse_args(args=args)
 
     # Adjust root logger and console to match verbose
@@ -257,6 +358,7 @@ def parse_commandline(args=None, config=None):
     # Update configuration and set in options
     config.update(options)
     options.configuration = config
+    options.argv = list(sys.argv[1:] if args is None else args)
     if not hasattr(options, "func"):
         parser.print_help()
         sys.exit(1)
@@ -35,9 +35,22 @@ def main(args=None):
 
     import traceback
     import errno
+    import os
     import pathlib
     import logging
     import zeff.cli
+    from zeff.cli.profiling import run_profiled
+
+    socket_path = os.environ.get("ZEFF_SERVE_SOCKET")
+    if socket_path:
+        from zeff.cli.serve import FORWARDED, forward
+
+        argv = sys.argv[1:] if args is None else args
+        if zeff.cli.selected_subcommand(argv) in FORWARDED:
+            status = forward(socket_path, argv)
+            if status is not None:
+                sys.exit(status)
+            print(f"No daemon on {socket_path}, running locally", file=sys.stderr)
 
     zeff.cli.configure_logging()
 
@@ -48,7 +61,7 @@ def main(args=None):
 
     try:
         logging.info("Starting with options %s", options)
-        options.func(options)
+        run_profiled(options.func, options)
     except SystemExit as err:
         logging.info("System exit")
         raise
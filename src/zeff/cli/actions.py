@@ -87,3 +87,28 @@ class NamedCallableObjectAction(argparse.Action):
             setattr(namespace, self.dest, obj)
         except ValueError:
             raise ValueError(f"Argument ``{values}`` is not in class path format.")
+
+
+class VersionAction(argparse.Action):
+    """Print the ZeffClient version and exit.
+
+    Unlike the ``version`` action the version is only looked up when
+    the option is given, so distribution metadata is not read on every
+    run.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, **kwargs):
+        """See argparse.Action."""
+        kwargs.setdefault("help", "show program's version number and exit")
+        super().__init__(
+            option_strings, dest, nargs=0, default=argparse.SUPPRESS, **kwargs
+        )
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        """See argparse.Action."""
+        # pylint: disable=import-outside-toplevel
+        from zeff import __version__
+
+        parser.exit(message=f"{parser.prog} {__version__}\n")
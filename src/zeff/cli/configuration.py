@@ -92,6 +92,7 @@ class Records:
     dataset_desc: str
     records_config_generator: object
     records_config_arg: str
+    records_source_index: str
     record_builder: object
     record_builder_arg: str
     record_validator: type
@@ -104,6 +105,9 @@ class Records:
             "records", "records_config_generator"
         )
         self.records_config_arg = config.get("records", "records_config_arg")
+        self.records_source_index = config.get(
+            "records", "records_source_index", fallback=""
+        )
         self.record_builder = config.get("records", "record_builder")
         self.record_builder_arg = config.get("records", "record_builder_arg")
         self.record_validator = config.get("records", "record_validator")
@@ -159,6 +163,9 @@ class Records:
         self.records_config_arg = getattr(
             options, "records_config_arg", self.records_config_arg
         )
+        self.records_source_index = getattr(
+            options, "records_source_index", self.records_source_index
+        )
         self.record_builder = getattr(options, "record_builder", self.record_builder)
         self.record_builder_arg = getattr(
             options, "record_builder_arg", self.record_builder_arg
@@ -179,6 +186,7 @@ class Records:
         section["datasetid"] = self.datasetid
         section["records_config_generator"] = path(self.records_config_generator)
         section["records_config_arg"] = self.records_config_arg
+        section["records_source_index"] = self.records_source_index
         section["record_builder"] = path(self.record_builder)
         section["record_builder_arg"] = self.record_builder_arg
         section["record_validator"] = path(self.record_validator)
@@ -207,6 +215,12 @@ class Configuration:
     :property records.records_config_arg: Single argument to be given to the
         ``records_config_generator`` when created.
 
+    :property records.records_source_index: Path to a
+        ``zeff.recordgenerator.SourceIndex`` given to the
+        ``records_config_generator`` as ``index`` when uploading, or
+        empty for none. The generator must take an ``index`` keyword
+        argument (e.g. ``zeff.recordgenerator.file_generator``).
+
     :property records.record_builder: Class to construct the record builder.
 
     :property records.record_builder_arg: Single argument to be given to the
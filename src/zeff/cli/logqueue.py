@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff CLI queue based logging."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+__all__ = [
+    "SamplingFilter",
+    "RoutingQueueHandler",
+    "RoutingQueueListener",
+    "queue_file_handlers",
+]
+
+import atexit
+import copy
+import logging
+import logging.handlers
+import queue
+import threading
+
+
+class SamplingFilter(logging.Filter):
+    """Sample INFO and lower records when a logger is busy.
+
+    For each logger name the first ``rate`` records at ``level`` or
+    lower in each one second window pass, and after that only one in
+    ``every`` records pass. Records above ``level`` always pass.
+
+    The number of records that did not pass is in ``suppressed``.
+    """
+
+    def __init__(
+        self, name: str = "", rate: int = 100, every: int = 100, level=logging.INFO
+    ):
+        """Create a new sampling filter.
+
+        :param name: See ``logging.Filter``.
+
+        :param rate: Number of records per second per logger that pass
+            before sampling begins.
+
+        :param every: Pass one in ``every`` records while sampling.
+
+        :param level: Highest level that may be sampled.
+        """
+        super().__init__(name)
+        self.rate = int(rate)
+        self.every = max(int(every), 1)
+        self.level = logging._checkLevel(level)  # pylint: disable=protected-access
+        self.suppressed = 0
+        self.__windows = {}
+        self.__lock = threading.Lock()
+
+    def filter(self, record):
+        """Return true if ``record`` should be logged."""
+        if record.levelno > self.level:
+            return True
+        if not super().filter(record):
+            return False
+        second = int(record.created)
+        with self.__lock:
+            window = self.__windows.get(record.name)
+            if window is None or window[0] != second:
+                window = [second, 0]
+                self.__windows[record.name] = window
+            window[1] += 1
+            count = window[1]
+            if count <= self.rate or (count - self.rate) % self.every == 0:
+                return True
+            self.suppressed += 1
+            return False
+
+
+class RoutingQueueHandler(logging.handlers.QueueHandler):
+    """Queue records for delivery to ``targets`` on a listener thread.
+
+    Each logger that has its handlers moved to a listener gets its own
+    routing handler, so a record is delivered only to the handlers of
+    the logger it was queued from.
+
+    A ``SamplingFilter`` on every target handler is moved to the routing
+    handler, so records it drops are neither copied nor queued.
+    """
+
+    def __init__(self, log_queue, targets):
+        """Create a handler for the ``targets`` handlers of a logger."""
+        super().__init__(log_queue)
+        self.targets = list(targets)
+        self.setLevel(min(h.level for h in self.targets))
+        for sample in list(self.targets[0].filters):
+            if isinstance(sample, SamplingFilter) and all(
+                sample in h.filters for h in self.targets
+            ):
+                self.addFilter(sample)
+                for handler in self.targets:
+                    handler.removeFilter(sample)
+
+    def prepare(self, record):
+        """Merge the message arguments in the logging thread.
+
+        Only the message is formatted here, the rest of the formatting
+        is done by the target handlers on the listener thread. Records
+        dropped by a sampling filter of the logger or of this handler
+        are never prepared.
+        """
+        if record.exc_info:
+            ret = super().prepare(record)
+            return copy.copy(record) if ret is record else ret
+        ret = copy.copy(record)
+        ret.message = ret.msg = record.getMessage()
+        ret.args = None
+        return ret
+
+    def enqueue(self, record):
+        """Queue the record together with its target handlers."""
+        self.queue.put_nowait((self.targets, record))
+
+
+class RoutingQueueListener(logging.handlers.QueueListener):
+    """Listener that delivers records queued by ``RoutingQueueHandler``."""
+
+    def __init__(self, log_queue):
+        """Create a listener on ``log_queue``."""
+        super().__init__(log_queue, respect_handler_level=True)
+
+    def stop(self):
+        """Deliver all queued records and stop the listener thread."""
+        if self._thread is not None:
+            super().stop()
+
+    def handle(self, record):
+        """Deliver a queued record to its target handlers."""
+        targets, record = record
+        for handler in targets:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+def queue_file_handlers(names) -> RoutingQueueListener:
+    """Move file handlers of loggers to a background listener thread.
+
+    Stream handlers (e.g. the console) are left in place so output
+    order with ``stdout`` is preserved; all other handlers of each
+    logger in ``names`` are replaced by a ``RoutingQueueHandler``.
+
+    The listener is started and will be stopped, which delivers all
+    queued records, when the process exits.
+
+    :param names: Logger names; the root logger is ``""``.
+
+    :return: The started listener.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = RoutingQueueListener(log_queue)
+    for name in names:
+        logger = logging.getLogger(name or None)
+        targets = [
+            h
+            for h in logger.handlers
+            if not isinstance(h, logging.StreamHandler)
+            or isinstance(h, logging.FileHandler)
+        ]
+        if not targets:
+            continue
+        handler = RoutingQueueHandler(log_queue, targets)
+        for target in targets:
+            logger.removeHandler(target)
+        logger.addHandler(handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff subcommand to run a local Zeff Cloud stand-in server."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+__all__ = ["mockserver_subparser"]
+
+import logging
+from zeff.cloud.mockserver import MockZeffCloud, MockZeffCloudServer
+
+
+def mockserver_subparser(subparsers):
+    """Add the ``mock-server`` sub-system as a subparser for argparse.
+
+    :param subparsers: The subparser to add the mock-server sub-command.
+    """
+
+    parser = subparsers.add_parser(
+        "mock-server",
+        help="""Run a local in-memory Zeff Cloud stand-in for testing
+            with ``--server-url``.""",
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="""Address to listen on (default: `%(default)s`)""",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="""Port to listen on (default: `%(default)s`)""",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="""Seconds to delay every response (default: `%(default)s`)""",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="""Maximum additional random seconds of delay
+            (default: `%(default)s`)""",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="""Fraction of requests that fail with 500
+            (default: `%(default)s`)""",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=0.0,
+        help="""Requests per second before responses are throttled with
+            429; zero is unlimited (default: `%(default)s`)""",
+    )
+    parser.add_argument(
+        "--training-time",
+        type=float,
+        default=5.0,
+        help="""Seconds for a training session to complete
+            (default: `%(default)s`)""",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="""Random seed for reproducible jitter and errors.""",
+    )
+    parser.set_defaults(func=mockserver)
+
+
+def mockserver(options):
+    """Serve a Zeff Cloud stand-in until interrupted."""
+    logger = logging.getLogger("zeffclient.mockserver")
+    cloud = MockZeffCloud(
+        latency=options.latency,
+        jitter=options.jitter,
+        error_rate=options.error_rate,
+        rate_limit=options.rate_limit,
+        training_time=options.training_time,
+        seed=options.seed,
+    )
+    server = MockZeffCloudServer((options.host, options.port), cloud=cloud)
+    print(f"Zeff Cloud stand-in at {server.url}", flush=True)
+    logger.info("Mock server listening at %s", server.url)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        logger.info(
+            "Mock server handled %d requests (%d throttled, %d failed)",
+            cloud.requests,
+            cloud.throttled,
+            cloud.failed,
+        )
@@ -21,10 +21,15 @@ __license__ = """
     limitations under the License.
 """
 
+import argparse
+import itertools
 import logging
 import zeff
 import zeff.record
+from zeff.metrics import METRICS
+from zeff.tracing import TRACER
 from .server import subparser_server
+from .profiling import subparser_profile
 from .actions import NamedClassObjectAction, NamedCallableObjectAction
 
 
@@ -49,6 +54,14 @@ def subparser_pipeline(parser, config):
         help=f"""A single argument when records-config-generator is created
             (default: `%(default)s`)""",
     )
+    parser.add_argument(
+        "--records-source-index",
+        default=config.records.records_source_index,
+        help=f"""Path to a source index given to records-config-generator
+            as ``index`` when uploading, so only entries that are new or
+            changed since the last successful upload are generated. Not
+            used with ``--shards`` (default: `%(default)s`)""",
+    )
     parser.add_argument(
         "--record-builder",
         action=NamedClassObjectAction,
@@ -70,6 +83,48 @@ def subparser_pipeline(parser, config):
             (default: `%(default)s`)""",
     )
 
+    parser.add_argument(
+        "--trace-file",
+        help="""Write spans of traced records to this file as Chrome
+            trace-event JSON.""",
+    )
+    parser.add_argument(
+        "--trace-sample-rate",
+        type=float,
+        default=1.0,
+        help="""Fraction of records to trace when ``--trace-file`` is
+            given (default: `%(default)s`)""",
+    )
+
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=0,
+        help="""Read ahead up to this many record configurations on a
+            background thread; 0 disables (default: `%(default)s`)""",
+    )
+    parser.add_argument(
+        "--threaded",
+        action="store_true",
+        help="""Run generate, build, and validate each in their own
+            threads connected by bounded queues, concurrent with upload.""",
+    )
+    parser.add_argument(
+        "--build-workers",
+        type=int,
+        default=1,
+        help="""Number of threads that build records when ``--threaded``;
+            each has its own record builder (default: `%(default)s`)""",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=64,
+        help="""Maximum records waiting between threaded stages
+            (default: `%(default)s`)""",
+    )
+
+    subparser_profile(parser)
     subparser_server(parser, config)
     parser.add_argument(
         "--dry-run",
@@ -77,9 +132,49 @@ def subparser_pipeline(parser, config):
         help="""Dry run to specified phase with no changes to Zeff Cloud,
             and print results to stdout.""",
     )
+    parser.add_argument(
+        "--dry-run-format",
+        choices=sorted(zeff.record.RECORD_WRITERS),
+        help="""Write each record of a ``build`` or ``validate`` dry run
+            to stdout in this format: ``jsonl`` the JSON uploaded to Zeff
+            Cloud, ``csv`` the structured data, or ``rst`` a
+            reStructuredText document.""",
+    )
+
+
+def shard_type(value: str):
+    """Return ``(shard, shards)`` from an ``i/N`` command line argument."""
+    try:
+        shard, shards = (int(v) for v in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shard `{value}` is not i/N") from None
+    if not 0 <= shard < shards:
+        raise argparse.ArgumentTypeError(f"shard `{value}` is not in [0, N)")
+    return shard, shards
 
 
-def build_pipeline(options, model, zeffcloud, *args, **kwargs):
+def dry_run_writer(options, out=None):
+    """Return a ``zeff.record.RecordWriter`` for dry run records.
+
+    :return: The writer selected by ``options.dry_run_format``, or
+        ``None`` if records are not written.
+    """
+    fmt = getattr(options, "dry_run_format", None)
+    if fmt is None or options.dry_run not in ["build", "validate"]:
+        return None
+    return zeff.record.RECORD_WRITERS[fmt](out)
+
+
+def build_pipeline(
+    options,
+    model,
+    zeffcloud,
+    *args,
+    config_arg=None,
+    source_index=None,
+    stop=None,
+    **kwargs,
+):
     """Build a record upload pipeline based on CLI options.
 
     :param options: Command line options.
@@ -89,42 +184,101 @@ def build_pipeline(options, model, zeffcloud, *args, **kwargs):
         record is used for training.
 
     :param zeffcloud: An upload generator that takes a record builder
-        generator as the first parameter.
+        generator as the first parameter. If ``None`` the pipeline ends
+        with validation.
 
     :param *args: Additional positional arguments to give to ``zeffcloud``
         generator.
 
+    :param config_arg: Argument for the records config generator
+        instead of ``records_config_arg`` in the configuration.
+
+    :param source_index: A ``zeff.recordgenerator.SourceIndex`` given to
+        the records config generator as ``index``.
+
+    :param stop: A ``threading.Event`` that ends the configuration
+        records when set, so the pipeline stops after the records in
+        progress.
+
     :param **kwargs: Additional key word arguments to give to ``zeffcloud``
         generator.
 
     :return: A tuple of Counter and last generator in pipeline. The
-        counter counts the number of configuration records generated.
+        counter counts the number of configuration records generated,
+        or only those in the shard when ``options.shard`` is set.
+
+    If ``options`` has a ``session_cache`` (see ``zeff serve``) then
+    record builders (one for each build worker), resource maps,
+    datasets, and models are reused from the cache.
+
+    If ``options.threaded`` is set the generate, build, and validate
+    stages run in a ``zeff.ThreadedPipeline`` and the ``zeffcloud``
+    generator consumes its results on the calling thread.
     """
 
     config = options.configuration
+    cache = getattr(options, "session_cache", None)
+    if options.trace_file:
+        TRACER.sample_rate = options.trace_sample_rate
 
     record_config_generator = config.records.records_config_generator
     logging.debug("Found record-config-generator: %s", record_config_generator)
-    generator = record_config_generator(config.records.records_config_arg)
-    counter = zeff.Counter(generator)
-    generator = counter
-    if options.dry_run == "configuration":
-        return counter, generator
+    if config_arg is None:
+        config_arg = config.records.records_config_arg
+    if source_index is not None:
+        generator = record_config_generator(config_arg, index=source_index)
+    else:
+        generator = record_config_generator(config_arg)
+    if stop is not None:
+        generator = itertools.takewhile(lambda _: not stop.is_set(), generator)
+    shard = getattr(options, "shard", None)
+    if shard is not None:
+        generator = zeff.shard_generator(generator, *shard)
+    if getattr(options, "prefetch", 0):
+        generator = zeff.prefetch(generator, options.prefetch)
+    counter = zeff.Counter(generator, stage=METRICS.stage("generate"))
 
-    record_builder = options.configuration.records.record_builder
-    logging.debug("Found record-builder: %s", record_builder)
-    generator = zeff.record_builder_generator(
-        model, generator, record_builder(config.records.record_builder_arg)
-    )
-    if options.dry_run == "build":
-        return counter, generator
+    stages = []
+    workers = getattr(options, "build_workers", 1)
+    if options.dry_run != "configuration":
+        record_builder = options.configuration.records.record_builder
+        logging.debug("Found record-builder: %s", record_builder)
+        builder_arg = config.records.record_builder_arg
+        if cache is not None:
+            # Each worker has its own cached builder.
+            count = workers if getattr(options, "threaded", False) else 1
+            builders = [
+                cache.record_builder(record_builder, builder_arg, n)
+                for n in reversed(range(count))
+            ]
+        else:
+            builders = [record_builder(builder_arg)]
+
+        def build(upstream):
+            worker = builders.pop() if builders else record_builder(builder_arg)
+            return zeff.record_builder_generator(model, upstream, worker)
+
+        stages.append(zeff.Stage("build", build, workers=workers))
+
+    if options.dry_run not in ["configuration", "build"]:
+        record_validator = config.records.record_validator
+        logging.debug("Found record-validator: %s", record_validator)
+        validator = record_validator(model)
+        stages.append(
+            zeff.Stage("validate", lambda up: zeff.validation_generator(up, validator))
+        )
 
-    record_validator = config.records.record_validator
-    logging.debug("Found record-validator: %s", record_validator)
-    generator = zeff.validation_generator(generator, record_validator(model))
-    if options.dry_run == "validate":
+    if getattr(options, "threaded", False):
+        generator = zeff.ThreadedPipeline(
+            counter, stages, maxsize=getattr(options, "queue_size", 64)
+        )
+    else:
+        generator = zeff.chain_stages(counter, stages)
+    if options.dry_run or zeffcloud is None:
         return counter, generator
 
+    if cache is not None:
+        zeffcloud = cache.zeffcloud(zeffcloud, options)
     generator = zeffcloud(
         generator,
         options.server_url,
@@ -29,7 +29,8 @@ from time import sleep
 import datetime
 import zeff
 import zeff.record
-from .pipeline import subparser_pipeline, build_pipeline
+from zeff.tracing import TRACER
+from .pipeline import subparser_pipeline, build_pipeline, dry_run_writer
 
 
 def predict_subparser(subparsers, config):
@@ -64,6 +65,28 @@ def predict(options):
         print(err, file=sys.stderr)
         sys.exit(1)
     logger.info("Prediction pipeline starts")
+    output = dry_run_writer(options)
+    if output is not None:
+        with output:
+            for record in records:
+                output.write(record)
+    else:
+        records = list(records)
+    if options.trace_file:
+        TRACER.write_chrome(options.trace_file)
+    if output is None:
+        report_predictions(records, now)
+
+
+def report_predictions(records, since):
+    """Print each prediction as Zeff Cloud completes it.
+
+    :param records: The model records returned by ``Predictor``.
+
+    :param since: Time the records were uploaded; a record has a
+        prediction when it is updated after this time.
+    """
+    logger = logging.getLogger("zeffclient.record.uploader")
     records = list(records)
     backoff = 1.0
     cutoff = 64.0
@@ -74,7 +97,7 @@ def predict(options):
             if hasattr(record, "updated_timestamp"):
                 # Record is in cloud/Model
                 # Need to only look at records that has an updated result
-                if record.updated_timestamp > now:
+                if record.updated_timestamp > since:
                     records.remove(record)
                     print(record)
             else:
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff CLI profiling of a pipeline run."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+__all__ = ["subparser_profile", "run_profiled", "ThreadProfiler"]
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from collections import defaultdict
+from typing import Dict, List
+
+import zeff
+
+HTTP_MODULES = ["requests", "urllib3", "http", "ssl", "socket", "json"]
+
+
+def subparser_profile(parser):
+    """Add CLI arguments necessary for profiling."""
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="""Profile the whole run, including record builder and
+            validator code, and write the profile to ``PATH``.""",
+    )
+    parser.add_argument(
+        "--profile-format",
+        choices=["pstats", "collapsed"],
+        default="pstats",
+        help="""Format of the profile file: ``pstats`` for ``pstats`` and
+            snakeviz, or ``collapsed`` stacks for flame graph tools
+            (default: `%(default)s`)""",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        help="""Number of hot functions to print for each stage
+            (default: `%(default)s`)""",
+    )
+
+
+class ThreadProfiler:
+    """Profile the calling thread and every thread started while running.
+
+    ``cProfile.Profile`` only sees the thread that enabled it, so each
+    thread started during ``runcall`` (pipeline workers, upload and
+    probe pools) is given its own profiler, and the profiles of all
+    threads are merged by ``stats``.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__profilers = [cProfile.Profile()]
+
+    def runcall(self, func, *args, **kwargs):
+        """Profile ``func(*args, **kwargs)`` and the threads it starts."""
+        threading.setprofile(self.__start_thread)
+        try:
+            return self.__profilers[0].runcall(func, *args, **kwargs)
+        finally:
+            threading.setprofile(None)
+
+    def stats(self) -> pstats.Stats:
+        """Return the merged statistics of all profiled threads."""
+        with self.__lock:
+            profilers = list(self.__profilers)
+        stats = pstats.Stats(profilers[0])
+        for profiler in profilers[1:]:
+            profiler.create_stats()
+            if profiler.stats:
+                stats.add(profiler)
+        return stats
+
+    def __start_thread(self, frame, event, arg):
+        # pylint: disable=unused-argument
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler already sees every thread (Python 3.12+).
+            sys.setprofile(None)
+            return
+        with self.__lock:
+            self.__profilers.append(profiler)
+
+
+def run_profiled(func, options):
+    """Run ``func(options)`` under the profiler if ``--profile`` was given.
+
+    Threads started by ``func`` are profiled as well. The profile is
+    written and the hot functions printed to stderr even when ``func``
+    raises an exception.
+    """
+    if not getattr(options, "profile", None):
+        return func(options)
+    profiler = ThreadProfiler()
+    try:
+        return profiler.runcall(func, options)
+    finally:
+        stats = profiler.stats()
+        if options.profile_format == "collapsed":
+            with open(options.profile, "w") as file:
+                for line in collapsed_stacks(stats):
+                    print(line, file=file)
+        else:
+            stats.dump_stats(options.profile)
+        print_stage_report(stats, stage_paths(options), options.profile_top)
+
+
+def stage_paths(options) -> Dict[str, List[str]]:
+    """Return source path prefixes that identify each stage.
+
+    User supplied generator, builder, and validator code is identified
+    by the file of its module, ZeffClient by its package directory, and
+    HTTP and JSON encoding by the standard library and ``requests``
+    modules.
+    """
+
+    def module_path(obj):
+        module = sys.modules.get(getattr(obj, "__module__", None))
+        path = getattr(module, "__file__", None)
+        return [os.path.abspath(path)] if path else []
+
+    records = getattr(getattr(options, "configuration", None), "records", None)
+    paths = {
+        "generate": module_path(getattr(records, "records_config_generator", None)),
+        "build": module_path(getattr(records, "record_builder", None)),
+        "validate": module_path(getattr(records, "record_validator", None)),
+        "http": [],
+        "zeff": [os.path.dirname(os.path.abspath(zeff.__file__))],
+    }
+    for name in HTTP_MODULES:
+        module = sys.modules.get(name)
+        path = getattr(module, "__file__", None)
+        if path:
+            if os.path.basename(path) == "__init__.py":
+                path = os.path.dirname(path)
+            paths["http"].append(os.path.abspath(path))
+    return paths
+
+
+def classify(filename: str, paths: Dict[str, List[str]]) -> str:
+    """Return the stage of a function from its source ``filename``."""
+    filename = os.path.abspath(filename)
+    for stage, prefixes in paths.items():
+        for prefix in prefixes:
+            if filename == prefix or filename.startswith(prefix + os.sep):
+                return stage
+    return "other"
+
+
+def print_stage_report(stats: pstats.Stats, paths, top: int, file=None):
+    """Print the ``top`` functions by own time in each stage to ``file``."""
+    file = file if file is not None else sys.stderr
+    by_stage: Dict[str, List[tuple]] = defaultdict(list)
+    totals: Dict[str, float] = defaultdict(float)
+    for func, (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        stage = classify(func[0], paths)
+        by_stage[stage].append((tottime, cumtime, ncalls, func))
+        totals[stage] += tottime
+    total = sum(totals.values()) or 1.0
+    print(f"Profile: {total:.3f}s total own time", file=file)
+    for stage in list(paths.keys()) + ["other"]:
+        if stage not in by_stage:
+            continue
+        percent = 100 * totals[stage] / total
+        print(f"\n{stage}: {totals[stage]:.3f}s ({percent:.1f}%)", file=file)
+        print(f"  {'own s':>9s} {'cum s':>9s} {'calls':>9s}  function", file=file)
+        hottest = sorted(by_stage[stage], key=lambda t: t[0], reverse=True)[:top]
+        for tottime, cumtime, ncalls, func in hottest:
+            name = pstats.func_std_string(func)
+            print(f"  {tottime:9.4f} {cumtime:9.4f} {ncalls:9d}  {name}", file=file)
+
+
+def collapsed_stacks(stats: pstats.Stats, minimum: float = 1e-6) -> List[str]:
+    """Return profile as collapsed stacks for flame graph tools.
+
+    A profile only has the time of each caller to callee edge, not full
+    stacks, so stacks are reconstructed from the call graph roots and
+    the own time of a function is divided among its stacks in
+    proportion to each edge's cumulative time. Stacks with less than
+    ``minimum`` seconds are omitted.
+
+    Each line is ``frame;frame;...;frame microseconds``.
+    """
+    callees: Dict[tuple, Dict[tuple, tuple]] = defaultdict(dict)
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        for caller, edge in callers.items():
+            callees[caller][func] = edge
+    roots = [func for func, value in stats.stats.items() if not value[4]]
+
+    weights: Dict[str, float] = defaultdict(float)
+
+    def label(func):
+        filename, line, name = func
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    def walk(func, stack, scale):
+        _, _, tottime, cumtime, _ = stats.stats[func]
+        if cumtime * scale < minimum or len(stack) > 128:
+            return
+        stack = stack + [label(func)]
+        if tottime * scale >= minimum:
+            weights[";".join(stack)] += tottime * scale
+        for callee, edge in callees[func].items():
+            if callee == func or label(callee) in stack:
+                continue
+            callee_cumtime = stats.stats[callee][3]
+            if callee_cumtime > 0:
+                walk(callee, stack, scale * edge[3] / callee_cumtime)
+
+    for root in roots:
+        walk(root, [], 1.0)
+    return [f"{stack} {int(weight * 1e6)}" for stack, weight in weights.items()]
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff subcommand to upload, train, and predict in one workflow."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+__all__ = ["run_subparser"]
+
+import sys
+import errno
+import logging
+import datetime
+import itertools
+import threading
+from typing import Iterator
+import zeff
+from zeff.cloud.training import TrainingStatus
+from .pipeline import subparser_pipeline, build_pipeline
+from .predict import report_predictions
+from .train import Trainer
+from .upload import subparser_upload, upload_records
+
+
+def run_subparser(subparsers, config):
+    """Add the ``run`` sub-system as a subparser for argparse.
+
+    :param subparsers: The subparser to add the run sub-command.
+    """
+
+    parser = subparsers.add_parser(
+        "run", help="""Upload training records, train, then predict."""
+    )
+    subparser_pipeline(parser, config)
+    subparser_upload(parser)
+    parser.add_argument(
+        "--predict-config-arg",
+        help="""Argument to records-config-generator for the records to
+            predict (default: `records-config-arg`)""",
+    )
+    parser.add_argument(
+        "--predict-queue-size",
+        type=int,
+        default=1024,
+        help="""Maximum prediction records built ahead while waiting for
+            training (default: `%(default)s`)""",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="""Seconds to wait for training before giving up. The
+            default is until training completes, or until it has not
+            started for an hour.""",
+    )
+    parser.set_defaults(func=run)
+
+
+def run(options):
+    """Upload records, train, and predict with the trained model.
+
+    Training starts when the last record upload is acknowledged. While
+    waiting for training the prediction records are built and validated
+    on a background thread into a queue of ``--predict-queue-size``
+    records, and when training completes they are streamed from the
+    queue to the new model, so each record is built once.
+    """
+    logger = logging.getLogger("zeffclient.record.uploader")
+    if options.dry_run:
+        upload_records(options)
+        return
+    if not options.records_datasetid:
+        print("Unknown dataset id to access for training.", file=sys.stderr)
+        sys.exit(errno.EINVAL)
+    trainer = Trainer(options)
+    if upload_records(options) == 0:
+        print("Error: no training records were generated.", file=sys.stderr)
+        sys.exit(errno.EINVAL)
+    previous = trainer.dataset.fetch_training_status()
+    logger.info("Start training the model")
+    trainer.start()
+
+    stop = threading.Event()
+    records = zeff.ThreadedPipeline(
+        prediction_records(options, stop),
+        [],
+        options.predict_queue_size,
+        output="predict",
+    )
+    try:
+        predict_trained(options, trainer, previous, records)
+    finally:
+        # Stop the build after the records in progress and wait for it.
+        stop.set()
+        records.close()
+
+
+def predict_trained(options, trainer, previous, records):
+    """Wait for training to complete then predict ``records``.
+
+    :param previous: Training status before training was started.
+    """
+    logger = logging.getLogger("zeffclient.record.uploader")
+    try:
+        info = trainer.dataset.wait_for_training(
+            timeout=options.timeout,
+            callback=lambda i: logger.info(
+                "Training %s %.0f%%", i.status, i.progress * 100
+            ),
+            previous=previous,
+        )
+    except TimeoutError as err:
+        print("Error:", err, file=sys.stderr)
+        sys.exit(errno.ETIMEDOUT)
+    if info.status is not TrainingStatus.complete:
+        print("Error: training stopped before completion.", file=sys.stderr)
+        sys.exit(errno.ECANCELED)
+    first = next(records, None)
+    if first is None:
+        print("Error: no prediction records were generated.", file=sys.stderr)
+        sys.exit(errno.EINVAL)
+
+    version = info.model_version
+    model = zeff.Predictor.find_model(
+        trainer.dataset, int(version) if version.isdigit() else None
+    )
+    logger.info("Prediction pipeline starts with model %s", model.version)
+    # Zeff Cloud timestamps are naive UTC.
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    predictions = zeff.Predictor(
+        itertools.chain([first], records),
+        options.server_url,
+        options.org_id,
+        options.user_id,
+        options.records_datasetid,
+        model.version,
+        resource_map=trainer.resource_map,
+        model=model,
+    )
+    report_predictions(predictions, now)
+
+
+def prediction_records(options, stop: threading.Event = None) -> Iterator:
+    """Generate the built and validated records to predict.
+
+    The pipeline is built when the first record is requested, so record
+    builders are created on the thread that uses them.
+
+    :param stop: Event that stops the build after the records in
+        progress.
+    """
+    config_arg = options.predict_config_arg
+    _, records = build_pipeline(options, True, None, config_arg=config_arg, stop=stop)
+    yield from records
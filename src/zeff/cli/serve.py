@@ -0,0 +1,434 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff CLI daemon that serves upload and predict requests."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+__all__ = [
+    "serve_subparser",
+    "SessionCache",
+    "ZeffDaemon",
+    "ForwardedStream",
+    "forward",
+]
+
+import concurrent.futures
+import contextlib
+import functools
+import io
+import json
+import logging
+import os
+import pathlib
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+import traceback
+
+LOGGER = logging.getLogger("zeffclient.serve")
+
+FORWARDED = ["upload", "predict"]
+
+
+def default_socket_path() -> pathlib.Path:
+    """Return the default daemon socket path ``${PWD}/var/run/zeff.sock``."""
+    return pathlib.Path.cwd() / "var" / "run" / "zeff.sock"
+
+
+def serve_subparser(subparsers):
+    """Add the ``serve`` sub-system as a subparser for argparse.
+
+    :param subparsers: The subparser to add the serve sub-command.
+    """
+
+    parser = subparsers.add_parser(
+        "serve",
+        help="""Run a daemon that serves forwarded upload and predict
+            requests.""",
+    )
+    parser.add_argument(
+        "--socket",
+        type=pathlib.Path,
+        default=default_socket_path(),
+        help="""Unix socket to listen on (default: `%(default)s`)""",
+    )
+    parser.add_argument(
+        "--metadata-ttl",
+        type=float,
+        default=60.0,
+        help="""Seconds dataset and model metadata is cached
+            (default: `%(default)s`)""",
+    )
+    parser.set_defaults(func=serve)
+
+
+def serve(options):
+    """Serve forwarded requests until interrupted or terminated."""
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    with ZeffDaemon(options.socket, SessionCache(options.metadata_ttl)) as daemon:
+        print(f"Serving on {options.socket}", flush=True)
+        daemon.serve_forever()
+
+
+class SessionCache:
+    """Warm objects reused by requests served by the daemon.
+
+    Resource maps and record builder instances are kept for the life
+    of the daemon. Dataset and model metadata are kept for ``ttl``
+    seconds so newly trained models are found.
+
+    The cache is only used from the daemon's worker thread.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        """Create an empty cache.
+
+        :param ttl: Seconds dataset and model metadata is cached.
+        """
+        self.ttl = ttl
+        self.resource_maps = {}
+        self.builders = {}
+        self.metadata = {}
+
+    def resource_map(self, server_url, org_id, user_id):
+        """Return a ``ZeffCloudResourceMap`` for the server and user."""
+        # pylint: disable=import-outside-toplevel
+        from zeff.zeffcloud import ZeffCloudResourceMap
+
+        key = (server_url, org_id, user_id)
+        ret = self.resource_maps.get(key)
+        if ret is None:
+            info = ZeffCloudResourceMap.default_info()
+            ret = ZeffCloudResourceMap(
+                info, root=server_url, org_id=org_id, user_id=user_id
+            )
+            self.resource_maps[key] = ret
+        return ret
+
+    def record_builder(self, builder_class, arg, worker: int = 0):
+        """Return a record builder instance created with ``arg``.
+
+        :param worker: Index of the pipeline build worker, as a builder
+            instance is only used by one worker.
+        """
+        key = (builder_class, arg, worker)
+        ret = self.builders.get(key)
+        if ret is None:
+            ret = builder_class(arg)
+            self.builders[key] = ret
+        return ret
+
+    def cached(self, key, load):
+        """Return metadata for ``key``, calling ``load`` when expired."""
+        now = time.monotonic()
+        entry = self.metadata.get(key)
+        if entry is None or entry[1] < now:
+            entry = (load(), now + self.ttl)
+            self.metadata[key] = entry
+        return entry[0]
+
+    def dataset(self, resource_map, dataset_id):
+        """Return the ``Dataset`` for ``dataset_id``."""
+        # pylint: disable=import-outside-toplevel
+        from zeff.cloud.dataset import Dataset
+
+        return self.cached(
+            ("dataset", id(resource_map), dataset_id),
+            lambda: Dataset(dataset_id, resource_map),
+        )
+
+    def model(self, dataset, version=None):
+        """Return the ``Model`` of ``dataset`` (see ``Predictor.find_model``)."""
+        # pylint: disable=import-outside-toplevel
+        from zeff.predictor import Predictor
+
+        return self.cached(
+            ("model", id(dataset), version),
+            lambda: Predictor.find_model(dataset, version),
+        )
+
+    def zeffcloud(self, zeffcloud, options):
+        """Return ``zeffcloud`` stage constructor that uses cached objects.
+
+        :param zeffcloud: ``Uploader`` or ``Predictor`` class.
+
+        :param options: Command line options with server and dataset.
+        """
+        # pylint: disable=import-outside-toplevel
+        from zeff.predictor import Predictor
+
+        resource_map = self.resource_map(
+            options.server_url, options.org_id, options.user_id
+        )
+        dataset = self.dataset(resource_map, options.records_datasetid)
+        if not issubclass(zeffcloud, Predictor):
+            return functools.partial(
+                zeffcloud, resource_map=resource_map, dataset=dataset
+            )
+
+        def create(*args, **kwargs):
+            version = args[5] if len(args) > 5 else kwargs.get("version")
+            return zeffcloud(
+                *args,
+                resource_map=resource_map,
+                model=self.model(dataset, version),
+                **kwargs,
+            )
+
+        return create
+
+
+class ForwardedStream(io.TextIOBase):
+    """Text stream that sends each write to the forwarding client."""
+
+    def __init__(self, name: str, send):
+        """Create a stream for ``stdout`` or ``stderr``.
+
+        :param name: Key of the written text in the response lines.
+
+        :param send: Callable that sends a response line to the client.
+        """
+        super().__init__()
+        self.__name = name
+        self.__send = send
+
+    def writable(self):
+        """Return ``True``."""
+        return True
+
+    def write(self, text):
+        """Send ``text`` to the client and return its length."""
+        if text:
+            self.__send({self.__name: text})
+        return len(text)
+
+
+class ZeffDaemonHandler(socketserver.StreamRequestHandler):
+    """Read a JSON request line and write JSON response lines.
+
+    The command's standard output and error are sent as they are
+    written, each as a ``{"stdout": text}`` or ``{"stderr": text}``
+    line, and the last line is ``{"status": status}``.
+    """
+
+    def setup(self):
+        """See socketserver.StreamRequestHandler.setup."""
+        # pylint: disable=attribute-defined-outside-init
+        super().setup()
+        self.__lock = threading.Lock()
+        self.__connected = True
+
+    def send(self, response: dict):
+        """Write ``response`` as a JSON line to the client.
+
+        If the client has disconnected the response is discarded so the
+        command still runs to completion.
+        """
+        line = json.dumps(response).encode("utf-8") + b"\n"
+        with self.__lock:
+            if not self.__connected:
+                return
+            try:
+                self.wfile.write(line)
+                self.wfile.flush()
+            except OSError:
+                self.__connected = False
+
+    def handle(self):
+        """Handle a single forwarded command."""
+        try:
+            request = json.loads(self.rfile.readline())
+            argv, cwd = request["argv"], request["cwd"]
+        except (ValueError, KeyError, TypeError) as err:
+            self.send({"stderr": f"Bad request: {err}\n"})
+            self.send({"status": 1})
+            return
+        self.send({"status": self.server.submit(argv, cwd, self.send)})
+
+
+class ZeffDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Daemon that runs forwarded ``upload`` and ``predict`` commands.
+
+    Connections are accepted concurrently but commands are run one at
+    a time on a single worker thread, as record builders (e.g. ones
+    holding SQLite connections) may only be used from the thread that
+    created them and the command's standard output is redirected.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, cache: SessionCache = None):
+        """Listen on the Unix socket ``path``.
+
+        A stale socket file left by a daemon that is no longer running
+        is replaced.
+
+        :raises OSError: Another daemon is listening on ``path``.
+        """
+        self.path = pathlib.Path(path)
+        self.cache = cache if cache is not None else SessionCache()
+        self.cwd = str(pathlib.Path.cwd())
+        self.__serving = False
+        self.__executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="zeff-serve"
+        )
+        os.makedirs(self.path.parent, exist_ok=True)
+        if self.path.exists():
+            if forward_connect(self.path) is not None:
+                raise OSError(f"Daemon already listening on {self.path}")
+            self.path.unlink()
+        umask = os.umask(0o077)
+        try:
+            super().__init__(str(self.path), ZeffDaemonHandler)
+        finally:
+            os.umask(umask)
+
+    def __enter__(self):
+        """Return this daemon."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop the daemon and remove the socket."""
+        self.close()
+
+    def serve_forever(self, poll_interval=0.5):
+        """See socketserver.BaseServer.serve_forever."""
+        self.__serving = True
+        super().serve_forever(poll_interval)
+
+    def start(self):
+        """Serve requests in a background thread."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+
+    def close(self):
+        """Stop serving and remove the socket."""
+        if self.__serving:
+            self.shutdown()
+        self.server_close()
+        self.__executor.shutdown()
+        with contextlib.suppress(OSError):
+            self.path.unlink()
+
+    def submit(self, argv, cwd, send) -> int:
+        """Run command line ``argv`` on the worker thread and return status."""
+        return self.__executor.submit(self.execute, argv, cwd, send).result()
+
+    def execute(self, argv, cwd, send) -> int:
+        """Run command line ``argv`` with standard output sent to ``send``.
+
+        The tracer's sample rate is restored and its spans removed after
+        the command, so options of one request do not affect the next.
+
+        :param send: Callable given each ``{"stdout": text}`` and
+            ``{"stderr": text}`` written by the command.
+
+        :return: Exit status of the command.
+        """
+        # pylint: disable=import-outside-toplevel
+        # pylint: disable=broad-except
+        import zeff.cli
+        from zeff.metrics import METRICS
+        from zeff.tracing import TRACER
+        from .profiling import run_profiled
+
+        stdout = ForwardedStream("stdout", send)
+        stderr = ForwardedStream("stderr", send)
+        sample_rate = TRACER.sample_rate
+        status = 0
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                if cwd != self.cwd:
+                    raise SystemExit(f"Daemon serves {self.cwd} not {cwd}")
+                if zeff.cli.selected_subcommand(argv) not in FORWARDED:
+                    raise SystemExit(f"Daemon only serves {', '.join(FORWARDED)}")
+                LOGGER.info("Serve %s", argv)
+                options = zeff.cli.parse_commandline(
+                    args=argv, config=zeff.cli.load_configuration()
+                )
+                options.session_cache = self.cache
+                METRICS.reset()
+                TRACER.reset()
+                run_profiled(options.func, options)
+            except SystemExit as err:
+                if err.code is None:
+                    status = 0
+                elif isinstance(err.code, int):
+                    status = err.code
+                else:
+                    print(err.code, file=sys.stderr)
+                    status = 1
+            except Exception:
+                LOGGER.exception("Unhandled exception serving %s", argv)
+                print(traceback.format_exc(), file=sys.stderr)
+                status = 1
+            finally:
+                TRACER.sample_rate = sample_rate
+                TRACER.reset()
+        return status
+
+
+def forward_connect(path):
+    """Return a socket connected to the daemon at ``path`` or ``None``."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def forward(path, argv):
+    """Forward command line ``argv`` to the daemon listening on ``path``.
+
+    The command's standard output and error are written to this
+    process's standard output and error as the daemon sends them.
+
+    :return: Exit status of the command, 1 if the daemon closed the
+        connection without a status, or ``None`` if no daemon is
+        listening on ``path``.
+    """
+    sock = forward_connect(path)
+    if sock is None:
+        return None
+    outputs = {"stdout": sys.stdout, "stderr": sys.stderr}
+    with sock, sock.makefile("rwb") as stream:
+        request = {"argv": list(argv), "cwd": str(pathlib.Path.cwd())}
+        stream.write(json.dumps(request).encode("utf-8") + b"\n")
+        stream.flush()
+        for line in stream:
+            try:
+                response = json.loads(line)
+            except ValueError:
+                break
+            if "status" in response:
+                return response["status"]
+            for name, output in outputs.items():
+                if name in response:
+                    output.write(response[name])
+                    output.flush()
+    print(
+        f"Daemon on {path} closed the connection without a status",
+        file=outputs["stderr"],
+    )
+    return 1
@@ -24,11 +24,11 @@ __all__ = ["train_subparser"]
 
 import sys
 import errno
-from time import sleep
-from tqdm import tqdm
+import concurrent.futures
 from zeff.zeffcloud import ZeffCloudResourceMap
 from zeff.cloud.exception import ZeffCloudException
 from zeff.cloud.dataset import Dataset
+from zeff.cloud.monitor import TrainingMonitor
 from zeff.cloud.training import TrainingStatus
 from .server import subparser_server
 
@@ -61,6 +61,26 @@ def train_subparser(subparsers, config):
         action="store_true",
         help="Continuously display the status of the training session.",
     )
+    action_status.add_argument(
+        "--timeout",
+        type=float,
+        help="""Seconds to continuously display status before giving up.
+            The default is until training completes, or until training
+            of a dataset has not started for an hour.""",
+    )
+    action_status.add_argument(
+        "--datasets",
+        type=lambda s: [i.strip() for i in s.split(",") if i.strip()],
+        help="""Comma separated dataset ids to display together instead
+            of the records dataset.""",
+    )
+    action_status.add_argument(
+        "--max-rate",
+        type=float,
+        default=10.0,
+        help="""Maximum status requests per second for all datasets
+            together (default %(default)s).""",
+    )
     action_status.set_defaults(action=Trainer.status)
 
     action_start = actions.add_parser(
@@ -74,6 +94,9 @@ def train_subparser(subparsers, config):
 
 def train(options):
     """Entry point for train subcommand."""
+    if getattr(options, "datasets", None):
+        monitor(options)
+        return
     if not options.records_datasetid:
         print("Unknown dataset id to access for training.", file=sys.stderr)
         sys.exit(errno.EINVAL)
@@ -81,6 +104,76 @@ def train(options):
     options.action(trainer)
 
 
+def monitor(options):
+    """Display the training status of several datasets together."""
+    info = ZeffCloudResourceMap.default_info()
+    resource_map = ZeffCloudResourceMap(
+        info, root=options.server_url, org_id=options.org_id, user_id=options.user_id
+    )
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            datasets = list(
+                executor.map(lambda i: Dataset(i, resource_map), options.datasets)
+            )
+    except ZeffCloudException as err:
+        print("Error:", err, file=sys.stderr)
+        sys.exit(errno.ENOENT)
+    training = TrainingMonitor(datasets, max_rate=options.max_rate)
+    width = max(len(d) for d in options.datasets)
+
+    def line(dataset_id, tstate):
+        if tstate is None:
+            return f"{dataset_id:{width}s}  unavailable"
+        tstamp = tstate.updated_timestamp.strftime("%c")
+        return (
+            f"{dataset_id:{width}s}  {str(tstate.status):9s} "
+            f"{tstate.progress:7.2%}  {tstamp}"
+        )
+
+    if not options.continuous:
+        for dataset_id, tstate in training.poll().items():
+            print(line(dataset_id, tstate))
+        return
+
+    # pylint: disable=import-outside-toplevel
+    from tqdm import tqdm
+
+    pbar = tqdm(
+        total=100 * len(datasets),
+        bar_format="{l_bar}{bar}| {percentage:3.0f}% [{elapsed}]",
+    )
+    progress = {d.dataset_id: 0 for d in datasets}
+
+    def show(dataset_id, tstate):
+        progress[dataset_id] = round(tstate.progress * 100)
+        if tstate.status is TrainingStatus.complete:
+            progress[dataset_id] = 100
+            pbar.write(line(dataset_id, tstate))
+        complete = sum(1 for p in progress.values() if p == 100)
+        pbar.set_description(f"{complete}/{len(progress)} complete")
+        # Progress is absolute but ``update`` takes an increment.
+        pbar.update(sum(progress.values()) - pbar.n)
+
+    try:
+        statuses = training.wait(timeout=options.timeout, callback=show)
+    finally:
+        pbar.close()
+    waiting = [
+        i
+        for i, s in statuses.items()
+        if s is None or s.status is not TrainingStatus.complete
+    ]
+    for dataset_id in waiting:
+        print(line(dataset_id, statuses[dataset_id]))
+    if training.expired:
+        expired = ", ".join(sorted(training.expired))
+        print("Error: training not started for", expired, file=sys.stderr)
+        sys.exit(errno.ETIMEDOUT)
+    if options.timeout is not None and waiting:
+        print("Error: timed out waiting for", ", ".join(waiting), file=sys.stderr)
+        sys.exit(errno.ETIMEDOUT)
+
+
 class Trainer:
     """Controller for dataset training."""
 
@@ -109,22 +202,30 @@ class Trainer:
             return f"{tstate.updated_timestamp.strftime('%c')}"
 
         if self.options.continuous:
+            # pylint: disable=import-outside-toplevel
+            from tqdm import tqdm
 
-            def desc_str():
-                return f"{tstate.status} ({tstamp()})"
-
-            tstate = self.dataset.training_status
             pbar = tqdm(
-                desc=desc_str(),
                 total=100,
                 bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}]",
             )
-            while tstate.status is not TrainingStatus.complete:
-                pbar.set_description(desc_str())
-                pbar.update(tstate.progress)
-                sleep(1.0)
-                tstate = self.dataset.training_status
-            pbar.close()
+
+            def show(info):
+                pbar.set_description(
+                    f"{info.status} ({info.updated_timestamp.strftime('%c')})"
+                )
+                # Progress is absolute but ``update`` takes an increment.
+                pbar.update(round(info.progress * 100) - pbar.n)
+
+            try:
+                self.dataset.wait_for_training(
+                    timeout=self.options.timeout, callback=show
+                )
+            except TimeoutError as err:
+                print("Error:", err, file=sys.stderr)
+                sys.exit(errno.ETIMEDOUT)
+            finally:
+                pbar.close()
         else:
             tstate = self.dataset.training_status
             if tstate.status is TrainingStatus.unknown:
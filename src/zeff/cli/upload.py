@@ -20,12 +20,23 @@ __license__ = """
     See the License for the specific language governing permissions and
     limitations under the License.
 """
-__all__ = ["upload_subparser"]
+__all__ = ["upload_subparser", "subparser_upload", "upload_records"]
 
+import os
+import sys
+import errno
+import inspect
 import logging
+import pathlib
+import subprocess
+import tempfile
 import zeff
 import zeff.record
-from .pipeline import subparser_pipeline, build_pipeline
+from zeff.metrics import METRICS, PrometheusWriter
+from zeff.tracing import TRACER
+from .pipeline import subparser_pipeline, build_pipeline, dry_run_writer
+from .pipeline import shard_type
+from .configuration import ConfigurationValidationException
 from .train import Trainer
 
 
@@ -45,23 +56,275 @@ def upload_subparser(subparsers, config):
         help="""Build, validate, and upload training records, but do not
             start training of machine.""",
     )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        help="""Coordinate an upload by this many local worker processes,
+            each uploading one ``--shard``, then merge their metrics
+            and upload index journals.""",
+    )
+    parser.add_argument(
+        "--shard",
+        type=shard_type,
+        help="""Only upload shard ``i`` of ``N`` (written ``i/N``) of the
+            records, partitioned by a hash of each record configuration,
+            without starting training. Only ``upload`` takes shards, as
+            the upload index journals of the shards must be merged
+            before training.""",
+    )
+    subparser_upload(parser)
     parser.set_defaults(func=upload)
 
 
+def subparser_upload(parser):
+    """Add CLI arguments necessary for uploading records."""
+    parser.add_argument(
+        "--upload-all",
+        action="store_true",
+        help="""Upload every record even if it is unchanged since the last
+            successful upload to the dataset.""",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="""Periodically write pipeline metrics to this file in the
+            Prometheus text format.""",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=10.0,
+        help="""Seconds between writes of the metrics file
+            (default: `%(default)s`)""",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        help="""Write the final pipeline metrics, with full latency
+            histograms, to this file as JSON.""",
+    )
+
+
 def upload(options):
     """Generate a set of records from options."""
     logger = logging.getLogger("zeffclient.record.uploader")
-    logger.info("Build upload pipeline")
-    counter, records = build_pipeline(options, False, zeff.Uploader)
-    logger.info("Upload pipeline starts")
-    for record in records:
-        logger.info("Record Count %d", counter.count)
-        logger.debug(record)
-    logger.info("Upload pipeline completes")
-    logging.info("Records uploaded %d", counter.count)
-    if counter.count == 0 and not options.no_train:
+    if getattr(options, "shards", None):
+        count = upload_shards(options)
+    else:
+        count = upload_records(options)
+    if getattr(options, "shard", None) is not None:
+        logger.info("Shard %d/%d does not start training", *options.shard)
+    elif count > 0 and not options.dry_run and not options.no_train:
         logger.info("Start training the model")
         logger.debug("All records uploaded, start training.")
         trainer = Trainer(options)
         trainer.start()
     logger.info("Upload process completes")
+
+
+def upload_records(options) -> int:
+    """Run the upload pipeline and return the number of records generated.
+
+    If a records source index is configured it is only committed when
+    every generated record was built, validated, and uploaded, so the
+    entries of failed records are generated again by the next run.
+
+    If the validator rejects the dataset as a whole the records are
+    already uploaded, so the source index is not committed and the
+    process exits with ``EINVAL`` rather than start training.
+    """
+    # pylint: disable=too-many-branches
+    logger = logging.getLogger("zeffclient.record.uploader")
+    logger.info("Build upload pipeline")
+    index = None
+    if not options.dry_run and not options.upload_all:
+        index = zeff.UploadIndex.for_dataset(
+            options.records_datasetid, shard=getattr(options, "shard", None)
+        )
+    source_index = open_source_index(options)
+    rejected = rejected_records()
+    invalid = invalid_datasets()
+    counter, records = build_pipeline(
+        options, False, zeff.Uploader, index=index, source_index=source_index
+    )
+    writer = None
+    if not options.dry_run and options.metrics_file:
+        writer = PrometheusWriter(
+            METRICS, options.metrics_file, options.metrics_interval
+        )
+        writer.start()
+    output = dry_run_writer(options)
+    logger.info("Upload pipeline starts")
+    try:
+        for record in records:
+            logger.info("Record Count %d", counter.count)
+            logger.debug(record)
+            if output is not None:
+                output.write(record)
+        if source_index is not None:
+            failed = records.failed + rejected_records() - rejected
+            if invalid_datasets() > invalid:
+                logger.warning("Source index not saved: dataset is not valid")
+            elif failed:
+                logger.warning("Source index not saved: %d records failed", failed)
+            else:
+                source_index.commit()
+    finally:
+        if writer is not None:
+            writer.stop()
+        if output is not None:
+            output.close()
+        if source_index is not None:
+            source_index.close()
+    logger.info("Upload pipeline completes")
+    if options.trace_file:
+        TRACER.write_chrome(options.trace_file)
+    if not options.dry_run:
+        print(METRICS.summary(), file=sys.stderr)
+    if getattr(options, "metrics_json", None):
+        METRICS.write_json(options.metrics_json)
+    if index is not None:
+        logger.info("Records unchanged and not uploaded %d", records.skipped)
+        index.close()
+    logging.info("Records uploaded %d", counter.count)
+    if invalid_datasets() > invalid:
+        print("Error: the records dataset is not valid.", file=sys.stderr)
+        sys.exit(errno.EINVAL)
+    return counter.count
+
+
+def open_source_index(options):
+    """Return the configured records ``SourceIndex`` or ``None``.
+
+    The source index is not used by a dry run, or by shard workers as
+    each lists every entry of the source.
+
+    :exception ConfigurationValidationException: If the records config
+        generator does not take an ``index`` keyword argument.
+    """
+    records = options.configuration.records
+    path = records.records_source_index
+    if not path or options.dry_run:
+        return None
+    generator = records.records_config_generator
+    if not accepts_keyword(generator, "index"):
+        name = getattr(generator, "__qualname__", repr(generator))
+        module = getattr(generator, "__module__", None)
+        if module:
+            name = f"{module}.{name}"
+        raise ConfigurationValidationException(
+            None,
+            f"[records]records_source_index requires records_config_generator "
+            f"`{name}` to take an ``index`` keyword argument.",
+        )
+    if getattr(options, "shard", None) is not None:
+        logging.getLogger("zeffclient.record.uploader").warning(
+            "Records source index %s is not used by shards", path
+        )
+        return None
+    # pylint: disable=import-outside-toplevel
+    from zeff.recordgenerator import SourceIndex
+
+    return SourceIndex(path)
+
+
+def rejected_records() -> int:
+    """Return number of records rejected by the build and validate stages."""
+    return sum(sum(METRICS.stage(n).errors.values()) for n in ["build", "validate"])
+
+
+def accepts_keyword(func, name: str) -> bool:
+    """Return true if ``func`` may be called with keyword argument ``name``.
+
+    A callable without an inspectable signature is assumed to accept it.
+    """
+    try:
+        params = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return True
+    param = params.get(name)
+    if param is not None:
+        return param.kind in (param.POSITIONAL_OR_KEYWORD, param.KEYWORD_ONLY)
+    return any(p.kind is p.VAR_KEYWORD for p in params.values())
+
+
+def invalid_datasets() -> int:
+    """Return number of datasets rejected by ``validate_dataset``."""
+    return METRICS.stage("validate").errors.get("validate_dataset", 0)
+
+
+def worker_argv(argv, shard: int, shards: int, metrics_json) -> list:
+    """Return command line arguments of a shard worker process.
+
+    Options that name a single output file of the coordinator are
+    removed, and the shard and metrics file of the worker are added.
+    """
+    removed = ["--shards", "--shard", "--metrics-file", "--trace-file", "--profile"]
+    ret = []
+    args = iter(argv)
+    for arg in args:
+        name = arg.split("=", 1)[0]
+        if name in removed:
+            if "=" not in arg:
+                next(args, None)
+            continue
+        ret.append(arg)
+    return ret + [
+        f"--shard={shard}/{shards}",
+        "--no-train",
+        f"--metrics-json={metrics_json}",
+    ]
+
+
+def upload_shards(options) -> int:
+    """Upload with ``options.shards`` worker processes.
+
+    Each worker runs ``zeff upload --shard i/N`` with the same command
+    line. When all have finished their metrics are merged into
+    ``METRICS`` and their upload index journals into the dataset
+    index, even if some workers failed, so a rerun only uploads what
+    is missing.
+
+    :return: The number of records generated by all workers.
+    """
+    logger = logging.getLogger("zeffclient.record.uploader")
+    env = dict(os.environ)
+    env.pop("ZEFF_SERVE_SOCKET", None)
+    failed = []
+    with tempfile.TemporaryDirectory(prefix="zeff-shards-") as tmpdir:
+        workers = []
+        for shard in range(options.shards):
+            path = pathlib.Path(tmpdir) / f"metrics-{shard}.json"
+            argv = worker_argv(options.argv, shard, options.shards, path)
+            logger.info("Start shard worker %d/%d", shard, options.shards)
+            proc = subprocess.Popen([sys.executable, "-m", "zeff.cli", *argv], env=env)
+            workers.append((shard, path, proc))
+        try:
+            for shard, path, proc in workers:
+                if proc.wait() != 0:
+                    failed.append((shard, proc.returncode))
+        finally:
+            for _, _, proc in workers:
+                if proc.poll() is None:
+                    proc.terminate()
+                    proc.wait()
+        METRICS.reset()
+        for _, path, _ in workers:
+            if path.exists():
+                METRICS.merge_json(path)
+
+    if not options.dry_run and not options.upload_all:
+        with zeff.UploadIndex.for_dataset(options.records_datasetid) as index:
+            for journal in zeff.UploadIndex.journals(options.records_datasetid):
+                logger.info("Merge upload index journal %s", journal.name)
+                index.merge(journal)
+                os.remove(journal)
+    if not options.dry_run:
+        print(METRICS.summary(), file=sys.stderr)
+        if options.metrics_file:
+            METRICS.write_prometheus(options.metrics_file)
+    if options.metrics_json:
+        METRICS.write_json(options.metrics_json)
+    for shard, status in failed:
+        print(f"Error: shard {shard}/{options.shards} exit {status}", file=sys.stderr)
+    if failed:
+        sys.exit(failed[0][1])
+    return METRICS.stage("generate").count
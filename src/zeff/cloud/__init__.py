@@ -23,5 +23,6 @@ __license__ = """
 
 from .exception import ZeffCloudException
 from .dataset import Dataset
+from .file import File
 from .model import Model
 from .record import Record
@@ -23,14 +23,15 @@ __license__ = """
 
 import logging
 import json
+import time
 from typing import Iterator
 from ..zeffdatasettype import ZeffDatasetType
 from .exception import ZeffCloudException
+from .file import File
 from .model import Model
 from .record import Record
 from .resource import Resource
-from .training import TrainingSessionInfo
-
+from .training import TrainingSessionInfo, TrainingPoller, TrainingStatus
 
 LOGGER = logging.getLogger("zeffclient.record.uploader")
 
@@ -38,6 +39,8 @@ LOGGER = logging.getLogger("zeffclient.record.uploader")
 class Dataset(Resource):
     """Dataset in the Zeff Cloud API."""
 
+    QUEUED_TIMEOUT = 3600.0
+
     @classmethod
     def create_dataset(
         cls, resource_map, dataset_type: ZeffDatasetType, title: str, description: str
@@ -130,16 +133,152 @@ class Dataset(Resource):
         data = self.add_resource(record, record.name, "recordId", tag)
         return Record(self, data["recordId"])
 
+    def add_file(self, path, file_type: str = None, index=None):
+        """Upload the content of a local file to this dataset.
+
+        :param path: Path to the local file to be uploaded.
+
+        :param file_type: Name of the ``FileType`` of the content.
+
+        :param index: An ``UploadIndex`` of the dataset. An upload of
+            the unchanged file started by an earlier process is resumed,
+            and a new upload is recorded in the index.
+
+        :return: The File in Zeff Cloud with the content.
+
+        :raises ZeffCloudException: Exception in communication with Zeff Cloud.
+        """
+        file = None
+        file_id = index.file_id(path) if index is not None else None
+        if file_id is not None:
+            try:
+                file = File(self, file_id)
+                LOGGER.info("Resume upload of file %s at byte %d", path, file.received)
+            except ZeffCloudException as err:
+                LOGGER.info("Unable to resume upload of file %s: %s", path, err)
+        if file is None:
+            file = File.create_file(self, path, file_type)
+            if index is not None:
+                index.update_file(path, file.file_id)
+        file.send(path)
+        LOGGER.info("Uploaded file %s to %s", path, file.location)
+        return file
+
     @property
     def training_status(self):
         """Return current training status metrics object."""
+        return self.fetch_training_status()
+
+    def fetch_training_status(self, previous: TrainingSessionInfo = None):
+        """Return current training status metrics object.
+
+        :param previous: Status from an earlier fetch. The request is
+            made conditional on the status having changed (using
+            ``ETag`` or ``Last-Modified`` when the server supplied
+            them) and ``previous`` is returned if it has not.
+
+        :raises ZeffCloudException: Exception in communication with Zeff Cloud.
+        """
         tag = "tag:zeff.com,2019-12:datasets/train"
-        resp = self.request(tag, method="GET", dataset_id=self.dataset_id)
+        headers = {}
+        if previous is not None:
+            if previous.etag:
+                headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                headers["If-Modified-Since"] = previous.last_modified
+        resp = self.request(
+            tag, method="GET", headers=headers, dataset_id=self.dataset_id
+        )
+        if resp.status_code == 304 and previous is not None:
+            return previous
         if resp.status_code not in [200]:
             raise ZeffCloudException(
                 resp, type(self), self.dataset_id, "training status"
             )
-        return TrainingSessionInfo(resp.json()["data"])
+        return TrainingSessionInfo(
+            resp.json()["data"],
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+        )
+
+    def wait_for_training(
+        self,
+        timeout: float = None,
+        callback=None,
+        poller: TrainingPoller = None,
+        queued_timeout: float = QUEUED_TIMEOUT,
+        previous: TrainingSessionInfo = None,
+    ) -> TrainingSessionInfo:
+        """Wait for the current training session to complete.
+
+        Training status is polled at adaptive intervals with
+        conditional requests, so a long training session costs few
+        requests and completion is noticed promptly.
+
+        :param timeout: Maximum seconds to wait. The default is to wait
+            until training completes.
+
+        :param callback: Called with each ``TrainingSessionInfo`` that
+            differs from the previous poll, starting with the first.
+
+        :param poller: A ``TrainingPoller`` that chooses the interval
+            between polls. The default is ``TrainingPoller()``.
+
+        :param queued_timeout: Maximum seconds the training session may
+            stay queued or not be found (status ``unknown`` before any
+            session was seen), even without a ``timeout``, so a session
+            that is never started does not wait forever. ``None`` waits
+            until it starts.
+
+        :param previous: Status fetched before the training session was
+            started. While the status is still of that session (e.g. an
+            earlier ``complete`` session) it is treated as not started.
+
+        :return: Final status, which is ``complete``, or ``unknown`` if
+            the training session was stopped.
+
+        :raises TimeoutError: Training did not complete in ``timeout``,
+            or did not start in ``queued_timeout``.
+
+        :raises ZeffCloudException: Exception in communication with Zeff Cloud.
+        """
+        poller = poller if poller is not None else TrainingPoller()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        queued_deadline = None
+        waiting = (TrainingStatus.queued, TrainingStatus.unknown)
+        info = None
+        while True:
+            latest = self.fetch_training_status(info)
+            if latest is not info and callback is not None:
+                callback(latest)
+            info = latest
+            stale = previous is not None and info.same_session(previous)
+            if not stale and poller.finished(info):
+                return info
+            delay = poller.interval(info)
+            now = time.monotonic()
+            # An unknown status here means no session has been seen yet.
+            if (not stale and info.status not in waiting) or queued_timeout is None:
+                queued_deadline = None
+            elif queued_deadline is None:
+                queued_deadline = now + queued_timeout
+            if deadline is not None:
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"Training of dataset {self.dataset_id} not complete"
+                        f" after {timeout} seconds"
+                    )
+                delay = min(delay, remaining)
+            if queued_deadline is not None:
+                remaining = queued_deadline - now
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"Training of dataset {self.dataset_id} not started"
+                        f" after {queued_timeout} seconds"
+                    )
+                delay = min(delay, remaining)
+            time.sleep(delay)
 
     def start_training(self):
         """Start or restart the current training session."""
@@ -68,7 +68,7 @@ class RecordEncoder(json.JSONEncoder):
             # }
         elif isinstance(o, UnstructuredData):
             return {
-                "data": o.data_uri,
+                "data": o.location if o.location else o.data_uri,
                 "fileType": o.file_type.name,
                 "groupByName": o.group_by,
             }
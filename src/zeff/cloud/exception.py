@@ -31,7 +31,10 @@ class ZeffCloudException(Exception):
     def __init__(self, resp, resource: Type, resource_name: str, action: str):
         """Create new exception.
 
-        :param resp: HTTP response object of request that failed.
+        :param resp: HTTP response object of request that failed, or
+            ``None`` if the request failed without a response. The
+            exception that caused the failure should then be chained
+            with ``raise ... from err``.
 
         :param resource: Type of Zeff Cloud resource being accessed.
 
@@ -47,6 +50,11 @@ class ZeffCloudException(Exception):
 
     def __str__(self):
         """Return message string for exception."""
+        if self.__resp is None:
+            return (
+                f"{self.__resource.__name__} {self.__resource_name}"
+                f" {self.__action} failed: {self.__cause__}"
+            )
         return textwrap.dedent(
             f"""\
             {self.__resource.__name__} {self.__resource_name} load failed
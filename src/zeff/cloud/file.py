@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff Cloud Dataset File."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import logging
+import json
+import os
+import pathlib
+import time
+import requests
+from .exception import ZeffCloudException
+from .resource import Resource
+from ..metrics import METRICS
+from ..pipeline_events import EVENTS, RetryScheduled
+
+LOGGER = logging.getLogger("zeffclient.record.uploader")
+
+CHUNK_SIZE = 64 * 1024
+PART_SIZE = 8 * 1024 * 1024
+
+
+def read_chunks(path, offset: int, length: int, chunk_size: int = CHUNK_SIZE):
+    """Yield ``length`` bytes of a file starting at ``offset``.
+
+    The bytes are read and yielded ``chunk_size`` at a time so the
+    content is streamed from disk rather than read into memory.
+    """
+    with open(path, "rb") as file:
+        file.seek(offset)
+        while length > 0:
+            chunk = file.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length = length - len(chunk)
+            yield chunk
+
+
+class File(Resource):
+    """Content of an unstructured data file uploaded to Zeff Cloud.
+
+    A file is uploaded in parts: each part is a ``PUT`` of a byte range
+    of the file. The server tracks how many bytes have been received,
+    so an interrupted upload resumes from the first byte the server
+    does not have.
+    """
+
+    @classmethod
+    def create_file(cls, dataset, path, file_type: str = None) -> "File":
+        """Start a new file upload to a dataset.
+
+        :param dataset: The containing Dataset.
+
+        :param path: Path to the local file to be uploaded.
+
+        :param file_type: Name of the ``FileType`` of the content.
+
+        :raises ZeffCloudException: Exception in communication with Zeff Cloud.
+        """
+        path = pathlib.Path(path)
+        tag = "tag:zeff.com,2019-12:datasets/files/add"
+        resource = Resource(dataset.resource_map)
+        body = {"name": path.name, "size": os.stat(path).st_size}
+        if file_type is not None:
+            body["fileType"] = file_type
+        try:
+            resp = resource.request(
+                tag,
+                method="POST",
+                data=json.dumps(body),
+                dataset_id=dataset.dataset_id,
+            )
+        except requests.RequestException as err:
+            raise ZeffCloudException(err.response, cls, path.name, "create") from err
+        if resp.status_code not in [200, 201]:
+            raise ZeffCloudException(resp, cls, path.name, "create")
+        return cls(dataset, resp.json()["data"]["fileId"], data=resp.json()["data"])
+
+    def __init__(self, dataset, file_id: str, data=None):
+        """Initialize a file resource access.
+
+        :param dataset: The containing Dataset.
+
+        :param file_id: The unique fileId of the file in the Zeff Cloud API.
+
+        :param data: Status data of the file if already available.
+
+        :raises ZeffCloudException: Exception in communication with Zeff Cloud.
+        """
+        super().__init__(dataset.resource_map)
+        self.dataset = dataset
+        self.__file_id = file_id
+        self.__data = data
+        if self.__data is None:
+            self.update()
+
+    def __str__(self):
+        """Return user friendly representation."""
+        return f"<File dataset:{self.dataset.dataset_id} file:{self.file_id}>"
+
+    def update(self):
+        """Update file upload information from Zeff Cloud."""
+        tag = "tag:zeff.com,2019-12:datasets/files"
+        try:
+            resp = self.request(
+                tag, dataset_id=self.dataset.dataset_id, file_id=self.__file_id
+            )
+        except requests.RequestException as err:
+            raise ZeffCloudException(
+                err.response, type(self), self.__file_id, "load"
+            ) from err
+        if resp.status_code not in [200]:
+            raise ZeffCloudException(resp, type(self), self.__file_id, "load")
+        self.__data = resp.json()["data"]
+
+    @property
+    def file_id(self) -> str:
+        """Return this file's id."""
+        return self.__file_id
+
+    @property
+    def size(self) -> int:
+        """Return total size of the file in bytes."""
+        return int(self.__data["size"])
+
+    @property
+    def received(self) -> int:
+        """Return number of bytes the server has received."""
+        value = self.__data.get("received")
+        return int(value) if value is not None else 0
+
+    @property
+    def complete(self) -> bool:
+        """Return true if the server has received the entire file."""
+        return self.received >= self.size
+
+    @property
+    def location(self) -> str:
+        """Return the URL to the file content in Zeff Cloud."""
+        value = self.__data.get("location")
+        return str(value) if value is not None else ""
+
+    def send(self, path, part_size: int = PART_SIZE, retries: int = 3):
+        """Send the content of the local file at ``path``.
+
+        Parts are sent from the first byte the server has not received,
+        and a failed part is retried from the server's received count
+        up to ``retries`` times.
+
+        :param path: Path to the local file.
+
+        :param part_size: Maximum number of bytes to send in one request.
+
+        :param retries: Number of consecutive failures allowed.
+
+        :raises ZeffCloudException: Exception in communication with Zeff
+            Cloud, including a failure to connect after ``retries``.
+        """
+        tag = "tag:zeff.com,2019-12:datasets/files"
+        stage = METRICS.stage("upload")
+        failures = 0
+        while not self.complete:
+            start = self.received
+            end = min(start + part_size, self.size)
+            headers = {
+                "Content-Type": "application/octet-stream",
+                "Content-Range": f"bytes {start}-{end - 1}/{self.size}",
+            }
+            LOGGER.debug("Send %s bytes %d-%d", self, start, end - 1)
+            sent = time.perf_counter_ns()
+            try:
+                resp = self.request(
+                    tag,
+                    method="PUT",
+                    data=read_chunks(path, start, end - start),
+                    headers=headers,
+                    dataset_id=self.dataset.dataset_id,
+                    file_id=self.file_id,
+                )
+            except requests.RequestException as err:
+                stage.error(err)
+                failures = failures + 1
+                if failures > retries:
+                    raise ZeffCloudException(
+                        err.response, type(self), self.file_id, "send"
+                    ) from err
+                stage.retry()
+                if EVENTS.active:
+                    EVENTS.emit(
+                        RetryScheduled(
+                            pathlib.Path(path).name,
+                            (time.perf_counter_ns() - sent) / 1e9,
+                            attempt=failures,
+                            error=str(err),
+                        )
+                    )
+                self.update()
+                continue
+            if resp.status_code not in [200, 201, 202, 308]:
+                stage.error(f"HTTP{resp.status_code}")
+                failures = failures + 1
+                if failures > retries:
+                    raise ZeffCloudException(resp, type(self), self.file_id, "send")
+                stage.retry()
+                if EVENTS.active:
+                    EVENTS.emit(
+                        RetryScheduled(
+                            pathlib.Path(path).name,
+                            (time.perf_counter_ns() - sent) / 1e9,
+                            attempt=failures,
+                            status=resp.status_code,
+                            error=resp.reason or "",
+                        )
+                    )
+                self.update()
+                continue
+            stage.observe(time.perf_counter_ns() - sent, nbytes=end - start)
+            failures = 0
+            self.__data = resp.json()["data"]
@@ -0,0 +1,649 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff Cloud stand-in server for testing."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+__all__ = ["MockZeffCloud", "MockZeffCloudServer"]
+
+import datetime
+import hashlib
+import http.server
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+from ..zeffcloud import ZeffCloudResourceMap
+
+LOGGER = logging.getLogger("zeffclient.mockserver")
+
+Response = Tuple[int, Any]
+
+
+def utcnow() -> datetime.datetime:
+    """Return the current UTC time without a timezone, as sent by Zeff Cloud."""
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def timestamp(offset: float = 0.0) -> str:
+    """Return ISO 8601 UTC timestamp ``offset`` seconds from now."""
+    now = utcnow() + datetime.timedelta(seconds=offset)
+    return now.isoformat()
+
+
+class MockZeffCloud:
+    """In-memory stand-in for the Zeff Cloud REST API.
+
+    Requests are routed with the anchors in ``zeffcloud.yml``, and the
+    datasets, records, files, models, and training sessions that are
+    created are kept in memory.
+
+    Each request is first delayed by ``latency`` (plus a random
+    ``jitter``), then may be throttled with ``429 Too Many Requests``
+    when more than ``rate_limit`` requests per second arrive, and may
+    fail with ``500 Internal Server Error`` at ``error_rate``. A
+    training session takes ``training_time`` seconds to progress from
+    queued to complete, with progress reported in whole percent.
+
+    ``GET`` responses have an ``ETag`` of their content, and a request
+    with a matching ``If-None-Match`` gets ``304 Not Modified``.
+
+    This object is safe to use from multiple server threads.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # pylint: disable=too-many-public-methods
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: float = 0.0,
+        training_time: float = 5.0,
+        seed: Optional[int] = None,
+    ):
+        """Create an empty Zeff Cloud.
+
+        :param latency: Seconds to delay every response.
+
+        :param jitter: Maximum additional random seconds of delay.
+
+        :param error_rate: Fraction [0, 1] of requests that fail.
+
+        :param rate_limit: Requests per second before responses are
+            throttled; zero is unlimited.
+
+        :param training_time: Seconds for a training session to complete.
+
+        :param seed: Seed of the random generator for reproducible
+            jitter and errors.
+        """
+        # pylint: disable=too-many-arguments
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.training_time = training_time
+        self.random = random.Random(seed)
+        self.datasets: Dict[str, dict] = {}
+        self.requests = 0
+        self.throttled = 0
+        self.failed = 0
+        self.not_modified = 0
+        self.__lock = threading.RLock()
+        self.__tokens = rate_limit
+        self.__refilled = time.monotonic()
+        self.__routes = []
+        for link in ZeffCloudResourceMap.default_info()["links"]:
+            pattern = re.sub(r"{(\w+)}", r"(?P<\1>[^/]+)", link["anchor"])
+            name = link["tag"].rsplit(":", 1)[1]
+            self.__routes.append((re.compile(f"^{pattern}$"), name, link["methods"]))
+
+    def route(self, method: str, path: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        """Return route name and URL variables of a request, or ``None``."""
+        for regex, name, methods in self.__routes:
+            match = regex.match(path)
+            if match and method in methods:
+                return name, match.groupdict()
+        return None
+
+    def handle(
+        self, method: str, path: str, headers, body: bytes, base_url: str = ""
+    ) -> Tuple[int, Dict[str, str], Any]:
+        """Handle a single request.
+
+        :return: Tuple of HTTP status, response headers, and the JSON
+            response object (or ``None`` for no body).
+        """
+        # pylint: disable=too-many-arguments
+        with self.__lock:
+            self.requests += 1
+            delay = self.latency + self.random.uniform(0.0, self.jitter)
+            fail = self.random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+
+        path = path.split("?", 1)[0]
+        route = self.route(method, path)
+        if route is None:
+            return 404, {}, {"message": f"No resource {method} {path}"}
+        if not headers.get("x-api-key"):
+            return 401, {}, {"message": "Missing x-api-key"}
+        if not self.__take_token():
+            with self.__lock:
+                self.throttled += 1
+            return 429, {"Retry-After": "1"}, {"message": "Too Many Requests"}
+        if fail:
+            with self.__lock:
+                self.failed += 1
+            return 500, {}, {"message": "Simulated failure"}
+
+        name, variables = route
+        name = re.sub(r"records_\w+", "records", name)
+        kind = None
+        match = re.match(r"datasets/(generic|temporal|geospatial)/add$", name)
+        if match:
+            name, kind = "datasets/add", match.group(1).upper()
+        handler = getattr(self, f"{name.replace('/', '_')}_{method.lower()}", None)
+        if handler is None:
+            return 501, {}, {"message": f"{name} {method} not implemented"}
+        request = {
+            "body": body,
+            "headers": headers,
+            "base_url": base_url.rstrip("/"),
+            "kind": kind,
+        }
+        try:
+            with self.__lock:
+                status, data = handler(request, **variables)
+        except KeyError as err:
+            return 404, {}, {"message": f"Not found {err}"}
+        except ValueError as err:
+            return 400, {}, {"message": str(err)}
+        if method != "GET" or status != 200:
+            return status, {}, data
+        content = json.dumps(data, sort_keys=True).encode("utf-8")
+        etag = f'"{hashlib.sha1(content).hexdigest()[:16]}"'
+        if headers.get("If-None-Match") == etag:
+            with self.__lock:
+                self.not_modified += 1
+            return 304, {"ETag": etag}, None
+        return status, {"ETag": etag}, data
+
+    def __take_token(self) -> bool:
+        if self.rate_limit <= 0:
+            return True
+        with self.__lock:
+            now = time.monotonic()
+            elapsed = now - self.__refilled
+            self.__refilled = now
+            self.__tokens = min(
+                self.rate_limit, self.__tokens + elapsed * self.rate_limit
+            )
+            if self.__tokens < 1.0:
+                return False
+            self.__tokens -= 1.0
+            return True
+
+    @staticmethod
+    def __json(request) -> Any:
+        return json.loads(request["body"].decode("utf-8") or "null")
+
+    ###
+    ### Datasets
+    ###
+
+    def datasets_list_get(self, request) -> Response:
+        """List all datasets."""
+        # pylint: disable=unused-argument
+        return 200, {"data": [self.dataset_data(d) for d in self.datasets.values()]}
+
+    def datasets_add_post(self, request) -> Response:
+        """Create a new dataset."""
+        body = self.__json(request) or {}
+        dataset_id = uuid.uuid4().hex
+        self.datasets[dataset_id] = {
+            "datasetId": dataset_id,
+            "datasetType": request["kind"],
+            "title": body.get("title", ""),
+            "description": body.get("description", ""),
+            "createdAt": timestamp(),
+            "updatedAt": timestamp(),
+            "records": {},
+            "files": {},
+            "models": {},
+            "training": None,
+        }
+        return 201, {"data": self.dataset_data(self.datasets[dataset_id])}
+
+    @staticmethod
+    def dataset_data(dataset: dict) -> dict:
+        """Return public representation of a dataset."""
+        keys = ["datasetId", "datasetType", "title", "description"]
+        keys += ["createdAt", "updatedAt"]
+        return {k: dataset[k] for k in keys}
+
+    def datasets_get(self, request, dataset_id) -> Response:
+        """Return a dataset."""
+        # pylint: disable=unused-argument
+        return 200, {"data": self.dataset_data(self.datasets[dataset_id])}
+
+    def datasets_delete(self, request, dataset_id) -> Response:
+        """Delete a dataset."""
+        # pylint: disable=unused-argument
+        del self.datasets[dataset_id]
+        return 200, None
+
+    def datasets_update_put(self, request, dataset_id) -> Response:
+        """Update dataset title or description."""
+        dataset = self.datasets[dataset_id]
+        body = self.__json(request) or {}
+        for key in ["title", "description"]:
+            if key in body:
+                dataset[key] = body[key]
+        dataset["updatedAt"] = timestamp()
+        return 200, {"data": self.dataset_data(dataset)}
+
+    def datasets_notifications_put(self, request, dataset_id) -> Response:
+        """Enable notifications of a dataset."""
+        # pylint: disable=unused-argument
+        self.datasets[dataset_id]["notifications"] = True
+        return 200, None
+
+    ###
+    ### Training
+    ###
+
+    def model_data(self, dataset: dict, version: int) -> dict:
+        """Return public representation of a model with current progress."""
+        model = self.datasets[dataset["datasetId"]]["models"][version]
+        elapsed = time.monotonic() - model["started"]
+        progress = min(elapsed / self.training_time, 1.0) if self.training_time else 1
+        progress = math.floor(progress * 100) / 100
+        if model["stopped"]:
+            status = "UNKNOWN"
+        elif progress >= 1.0:
+            status = "COMPLETE"
+        elif progress < 0.05:
+            status = "QUEUED"
+        elif progress < 0.1:
+            status = "STARTED"
+        else:
+            status = "PCT_COMPLETE"
+        if status == "COMPLETE" and model["completedAt"] is None:
+            model["completedAt"] = timestamp()
+        return {
+            "datasetId": dataset["datasetId"],
+            "version": version,
+            "comments": model["comments"],
+            "status": status,
+            "percentComplete": progress,
+            "createdAt": model["createdAt"],
+            "updatedAt": model["completedAt"]
+            or (
+                model["startedAt"]
+                + datetime.timedelta(seconds=progress * self.training_time)
+            ).isoformat(),
+        }
+
+    def datasets_train_get(self, request, dataset_id) -> Response:
+        """Return status of the current training session."""
+        # pylint: disable=unused-argument
+        dataset = self.datasets[dataset_id]
+        version = dataset["training"]
+        if version is None:
+            data = {"status": None, "percentComplete": None}
+            data.update(modelVersion=None, modelLocation=None)
+            data.update(createdAt=None, updatedAt=None)
+            return 200, {"data": data}
+        model = self.model_data(dataset, version)
+        location = f"{request['base_url']}/v2.6/datasets/{dataset_id}/models/{version}"
+        return (
+            200,
+            {
+                "data": {
+                    "status": model["status"],
+                    "percentComplete": model["percentComplete"],
+                    "modelVersion": version,
+                    "modelLocation": location,
+                    "createdAt": model["createdAt"],
+                    "updatedAt": model["updatedAt"],
+                }
+            },
+        )
+
+    def datasets_train_put(self, request, dataset_id) -> Response:
+        """Start a new training session."""
+        # pylint: disable=unused-argument
+        dataset = self.datasets[dataset_id]
+        version = len(dataset["models"]) + 1
+        dataset["models"][version] = {
+            "started": time.monotonic(),
+            "startedAt": utcnow(),
+            "stopped": False,
+            "comments": "",
+            "createdAt": timestamp(),
+            "completedAt": None,
+            "records": {},
+        }
+        dataset["training"] = version
+        return 202, None
+
+    def datasets_train_delete(self, request, dataset_id) -> Response:
+        """Stop the current training session."""
+        # pylint: disable=unused-argument
+        dataset = self.datasets[dataset_id]
+        if dataset["training"] is not None:
+            model = dataset["models"][dataset["training"]]
+            if model["completedAt"] is None:
+                model["stopped"] = True
+        return 200, None
+
+    ###
+    ### Models
+    ###
+
+    def models_list_get(self, request, dataset_id) -> Response:
+        """List all models of a dataset."""
+        # pylint: disable=unused-argument
+        dataset = self.datasets[dataset_id]
+        return 200, {"data": [self.model_data(dataset, v) for v in dataset["models"]]}
+
+    def models_get(self, request, dataset_id, version) -> Response:
+        """Return a model."""
+        # pylint: disable=unused-argument
+        return 200, {"data": self.model_data(self.datasets[dataset_id], int(version))}
+
+    def models_put(self, request, dataset_id, version) -> Response:
+        """Update model comments."""
+        dataset = self.datasets[dataset_id]
+        body = self.__json(request) or {}
+        dataset["models"][int(version)]["comments"] = body.get("comments", "")
+        return 200, {"data": self.model_data(dataset, int(version))}
+
+    ###
+    ### Records
+    ###
+
+    def __add_records(self, request, records: dict, dataset_id, predict=False):
+        body = self.__json(request)
+        if not isinstance(body, dict) or not isinstance(body.get("batch"), list):
+            raise ValueError("Request body must have a batch of records")
+        ret = []
+        for item in body["batch"]:
+            record_id = uuid.uuid4().hex
+            predictions = []
+            if predict:
+                predictions = [
+                    {"name": sd["name"], "value": self.random.random()}
+                    for sd in item.get("structuredData", [])
+                    if sd.get("target") == "YES"
+                ]
+            records[record_id] = {
+                "recordId": record_id,
+                "datasetId": dataset_id,
+                "name": item.get("name", {}).get("uniqueName"),
+                "recordData": {
+                    "structuredData": item.get("structuredData", []),
+                    "unstructuredData": item.get("unstructuredData", []),
+                },
+                "createdAt": timestamp(),
+                "updatedAt": timestamp(),
+                "predictions": predictions,
+                "errors": [],
+            }
+            ret.append({"recordId": record_id, "location": f"records/{record_id}"})
+        return 201, {"data": ret}
+
+    def records_list_get(self, request, dataset_id) -> Response:
+        """List all records of a dataset."""
+        # pylint: disable=unused-argument
+        records = self.datasets[dataset_id]["records"].values()
+        return 200, {"data": [{"recordId": r["recordId"]} for r in records]}
+
+    def records_add_post(self, request, dataset_id) -> Response:
+        """Add a batch of records to a dataset."""
+        records = self.datasets[dataset_id]["records"]
+        return self.__add_records(request, records, dataset_id)
+
+    def records_get(self, request, dataset_id, record_id) -> Response:
+        """Return a record."""
+        # pylint: disable=unused-argument
+        return 200, {"data": self.datasets[dataset_id]["records"][record_id]}
+
+    def records_put(self, request, dataset_id, record_id) -> Response:
+        """Replace the data of a record."""
+        record = self.datasets[dataset_id]["records"][record_id]
+        item = self.__json(request) or {}
+        for key in ["structuredData", "unstructuredData"]:
+            record["recordData"][key] = item.get(key, [])
+        record["updatedAt"] = timestamp()
+        return 200, {"data": record}
+
+    def records_delete(self, request, dataset_id, record_id) -> Response:
+        """Delete a record."""
+        # pylint: disable=unused-argument
+        del self.datasets[dataset_id]["records"][record_id]
+        return 200, None
+
+    def models_records_list_get(self, request, dataset_id, version) -> Response:
+        """List all records of a model."""
+        # pylint: disable=unused-argument
+        records = self.datasets[dataset_id]["models"][int(version)]["records"]
+        return 200, {"data": [{"recordId": r} for r in records]}
+
+    def models_records_add_post(self, request, dataset_id, version) -> Response:
+        """Add a batch of records to a model for prediction."""
+        dataset = self.datasets[dataset_id]
+        if self.model_data(dataset, int(version))["status"] != "COMPLETE":
+            return 409, {"message": "Model training incomplete"}
+        records = dataset["models"][int(version)]["records"]
+        return self.__add_records(request, records, dataset_id, predict=True)
+
+    def models_records_get(self, request, dataset_id, version, record_id) -> Response:
+        """Return a model record with its predictions."""
+        # pylint: disable=unused-argument
+        model = self.datasets[dataset_id]["models"][int(version)]
+        return 200, {"data": model["records"][record_id]}
+
+    def models_records_delete(
+        self, request, dataset_id, version, record_id
+    ) -> Response:
+        """Delete a model record."""
+        # pylint: disable=unused-argument
+        del self.datasets[dataset_id]["models"][int(version)]["records"][record_id]
+        return 200, None
+
+    ###
+    ### Files
+    ###
+
+    def datasets_files_add_post(self, request, dataset_id) -> Response:
+        """Start a new file upload."""
+        files = self.datasets[dataset_id]["files"]
+        body = self.__json(request) or {}
+        file_id = uuid.uuid4().hex
+        location = f"{request['base_url']}/v2.6/datasets/{dataset_id}/files/{file_id}"
+        files[file_id] = {
+            "fileId": file_id,
+            "name": body.get("name"),
+            "fileType": body.get("fileType"),
+            "size": int(body.get("size", 0)),
+            "location": location,
+            "content": bytearray(),
+        }
+        return 201, {"data": self.file_data(files[file_id])}
+
+    @staticmethod
+    def file_data(file: dict) -> dict:
+        """Return public representation of a file."""
+        data = {k: v for k, v in file.items() if k != "content"}
+        data["received"] = len(file["content"])
+        return data
+
+    def datasets_files_get(self, request, dataset_id, file_id) -> Response:
+        """Return upload status of a file."""
+        # pylint: disable=unused-argument
+        return 200, {
+            "data": self.file_data(self.datasets[dataset_id]["files"][file_id])
+        }
+
+    def datasets_files_put(self, request, dataset_id, file_id) -> Response:
+        """Receive a byte range of a file."""
+        file = self.datasets[dataset_id]["files"][file_id]
+        match = re.match(
+            r"bytes (\d+)-(\d+)/(\d+)", request["headers"].get("Content-Range", "")
+        )
+        if not match:
+            raise ValueError("Content-Range is required")
+        start = int(match.group(1))
+        if start > len(file["content"]):
+            return 416, {"data": self.file_data(file)}
+        del file["content"][start:]
+        file["content"].extend(request["body"])
+        complete = len(file["content"]) >= file["size"]
+        return (201 if complete else 308), {"data": self.file_data(file)}
+
+    def datasets_files_delete(self, request, dataset_id, file_id) -> Response:
+        """Delete a file."""
+        # pylint: disable=unused-argument
+        del self.datasets[dataset_id]["files"][file_id]
+        return 200, None
+
+
+class MockZeffCloudHandler(http.server.BaseHTTPRequestHandler):
+    """HTTP request handler that delegates to the server's ``MockZeffCloud``."""
+
+    protocol_version = "HTTP/1.1"
+
+    # Headers and body are separate writes, which on a kept alive
+    # connection would otherwise wait on the client's delayed ACK.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Handle GET request."""
+        self.__handle("GET")
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Handle POST request."""
+        self.__handle("POST")
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        """Handle PUT request."""
+        self.__handle("PUT")
+
+    def do_DELETE(self):  # pylint: disable=invalid-name
+        """Handle DELETE request."""
+        self.__handle("DELETE")
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Log requests to the debug log instead of stderr."""
+        LOGGER.debug(format, *args)
+
+    def __read_body(self) -> bytes:
+        if "chunked" in self.headers.get("Transfer-Encoding", ""):
+            body = bytearray()
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                if size == 0:
+                    while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    return bytes(body)
+                body.extend(self.rfile.read(size))
+                self.rfile.readline()
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def __handle(self, method: str):
+        body = self.__read_body()
+        host = self.headers.get("Host", "%s:%d" % self.server.server_address[:2])
+        status, headers, data = self.server.cloud.handle(
+            method, self.path, self.headers, body, base_url=f"http://{host}"
+        )
+        payload = json.dumps(data).encode("utf-8") if data is not None else b""
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class MockZeffCloudServer(http.server.ThreadingHTTPServer):
+    """HTTP server of a ``MockZeffCloud``.
+
+    Use as a context manager to serve from a background thread::
+
+        with MockZeffCloudServer(cloud=MockZeffCloud(latency=0.05)) as server:
+            uploader = Uploader(records, server.url, "org", "user", dataset_id)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), cloud: MockZeffCloud = None):
+        """Create a new server.
+
+        :param address: Host and port to listen on; port 0 picks a free port.
+
+        :param cloud: The stand-in Zeff Cloud; the default is a new one
+            with no latency or errors.
+        """
+        super().__init__(address, MockZeffCloudHandler)
+        self.cloud = cloud if cloud is not None else MockZeffCloud()
+        self.__thread = None
+
+    @property
+    def url(self) -> str:
+        """Return root URL of the server for ``--server-url``."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        """Start serving in a background thread."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop serving and close the server."""
+        self.stop()
+        self.server_close()
+
+    def start(self):
+        """Start serving in a background thread."""
+        self.__thread = threading.Thread(
+            target=self.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="zeff-mockserver",
+            daemon=True,
+        )
+        self.__thread.start()
+
+    def stop(self):
+        """Stop serving in the background thread."""
+        if self.__thread is not None:
+            self.shutdown()
+            self.__thread.join()
+            self.__thread = None
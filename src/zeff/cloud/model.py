@@ -28,7 +28,6 @@ from .resource import Resource
 from .record import Record
 from .training import TrainingStatus
 
-
 LOGGER = logging.getLogger("zeffclient.record.uploader")
 
 
@@ -104,11 +103,16 @@ class Model(Resource):
 
         :raises ZeffCloudException: Exception in communication with Zeff Cloud.
         """
-        tag = self.dataset.dataset_type.model_list_tag
-        resp = self.request(tag, dataset_id=self.dataset.dataset_id)
+        tag = self.dataset.dataset_type.model_records_list_tag
+        resp = self.request(
+            tag, dataset_id=self.dataset.dataset_id, version=self.version
+        )
         if resp.status_code not in [200]:
             raise ZeffCloudException(resp, type(self), self.version, "list records")
-        return (Record(self, d["recordId"]) for d in resp.json().get("data", []))
+        return (
+            Record(self.dataset, d["recordId"], model=self)
+            for d in resp.json().get("data", [])
+        )
 
     def add_record(self, record):
         """Add a record to this model.
@@ -121,4 +125,4 @@ class Model(Resource):
             raise ZeffCloudModelException("Model training incomplete", model=self)
         tag = self.dataset.dataset_type.model_record_add_tag
         data = self.add_resource(record, record.name, "recordId", tag)
-        return Record(self, data["recordId"])
+        return Record(self.dataset, data["recordId"], model=self)
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff Cloud concurrent training monitor."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+__all__ = ["TrainingMonitor"]
+
+import heapq
+import itertools
+import logging
+import time
+import concurrent.futures
+from typing import Callable, Dict, Iterable, Optional, Set
+import requests
+from .dataset import Dataset
+from .exception import ZeffCloudException
+from .training import TrainingPoller, TrainingSessionInfo, TrainingStatus
+
+LOGGER = logging.getLogger("zeffclient.cloud.monitor")
+
+
+class TrainingMonitor:
+    """Monitor the training sessions of several datasets concurrently.
+
+    Each dataset is polled on its own adaptive ``TrainingPoller``
+    schedule, and polls are sent from a small thread pool that shares
+    the pooled ``Resource`` session. Polls for all datasets are spaced
+    at least ``1 / max_rate`` seconds apart, so the total request rate
+    stays bounded however many datasets are monitored, and the first
+    polls are staggered rather than sent in a burst.
+    """
+
+    def __init__(
+        self,
+        datasets: Iterable,
+        max_rate: float = 10.0,
+        max_workers: int = 4,
+        poller: Callable[[], TrainingPoller] = TrainingPoller,
+    ):
+        """Create a new monitor.
+
+        :param datasets: The ``Dataset`` objects to monitor.
+
+        :param max_rate: Maximum status requests per second for all
+            datasets together.
+
+        :param max_workers: Maximum concurrent status requests.
+
+        :param poller: Factory for the poller of each dataset.
+        """
+        self.datasets = {d.dataset_id: d for d in datasets}
+        self.max_rate = max_rate
+        self.max_workers = max_workers
+        self.poller = poller
+        self.status: Dict[str, Optional[TrainingSessionInfo]] = {
+            i: None for i in self.datasets
+        }
+        self.expired: Set[str] = set()
+
+    def __fetch(self, dataset_id):
+        return self.datasets[dataset_id].fetch_training_status(self.status[dataset_id])
+
+    def poll(self) -> Dict[str, TrainingSessionInfo]:
+        """Fetch the status of every dataset once and return them."""
+        self.wait(timeout=None, once=True)
+        return dict(self.status)
+
+    def wait(
+        self,
+        timeout: float = None,
+        callback: Callable[[str, TrainingSessionInfo], None] = None,
+        once: bool = False,
+        queued_timeout: float = Dataset.QUEUED_TIMEOUT,
+    ) -> Dict[str, TrainingSessionInfo]:
+        """Poll until every dataset has finished training.
+
+        A dataset has finished when its training is complete or its
+        session was stopped (see ``TrainingPoller.finished``). A
+        failed poll is logged and retried on the dataset's schedule.
+
+        :param timeout: Seconds to wait; default is until all finish.
+            When the timeout expires the latest statuses are returned,
+            so check them for datasets that are not complete.
+
+        :param callback: Called with the dataset id and status each
+            time a dataset's status changes.
+
+        :param once: Poll each dataset once then return.
+
+        :param queued_timeout: Maximum seconds a dataset's training may
+            stay queued or not be found (see
+            ``Dataset.wait_for_training``), even without a ``timeout``.
+            Polling of the dataset then stops and its id is added to
+            ``expired``. ``None`` waits until it starts.
+
+        :return: Latest status of each dataset by dataset id.
+        """
+        # pylint: disable=too-many-locals
+        spacing = 1.0 / self.max_rate
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        pollers = {i: self.poller() for i in self.datasets}
+        waiting = (TrainingStatus.queued, TrainingStatus.unknown)
+        not_started: Dict[str, float] = {}
+        self.expired = set()
+        order = itertools.count()
+        schedule = [(start, next(order), i) for i in self.datasets]
+        next_slot = start
+        running = {}
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="zeff-monitor"
+        ) as executor:
+            while schedule or running:
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    for future in running:
+                        future.cancel()
+                    break
+                if (
+                    schedule
+                    and len(running) < self.max_workers
+                    and schedule[0][0] <= now
+                    and next_slot <= now
+                ):
+                    _, _, dataset_id = heapq.heappop(schedule)
+                    running[executor.submit(self.__fetch, dataset_id)] = dataset_id
+                    next_slot = max(next_slot, now) + spacing
+                    continue
+
+                wakeups = [] if deadline is None else [deadline]
+                if schedule and len(running) < self.max_workers:
+                    wakeups.append(max(schedule[0][0], next_slot))
+                wait = max(min(wakeups) - now, 0.0) if wakeups else None
+                done, _ = concurrent.futures.wait(
+                    running,
+                    timeout=wait,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                for future in done:
+                    dataset_id = running.pop(future)
+                    poller = pollers[dataset_id]
+                    previous = self.status[dataset_id]
+                    try:
+                        info = future.result()
+                    except (ZeffCloudException, requests.RequestException) as err:
+                        LOGGER.warning("Training status of %s: %s", dataset_id, err)
+                        info = previous
+                    else:
+                        self.status[dataset_id] = info
+                        if info is not previous and callback is not None:
+                            callback(dataset_id, info)
+                    if once or (info is not None and poller.finished(info)):
+                        continue
+                    now = time.monotonic()
+                    delay = poller.interval(info, now) if info else poller.maximum
+                    if info is not None and info.status not in waiting:
+                        not_started.pop(dataset_id, None)
+                    elif queued_timeout is not None:
+                        since = not_started.setdefault(dataset_id, now)
+                        remaining = since + queued_timeout - now
+                        if remaining <= 0:
+                            LOGGER.warning(
+                                "Training of %s not started after %s seconds",
+                                dataset_id,
+                                queued_timeout,
+                            )
+                            self.expired.add(dataset_id)
+                            continue
+                        delay = min(delay, remaining)
+                    heapq.heappush(schedule, (now + delay, next(order), dataset_id))
+        return dict(self.status)
@@ -32,7 +32,7 @@ LOGGER = logging.getLogger("zeffclient.record.uploader")
 class Record(Resource):
     """Zeff Cloud Record access."""
 
-    def __init__(self, dataset, record_id: str):
+    def __init__(self, dataset, record_id: str, model=None):
         """Initialize a record resource access.
 
         :param dataset: The containing Dataset.
@@ -40,10 +40,14 @@ class Record(Resource):
         :param record_id: The unique recordId of the record in the Zeff
             Cloud API.
 
+        :param model: The containing Model if this is a record sent to
+            a model for prediction.
+
         :raises ZeffCloudException: Exception in communication with Zeff Cloud.
         """
         super().__init__(dataset.resource_map)
         self.dataset = dataset
+        self.model = model
         self.__record_id = record_id
         self.update()
 
@@ -53,9 +57,17 @@ class Record(Resource):
 
     def update(self):
         """Update record information from Zeff Cloud."""
-        tag = self.dataset.dataset_type.record_tag
+        if self.model is None:
+            tag = self.dataset.dataset_type.record_tag
+            kwargs = {}
+        else:
+            tag = self.dataset.dataset_type.model_record_tag
+            kwargs = {"version": self.model.version}
         resp = self.request(
-            tag, dataset_id=self.dataset.dataset_id, record_id=self.__record_id
+            tag,
+            dataset_id=self.dataset.dataset_id,
+            record_id=self.__record_id,
+            **kwargs,
         )
         if resp.status_code not in [200]:
             raise ZeffCloudException(resp, type(self), self.__record_id, "load")
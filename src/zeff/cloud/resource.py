@@ -25,8 +25,14 @@ import logging
 import re
 import json
 import importlib
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from .exception import ZeffCloudException
+from ..metrics import METRICS
+from ..pipeline_events import EVENTS, RecordUploaded, UploadFailed
+from ..tracing import TRACER
 
 LOGGER = logging.getLogger("zeffclient.record.uploader")
 
@@ -36,6 +42,30 @@ class Resource:
 
     # pylint: disable=too-few-public-methods
 
+    POOL_SIZE = 16
+
+    __session = None
+    __session_lock = threading.Lock()
+
+    @classmethod
+    def session(cls) -> requests.Session:
+        """Return the HTTP session shared by all resources.
+
+        The session keeps connections to Zeff Cloud open between
+        requests, so only the first request to a server pays for the
+        connection and TLS handshake.
+        """
+        with Resource.__session_lock:
+            if Resource.__session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=cls.POOL_SIZE, pool_maxsize=cls.POOL_SIZE
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                Resource.__session = session
+        return Resource.__session
+
     @classmethod
     def snake_case(cls, name):
         """Convert camel case `name` to snake case."""
@@ -84,7 +114,9 @@ class Resource:
         if headers:
             reqhdrs.update(headers)
 
-        resp = requests.request(method, url, data=data, headers=reqhdrs)
+        with TRACER.span("request", method=method, url=url) as args:
+            resp = self.session().request(method, url, data=data, headers=reqhdrs)
+            args["status"] = resp.status_code
         return resp
 
     def add_resource(self, rsrc, rsrc_name, rsrc_id_name, tag, **kwargs):
@@ -125,18 +157,62 @@ class Resource:
             f"{rsrc_type}Encoder",
         )
         batch = {"batch": [rsrc]}
-        resp = self.request(
-            tag,
-            method="POST",
-            data=json.dumps(batch, cls=encoder),
-            **res_vars,
-            **kwargs,
-        )
+        start = time.perf_counter_ns()
+        payload = json.dumps(batch, cls=encoder)
+        encoded = time.perf_counter_ns()
+        METRICS.stage("encode").observe(encoded - start)
+        if TRACER.enabled:
+            TRACER.add("encode", rsrc_name, start, encoded, size=len(payload))
+
+        upload = METRICS.stage("upload")
+        try:
+            with TRACER.record(rsrc_name):
+                resp = self.request(
+                    tag, method="POST", data=payload, **res_vars, **kwargs
+                )
+        except requests.RequestException as err:
+            upload.error(err)
+            if EVENTS.active:
+                EVENTS.emit(
+                    UploadFailed(
+                        rsrc_name,
+                        (time.perf_counter_ns() - encoded) / 1e9,
+                        size=len(payload),
+                        error=str(err),
+                    )
+                )
+            raise
+        elapsed = time.perf_counter_ns() - encoded
+        upload.observe(elapsed, nbytes=len(payload))
         if resp.status_code not in [200, 201]:
+            upload.error(f"HTTP{resp.status_code}")
+            if EVENTS.active:
+                EVENTS.emit(
+                    UploadFailed(
+                        rsrc_name,
+                        elapsed / 1e9,
+                        size=len(payload),
+                        status=resp.status_code,
+                        error=resp.reason or "",
+                    )
+                )
             raise ZeffCloudException(
                 resp, type(self), rsrc_name, f"add {type(rsrc).__name__}"
             )
+        parse = time.perf_counter_ns()
         data = resp.json()["data"][0]
+        if TRACER.enabled:
+            TRACER.add("parse", rsrc_name, parse, time.perf_counter_ns())
+        if EVENTS.active:
+            EVENTS.emit(
+                RecordUploaded(
+                    rsrc_name,
+                    elapsed / 1e9,
+                    size=len(payload),
+                    status=resp.status_code,
+                    record_id=data.get(rsrc_id_name),
+                )
+            )
         LOGGER.info(
             """End upload %s %s: recordId = %s location = %s""",
             rsrc_type,
@@ -25,6 +25,7 @@ import enum
 import datetime
 import logging
 import json
+import time
 
 
 class TrainingStatus(enum.Enum):
@@ -48,13 +49,20 @@ class TrainingStatus(enum.Enum):
 class TrainingSessionInfo:
     """Information about the current training session."""
 
-    def __init__(self, status_json):
+    def __init__(self, status_json, etag=None, last_modified=None):
         """Create a new training information.
 
         :param status_json: The status JSON returned from a train
             status request.
+
+        :param etag: The ``ETag`` header of the response, if any.
+
+        :param last_modified: The ``Last-Modified`` header of the
+            response, if any.
         """
         self.__data = status_json
+        self.etag = etag
+        self.last_modified = last_modified
         logging.debug("Training Session JSON: \n%s", self.__data_str())
 
     def __data_str(self):
@@ -104,3 +112,82 @@ class TrainingSessionInfo:
         else:
             ret = self.created_timestamp
         return ret
+
+    def same_session(self, other: "TrainingSessionInfo") -> bool:
+        """Return true if ``other`` is a status of the same session.
+
+        Sessions are identified by model version and creation time.
+        """
+        return (
+            self.model_version == other.model_version
+            and self.created_timestamp == other.created_timestamp
+        )
+
+
+class TrainingPoller:
+    """Adaptive interval between polls of training status.
+
+    The interval starts at ``minimum`` and each poll that shows no
+    change in status or progress multiplies it by ``backoff`` up to
+    ``maximum``. When progress advances the rate of progress is used
+    to estimate the time to completion and the next poll is at half
+    of that estimate, so polls tighten as training nears completion.
+    """
+
+    def __init__(self, minimum: float = 0.5, maximum: float = 30.0, backoff=1.5):
+        """Create a new poller.
+
+        :param minimum: Shortest interval in seconds.
+
+        :param maximum: Longest interval in seconds.
+
+        :param backoff: Factor the interval grows by while unchanged.
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.__interval = minimum
+        self.__last = None
+        self.__started = False
+
+    def reset(self):
+        """Forget previous polls."""
+        self.__interval = self.minimum
+        self.__last = None
+        self.__started = False
+
+    def finished(self, info: TrainingSessionInfo) -> bool:
+        """Return true if polling may stop after ``info``.
+
+        Polling stops when training is complete, or when the status
+        becomes ``unknown`` after a session was seen (i.e. training
+        was stopped).
+        """
+        if info.status is TrainingStatus.complete:
+            return True
+        if info.status is TrainingStatus.unknown:
+            return self.__started
+        self.__started = True
+        return False
+
+    def interval(self, info: TrainingSessionInfo, now: float = None) -> float:
+        """Return seconds to wait before the poll after ``info``.
+
+        :param info: Training status returned by the latest poll.
+
+        :param now: Monotonic time of the latest poll; default is now.
+        """
+        now = time.monotonic() if now is None else now
+        state = (info.status, info.progress)
+        if self.__last is not None and state == self.__last[0]:
+            self.__interval = min(self.__interval * self.backoff, self.maximum)
+            return self.__interval
+        self.__interval = self.minimum
+        if self.__last is not None:
+            (_, progress), then = self.__last
+            if info.progress > progress and now > then:
+                rate = (info.progress - progress) / (now - then)
+                remaining = (1.0 - info.progress) / rate
+                self.__interval = min(max(remaining / 2, self.minimum), self.maximum)
+        self.__last = (state, now)
+        return self.__interval
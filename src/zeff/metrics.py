@@ -0,0 +1,585 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff record pipeline metrics.
+
+Each stage of the record pipeline (``generate``, ``build``,
+``validate``, ``encode``, and ``upload``) records the number of events,
+a latency histogram, bytes sent, retries, and errors by class in the
+default registry ``METRICS``.
+
+Recording an event is a few integer operations on a per-thread
+histogram with no lock, so instrumentation may be left on in
+production.
+
+When stages run in their own threads (see ``zeff.pipeline_runtime``)
+the depth of each bounded queue between stages is also recorded.
+"""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+__all__ = [
+    "METRICS",
+    "Histogram",
+    "StageMetrics",
+    "QueueMetrics",
+    "MetricsRegistry",
+    "PrometheusWriter",
+]
+
+import os
+import json
+import threading
+import weakref
+from collections import deque
+from typing import Dict, List
+
+STAGES = ["generate", "build", "validate", "encode", "upload"]
+
+
+class Histogram:
+    """Fixed memory log-linear histogram of non-negative integers.
+
+    Values are placed in buckets where each power of two range is
+    divided into ``2**sub_bits`` linear sub-buckets, which gives a
+    relative error of at most ``2**-sub_bits`` (about 6% with the
+    default) for any recorded value, in the manner of an HDR
+    histogram. Values larger than ``2**max_bits`` are recorded in the
+    last bucket.
+
+    Latencies are recorded in nanoseconds.
+    """
+
+    def __init__(self, sub_bits: int = 4, max_bits: int = 40):
+        """Create an empty histogram."""
+        self.sub_bits = sub_bits
+        self.max_bits = max_bits
+        self.counts: List[int] = [0] * self.index(2**max_bits - 1) + [0]
+        self.count = 0
+        self.total = 0
+        self.minimum = 0
+        self.maximum = 0
+
+    def index(self, value: int) -> int:
+        """Return bucket index for ``value``."""
+        bits = value.bit_length() - self.sub_bits - 1
+        if bits <= 0:
+            return value
+        return (bits << self.sub_bits) + (value >> bits)
+
+    def value(self, index: int) -> int:
+        """Return smallest value that is placed in bucket ``index``."""
+        if index < (2 << self.sub_bits):
+            return index
+        bits = (index >> self.sub_bits) - 1
+        return ((index & ((1 << self.sub_bits) - 1)) | (1 << self.sub_bits)) << bits
+
+    def record(self, value: int, count: int = 1):
+        """Record ``count`` occurrences of ``value``."""
+        index = self.index(value)
+        if index >= len(self.counts):
+            index = len(self.counts) - 1
+        self.counts[index] += count
+        if self.count == 0 or value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        self.count += count
+        self.total += value * count
+
+    def percentile(self, percent: float) -> int:
+        """Return approximate value at ``percent`` [0, 100] of recorded values."""
+        if self.count == 0:
+            return 0
+        rank = max(1, int(round(self.count * percent / 100.0)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                low = self.value(index)
+                high = self.value(index + 1)
+                return min(max((low + high - 1) // 2, self.minimum), self.maximum)
+        return self.maximum
+
+    def merge(self, other: "Histogram"):
+        """Add all values recorded in ``other`` to this histogram."""
+        if other.count == 0:
+            return
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        if self.count == 0 or other.minimum < self.minimum:
+            self.minimum = other.minimum
+        self.maximum = max(self.maximum, other.maximum)
+        self.count += other.count
+        self.total += other.total
+
+    def mean(self) -> float:
+        """Return mean of recorded values."""
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> dict:
+        """Return a dictionary of all recorded values for ``from_dict``."""
+        return {
+            "sub_bits": self.sub_bits,
+            "max_bits": self.max_bits,
+            "counts": {str(i): c for i, c in enumerate(self.counts) if c},
+            "count": self.count,
+            "total": self.total,
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Histogram":
+        """Return a histogram of values from ``to_dict``."""
+        ret = cls(data["sub_bits"], data["max_bits"])
+        for index, count in data["counts"].items():
+            ret.counts[int(index)] = count
+        ret.count = data["count"]
+        ret.total = data["total"]
+        ret.minimum = data["minimum"]
+        ret.maximum = data["maximum"]
+        return ret
+
+    def reset(self):
+        """Remove all recorded values."""
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0
+        self.minimum = 0
+        self.maximum = 0
+
+
+class _ThreadToken:
+    """Object held only by a thread's local storage of a stage.
+
+    It is released when the thread exits, which retires the thread's
+    shard of the stage.
+    """
+
+    __slots__ = ["__weakref__"]
+
+
+class StageMetrics:
+    """Metrics of a single pipeline stage.
+
+    Latency and bytes are recorded without a lock into a shard owned
+    by the recording thread, and shards are merged when a snapshot is
+    taken. When a thread exits its shard is merged into a retired
+    total, so the number of shards is bounded by the number of live
+    threads. Errors and retries are rare so they are recorded under a
+    lock.
+    """
+
+    def __init__(self, name: str):
+        """Create empty metrics for stage ``name``."""
+        self.name = name
+        self.retries = 0
+        self.errors: Dict[str, int] = {}
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        self.__shards: List[Histogram] = []
+        self.__retired = Histogram()
+        self.__retired.bytes = 0
+        self.__exited: "deque[Histogram]" = deque()
+
+    def __shard(self) -> Histogram:
+        shard = Histogram()
+        shard.bytes = 0
+        token = _ThreadToken()
+        weakref.finalize(token, self.__retire, shard).atexit = False
+        with self.__lock:
+            self.__collect()
+            self.__shards.append(shard)
+        self.__local.shard = shard
+        self.__local.token = token
+        return shard
+
+    def __retire(self, shard: Histogram):
+        """Queue the shard of an exited thread to be retired.
+
+        This may be called by garbage collection on any thread, even
+        one holding the lock, so it only appends to a deque.
+        """
+        self.__exited.append(shard)
+
+    def __collect(self):
+        """Merge shards of exited threads into the retired total.
+
+        The lock must be held.
+        """
+        while self.__exited:
+            shard = self.__exited.popleft()
+            self.__retired.merge(shard)
+            self.__retired.bytes += shard.bytes
+            self.__shards.remove(shard)
+
+    def __all_shards(self) -> List[Histogram]:
+        with self.__lock:
+            self.__collect()
+            return [self.__retired] + self.__shards
+
+    @property
+    def shards(self) -> int:
+        """Return number of shards of live threads."""
+        with self.__lock:
+            self.__collect()
+            return len(self.__shards)
+
+    @property
+    def latency(self) -> Histogram:
+        """Return latency histogram merged from all threads."""
+        ret = Histogram()
+        for shard in self.__all_shards():
+            ret.merge(shard)
+        return ret
+
+    @property
+    def bytes(self) -> int:
+        """Return total bytes sent by this stage."""
+        return sum(shard.bytes for shard in self.__all_shards())
+
+    @property
+    def count(self) -> int:
+        """Return number of events in this stage."""
+        return sum(shard.count for shard in self.__all_shards())
+
+    def observe(self, nanoseconds: int, count: int = 1, nbytes: int = 0):
+        """Record ``count`` events that each took ``nanoseconds``.
+
+        :param nbytes: Total bytes sent by the events.
+        """
+        # Inlined ``Histogram.record`` to keep recording well under 1µs.
+        try:
+            hist = self.__local.shard
+        except AttributeError:
+            hist = self.__shard()
+        bits = nanoseconds.bit_length() - hist.sub_bits - 1
+        index = (
+            nanoseconds
+            if bits <= 0
+            else (bits << hist.sub_bits) + (nanoseconds >> bits)
+        )
+        counts = hist.counts
+        if index < len(counts):
+            counts[index] += count
+        else:
+            counts[-1] += count
+        if nanoseconds > hist.maximum:
+            hist.maximum = nanoseconds
+        if nanoseconds < hist.minimum or not hist.count:
+            hist.minimum = nanoseconds
+        hist.count += count
+        hist.total += nanoseconds * count
+        hist.bytes += nbytes
+
+    def error(self, err):
+        """Record an error; ``err`` is an exception or an error class name."""
+        name = err if isinstance(err, str) else type(err).__name__
+        with self.__lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def retry(self, count: int = 1):
+        """Record ``count`` retried operations."""
+        with self.__lock:
+            self.retries += count
+
+    def snapshot(self) -> dict:
+        """Return a dictionary of the stage metrics."""
+        hist = self.latency
+        with self.__lock:
+            retries = self.retries
+            errors = dict(self.errors)
+        return {
+            "count": hist.count,
+            "bytes": self.bytes,
+            "retries": retries,
+            "errors": errors,
+            "latency_ns": {
+                "min": hist.minimum,
+                "mean": hist.mean(),
+                "p50": hist.percentile(50),
+                "p90": hist.percentile(90),
+                "p99": hist.percentile(99),
+                "max": hist.maximum,
+                "sum": hist.total,
+            },
+        }
+
+    def dump(self) -> dict:
+        """Return a dictionary of all recorded metrics for ``merge``."""
+        hist = self.latency
+        nbytes = self.bytes
+        with self.__lock:
+            return {
+                "latency": hist.to_dict(),
+                "bytes": nbytes,
+                "retries": self.retries,
+                "errors": dict(self.errors),
+            }
+
+    def merge(self, data: dict):
+        """Add metrics from ``dump`` (e.g. of another process) to this stage."""
+        shard = Histogram.from_dict(data["latency"])
+        with self.__lock:
+            self.__retired.merge(shard)
+            self.__retired.bytes += data["bytes"]
+            self.retries += data["retries"]
+            for name, count in data["errors"].items():
+                self.errors[name] = self.errors.get(name, 0) + count
+
+    def reset(self):
+        """Remove all recorded metrics."""
+        with self.__lock:
+            self.__collect()
+            for shard in [self.__retired] + self.__shards:
+                shard.reset()
+                shard.bytes = 0
+            self.retries = 0
+            self.errors = {}
+
+
+class QueueMetrics:
+    """Depth of a bounded queue between pipeline stages.
+
+    The depth is sampled each time an item is put on the queue, so a
+    queue that is usually full shows a slow downstream stage and a
+    queue that is usually empty shows a slow upstream stage.
+    """
+
+    def __init__(self, name: str, capacity: int = 0):
+        """Create empty metrics for queue ``name`` of ``capacity`` items."""
+        self.name = name
+        self.capacity = capacity
+        self.depth = Histogram(max_bits=20)
+        self.__lock = threading.Lock()
+
+    def observe(self, depth: int):
+        """Record a sample of the queue depth."""
+        with self.__lock:
+            self.depth.record(depth)
+
+    def snapshot(self) -> dict:
+        """Return a dictionary of the queue metrics."""
+        with self.__lock:
+            depth = self.depth
+            return {
+                "capacity": self.capacity,
+                "samples": depth.count,
+                "mean": depth.mean(),
+                "p50": depth.percentile(50),
+                "p90": depth.percentile(90),
+                "max": depth.maximum,
+            }
+
+    def reset(self):
+        """Remove all recorded samples."""
+        with self.__lock:
+            self.depth.reset()
+
+
+class MetricsRegistry:
+    """Collection of metrics for each pipeline stage."""
+
+    def __init__(self, stages=None):
+        """Create a registry with metrics for ``stages``."""
+        self.__lock = threading.Lock()
+        self.stages: Dict[str, StageMetrics] = {}
+        self.queues: Dict[str, QueueMetrics] = {}
+        for name in stages if stages is not None else STAGES:
+            self.stages[name] = StageMetrics(name)
+
+    def stage(self, name: str) -> StageMetrics:
+        """Return metrics for stage ``name``, creating it if necessary."""
+        ret = self.stages.get(name)
+        if ret is None:
+            with self.__lock:
+                ret = self.stages.setdefault(name, StageMetrics(name))
+        return ret
+
+    def queue(self, name: str, capacity: int = 0) -> QueueMetrics:
+        """Return metrics for queue ``name``, creating it if necessary."""
+        with self.__lock:
+            ret = self.queues.setdefault(name, QueueMetrics(name, capacity))
+            ret.capacity = capacity or ret.capacity
+        return ret
+
+    def snapshot(self) -> dict:
+        """Return a dictionary of all stage metrics."""
+        return {name: stage.snapshot() for name, stage in list(self.stages.items())}
+
+    def queue_snapshot(self) -> dict:
+        """Return a dictionary of all queue metrics."""
+        return {name: queue.snapshot() for name, queue in list(self.queues.items())}
+
+    def reset(self):
+        """Remove all recorded metrics."""
+        for stage in list(self.stages.values()):
+            stage.reset()
+        for queue in list(self.queues.values()):
+            queue.reset()
+
+    def prometheus(self, prefix: str = "zeff") -> str:
+        """Return metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+
+        def counter(name, key, help_text):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for stage, data in snapshot.items():
+                lines.append(f'{prefix}_{name}{{stage="{stage}"}} {data[key]}')
+
+        counter("stage_events_total", "count", "Events processed by stage.")
+        counter("stage_bytes_total", "bytes", "Bytes sent by stage.")
+        counter("stage_retries_total", "retries", "Operations retried by stage.")
+
+        name = f"{prefix}_stage_errors_total"
+        lines.append(f"# HELP {name} Errors by stage and error class.")
+        lines.append(f"# TYPE {name} counter")
+        for stage, data in snapshot.items():
+            for error, count in sorted(data["errors"].items()):
+                lines.append(f'{name}{{stage="{stage}",error="{error}"}} {count}')
+
+        name = f"{prefix}_stage_latency_seconds"
+        lines.append(f"# HELP {name} Event latency by stage.")
+        lines.append(f"# TYPE {name} summary")
+        for stage, data in snapshot.items():
+            latency = data["latency_ns"]
+            for quantile, key in [("0.5", "p50"), ("0.9", "p90"), ("0.99", "p99")]:
+                value = latency[key] / 1e9
+                lines.append(f'{name}{{stage="{stage}",quantile="{quantile}"}} {value}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {latency["sum"] / 1e9}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {data["count"]}')
+
+        queues = self.queue_snapshot()
+        if queues:
+            name = f"{prefix}_queue_capacity"
+            lines.append(f"# HELP {name} Capacity of queue between stages.")
+            lines.append(f"# TYPE {name} gauge")
+            for queue, data in queues.items():
+                lines.append(f'{name}{{queue="{queue}"}} {data["capacity"]}')
+            name = f"{prefix}_queue_depth"
+            lines.append(f"# HELP {name} Depth of queue between stages.")
+            lines.append(f"# TYPE {name} summary")
+            for queue, data in queues.items():
+                for quantile, key in [("0.5", "p50"), ("0.9", "p90"), ("1", "max")]:
+                    lines.append(
+                        f'{name}{{queue="{queue}",quantile="{quantile}"}} {data[key]}'
+                    )
+        return "\n".join(lines) + "\n"
+
+    def dump(self) -> dict:
+        """Return a dictionary of all stage metrics for ``merge``.
+
+        Unlike ``snapshot`` the full latency histograms are included,
+        so metrics of several processes may be merged exactly.
+        """
+        return {
+            "stages": {name: stage.dump() for name, stage in list(self.stages.items())}
+        }
+
+    def merge(self, data: dict):
+        """Add stage metrics from ``dump`` to this registry."""
+        for name, stage in data["stages"].items():
+            self.stage(name).merge(stage)
+
+    def write_json(self, path):
+        """Atomically write ``dump`` of the metrics as JSON to ``path``."""
+        tmppath = f"{path}.tmp"
+        with open(tmppath, "w") as file:
+            json.dump(self.dump(), file)
+        os.replace(tmppath, path)
+
+    def merge_json(self, path):
+        """Add stage metrics written by ``write_json`` to this registry."""
+        with open(path, "r") as file:
+            self.merge(json.load(file))
+
+    def write_prometheus(self, path):
+        """Atomically write metrics to a Prometheus text file at ``path``."""
+        tmppath = f"{path}.tmp"
+        with open(tmppath, "w") as file:
+            file.write(self.prometheus())
+        os.replace(tmppath, path)
+
+    def summary(self) -> str:
+        """Return a human readable table of all stage metrics."""
+        lines = [
+            f"{'stage':10s} {'count':>8s} {'p50 ms':>9s} {'p99 ms':>9s} "
+            f"{'max ms':>9s} {'bytes':>12s} {'retries':>7s} errors"
+        ]
+        for stage, data in self.snapshot().items():
+            latency = data["latency_ns"]
+            errors = ", ".join(f"{k}={v}" for k, v in sorted(data["errors"].items()))
+            lines.append(
+                f"{stage:10s} {data['count']:8d} {latency['p50'] / 1e6:9.3f} "
+                f"{latency['p99'] / 1e6:9.3f} {latency['max'] / 1e6:9.3f} "
+                f"{data['bytes']:12d} {data['retries']:7d} {errors}"
+            )
+        queues = self.queue_snapshot()
+        if queues:
+            lines.append(
+                f"{'queue':10s} {'capacity':>8s} {'mean':>9s} {'p90':>9s} {'max':>9s}"
+            )
+            for queue, data in queues.items():
+                lines.append(
+                    f"{queue:10s} {data['capacity']:8d} {data['mean']:9.1f} "
+                    f"{data['p90']:9d} {data['max']:9d}"
+                )
+        return "\n".join(lines)
+
+
+class PrometheusWriter:
+    """Background thread that periodically writes a Prometheus text file."""
+
+    def __init__(self, registry: MetricsRegistry, path, interval: float = 10.0):
+        """Create a writer of ``registry`` to ``path`` every ``interval`` seconds."""
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.__stop = threading.Event()
+        self.__thread = threading.Thread(
+            target=self.__run, name="zeff-metrics", daemon=True
+        )
+
+    def __enter__(self):
+        """Start the writer."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop the writer."""
+        self.stop()
+
+    def start(self):
+        """Start writing in the background."""
+        self.__thread.start()
+
+    def stop(self):
+        """Stop writing in the background and write the final metrics."""
+        self.__stop.set()
+        if self.__thread.is_alive():
+            self.__thread.join()
+        self.registry.write_prometheus(self.path)
+
+    def __run(self):
+        while not self.__stop.wait(self.interval):
+            self.registry.write_prometheus(self.path)
+
+
+METRICS = MetricsRegistry()
@@ -20,9 +20,22 @@ __license__ = """
     See the License for the specific language governing permissions and
     limitations under the License.
 """
-__all__ = ["Counter", "record_builder_generator", "validation_generator"]
+__all__ = [
+    "Counter",
+    "shard_generator",
+    "prefetch",
+    "record_builder_generator",
+    "validation_generator",
+]
 
 import logging
+import itertools
+import time
+import zlib
+from .metrics import METRICS
+from .pipeline_runtime import ThreadedPipeline
+from .pipeline_events import EVENTS, RecordBuilt, RecordValidated
+from .tracing import TRACER
 
 LOGGER_GENERATOR = logging.getLogger("zeffclient.record.generator")
 LOGGER_BUILDER = logging.getLogger("zeffclient.record.builder")
@@ -33,10 +46,15 @@ LOGGER_UPLOADER = logging.getLogger("zeffclient.record.uploader")
 class Counter:
     """Generator that will count objects that pass through it."""
 
-    def __init__(self, upstream):
-        """Create a new counter on ``upstream``."""
+    def __init__(self, upstream, stage=None):
+        """Create a new counter on ``upstream``.
+
+        :param stage: A ``zeff.metrics.StageMetrics`` that will record
+            the time taken to get each object from ``upstream``.
+        """
         self.count = 0
         self.upstream = iter(upstream)
+        self.stage = stage
 
     def __iter__(self):
         """Return this object."""
@@ -44,11 +62,53 @@ class Counter:
 
     def __next__(self):
         """Return the next item from the container."""
-        ret = next(self.upstream)
+        if self.stage is None:
+            ret = next(self.upstream)
+        else:
+            start = time.perf_counter_ns()
+            ret = next(self.upstream)
+            self.stage.observe(time.perf_counter_ns() - start)
         self.count = self.count + 1
         return ret
 
 
+def shard_generator(upstream, shard: int, shards: int):
+    """Yield only the configurations in one shard of ``upstream``.
+
+    Configurations are partitioned by the CRC-32 of their string form,
+    which is the same in every process and on every machine, so
+    ``shards`` processes that each take a different ``shard`` of the
+    same upstream together see every configuration exactly once.
+
+    :param upstream: The object that will generate configuration
+       strings used to build a record.
+
+    :param shard: Index of this shard in ``[0, shards)``.
+
+    :param shards: Total number of shards.
+    """
+    if not 0 <= shard < shards:
+        raise ValueError(f"Shard {shard} is not in [0, {shards})")
+    for config in upstream:
+        if zlib.crc32(str(config).encode("utf-8")) % shards == shard:
+            yield config
+
+
+def prefetch(upstream, depth: int = 64, registry=None) -> ThreadedPipeline:
+    """Read ahead up to ``depth`` items of ``upstream`` on a background thread.
+
+    This hides the latency of a slow source, such as a record config
+    generator that queries a database, from the stages after it. An
+    exception raised by ``upstream`` is raised from the returned
+    iterator after the items read before it. Closing the returned
+    iterator stops the thread and closes ``upstream`` if it is a
+    generator.
+
+    The queue depth is recorded in queue metrics as ``prefetch``.
+    """
+    return ThreadedPipeline(upstream, [], depth, registry, output="prefetch")
+
+
 def record_builder_generator(model, upstream, builder):
     """Build and yield records from a configuration upstream.
 
@@ -61,29 +121,100 @@ def record_builder_generator(model, upstream, builder):
     :param builder: Callable object that will take a configuration
        string and return a record.
     """
+    stage = METRICS.stage("build")
     for config in upstream:
-        record = builder(model, config)
+        start = time.perf_counter_ns()
+        try:
+            record = builder(model, config)
+        except Exception as err:  # pylint: disable=broad-except
+            stage.error(err)
+            raise
+        elapsed = time.perf_counter_ns() - start
+        stage.observe(elapsed)
         if record is None:
             continue
+        if TRACER.enabled:
+            TRACER.add("build", record.name, start, start + elapsed)
+        if EVENTS.active:
+            EVENTS.emit(RecordBuilt(record.name, elapsed / 1e9))
         yield record
 
 
-def validation_generator(upstream, validator):
+def validation_generator(upstream, validator, batch_size=64):
     """Validate records from generator and yield valid records.
 
+    If ``validator`` has a ``validate_batch`` method (e.g. a
+    ``zeff.validator.RecordValidator``) records are validated in
+    batches of ``batch_size``, and after the last record the
+    validator's ``validate_dataset`` is called. The validator's
+    ``reset_dataset`` is called before the first batch and after
+    ``validate_dataset``. Otherwise each record is validated
+    individually by calling ``validator``.
+
+    As the records have already been yielded, a ``validate_dataset``
+    failure is logged and counted as a ``validate_dataset`` error of
+    the ``validate`` stage, so the caller can decide not to train.
+
     :param upstream: A generator that will yield record objects that
         may be validated.
 
     :param validator: A callable object that will take a
         single parameter that is the record to be validated.
 
+    :param batch_size: Maximum number of records in a batch.
+
     :return: Records that only have validation warnings.
     """
-    for record in upstream:
-        try:
-            validator(record)
-            yield record
-        except TypeError as err:
-            LOGGER_VALIDATOR.error(err)
-        except ValueError as err:
-            LOGGER_VALIDATOR.error(err)
+    stage = METRICS.stage("validate")
+    if not hasattr(validator, "validate_batch"):
+        for record in upstream:
+            start = time.perf_counter_ns()
+            try:
+                validator(record)
+                err = None
+            except (TypeError, ValueError) as exc:
+                err = exc
+            end = time.perf_counter_ns()
+            if TRACER.enabled:
+                TRACER.add("validate", record.name, start, end)
+            if EVENTS.active:
+                error = str(err) if err is not None else None
+                EVENTS.emit(
+                    RecordValidated(record.name, (end - start) / 1e9, error=error)
+                )
+            if err is None:
+                stage.observe(end - start)
+                yield record
+            else:
+                stage.error(err)
+                LOGGER_VALIDATOR.error(err)
+        return
+
+    upstream = iter(upstream)
+    validator.reset_dataset()
+    batch = list(itertools.islice(upstream, batch_size))
+    while batch:
+        start = time.perf_counter_ns()
+        results = validator.validate_batch(batch)
+        end = time.perf_counter_ns()
+        elapsed = (end - start) // len(batch)
+        stage.observe(elapsed, len(batch))
+        for record, err in results:
+            if TRACER.enabled:
+                TRACER.add("validate_batch", record.name, start, end, size=len(batch))
+            if EVENTS.active:
+                error = str(err) if err is not None else None
+                EVENTS.emit(RecordValidated(record.name, elapsed / 1e9, error=error))
+            if err is None:
+                yield record
+            else:
+                stage.error(err)
+                LOGGER_VALIDATOR.error(err)
+        batch = list(itertools.islice(upstream, batch_size))
+    try:
+        validator.validate_dataset()
+    except ValueError as err:
+        stage.error("validate_dataset")
+        LOGGER_VALIDATOR.error(err)
+    finally:
+        validator.reset_dataset()
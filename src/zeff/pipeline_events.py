@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff typed pipeline events."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+__all__ = [
+    "EVENTS",
+    "EventDispatcher",
+    "RecordEvent",
+    "RecordBuilt",
+    "RecordValidated",
+    "RecordUploaded",
+    "UploadFailed",
+    "RetryScheduled",
+]
+
+import dataclasses
+import threading
+import time
+from typing import Any, List, Optional
+from .pipeline_observation import AsyncObserver
+
+
+@dataclasses.dataclass(frozen=True)
+class RecordEvent:
+    """Base of all typed record pipeline events.
+
+    :property record_name: Name of the record (or file) the event is for.
+
+    :property duration: Seconds taken by the operation.
+
+    :property timestamp: When the event was created as seconds since
+        the epoch.
+    """
+
+    record_name: str
+    duration: float = 0.0
+    timestamp: float = dataclasses.field(default_factory=time.time, compare=False)
+
+
+@dataclasses.dataclass(frozen=True)
+class RecordBuilt(RecordEvent):
+    """A record was built from a configuration."""
+
+
+@dataclasses.dataclass(frozen=True)
+class RecordValidated(RecordEvent):
+    """A record was validated.
+
+    :property error: Validation error message, or ``None`` if valid.
+    """
+
+    error: Optional[str] = None
+
+    @property
+    def valid(self) -> bool:
+        """Return true if the record passed validation."""
+        return self.error is None
+
+
+@dataclasses.dataclass(frozen=True)
+class RecordUploaded(RecordEvent):
+    """A record was accepted by Zeff Cloud.
+
+    :property size: Bytes in the request payload.
+
+    :property status: HTTP status code of the response.
+
+    :property record_id: Id assigned to the record by Zeff Cloud.
+    """
+
+    size: int = 0
+    status: int = 0
+    record_id: Optional[str] = None
+
+
+@dataclasses.dataclass(frozen=True)
+class UploadFailed(RecordEvent):
+    """A record or file was not accepted by Zeff Cloud.
+
+    :property size: Bytes in the request payload.
+
+    :property status: HTTP status code of the response, or ``None`` if
+        no response was received.
+
+    :property error: Description of the failure.
+    """
+
+    size: int = 0
+    status: Optional[int] = None
+    error: str = ""
+
+
+@dataclasses.dataclass(frozen=True)
+class RetryScheduled(RecordEvent):
+    """A failed request will be retried.
+
+    :property attempt: Number of consecutive failures so far.
+
+    :property status: HTTP status code of the failed response, or
+        ``None`` if no response was received.
+
+    :property error: Description of the failure.
+    """
+
+    attempt: int = 1
+    status: Optional[int] = None
+    error: str = ""
+
+
+class EventDispatcher:
+    """Deliver typed pipeline events to subscribed observers.
+
+    Emitters should check ``active`` before creating an event so
+    there is no cost when there are no observers::
+
+        if EVENTS.active:
+            EVENTS.emit(RecordBuilt(record.name, duration))
+    """
+
+    def __init__(self):
+        """Create a dispatcher with no observers."""
+        self.__lock = threading.Lock()
+        self.__observers: List[Any] = []
+        self.active = False
+
+    def subscribe(self, observer, *event_types, async_: bool = False, **kwargs):
+        """Add an observer of events.
+
+        :param observer: Callable that accepts a single ``RecordEvent``.
+
+        :param event_types: Event classes to deliver to ``observer``. The
+            default is all events.
+
+        :param async_: Deliver events from a background thread (see
+            ``AsyncObserver``).
+
+        :param **kwargs: Additional key word arguments to give to
+            ``AsyncObserver`` when ``async_`` is true.
+        """
+        delivery = AsyncObserver(observer, **kwargs) if async_ else observer
+        with self.__lock:
+            self.__observers = self.__observers + [
+                (observer, tuple(event_types) or (RecordEvent,), delivery)
+            ]
+            self.active = True
+
+    def unsubscribe(self, observer):
+        """Remove all subscriptions of ``observer``."""
+        with self.__lock:
+            removed = [t for t in self.__observers if t[0] == observer]
+            self.__observers = [t for t in self.__observers if t[0] != observer]
+            self.active = bool(self.__observers)
+        for _, _, delivery in removed:
+            if isinstance(delivery, AsyncObserver):
+                delivery.close()
+
+    def emit(self, event: RecordEvent):
+        """Deliver ``event`` to all observers of its type."""
+        for _, event_types, delivery in self.__observers:
+            if isinstance(event, event_types):
+                delivery(event)
+
+
+EVENTS = EventDispatcher()
@@ -25,11 +25,18 @@ __all__ = [
     "pipeline_remove_observer",
     "PipelinePhase",
     "PipelineLevel",
+    "AsyncObserver",
 ]
 
+import atexit
 import enum
 import datetime
+import functools
 import logging
+import queue
+import sys
+import threading
+import traceback
 from typing import Any, List
 
 
@@ -52,7 +59,13 @@ class PipelineLevel(enum.Enum):
     Debug = logging.DEBUG
 
 
-def pipeline_add_observer(observer, phase: PipelinePhase, level: PipelineLevel):
+def pipeline_add_observer(
+    observer,
+    phase: PipelinePhase,
+    level: PipelineLevel,
+    async_: bool = False,
+    **kwargs,
+):
     """Add an observer to watch pipeline events.
 
     This allows an event driven observation of the record generation,
@@ -66,6 +79,12 @@ def pipeline_add_observer(observer, phase: PipelinePhase, level: PipelineLevel):
 
     :param level: The minimum level for events that should be delivered to
         the ``observer``.
+
+    :param async_: Deliver events to ``observer`` from a background thread
+        so a slow observer does not stall the pipeline.
+
+    :param **kwargs: Additional key word arguments to give to
+        ``AsyncObserver`` when ``async_`` is true.
     """
     logger = phase.value
     handlers = [h for h in logger.handlers if isinstance(h, PipelineHandler)]
@@ -73,7 +92,8 @@ def pipeline_add_observer(observer, phase: PipelinePhase, level: PipelineLevel):
         handler = PipelineHandler(phase)
         logger.addHandler(handler)
         handlers = [handler]
-    handlers[0].add_observer(observer, level)
+    delivery = AsyncObserver(observer, **kwargs) if async_ else None
+    handlers[0].add_observer(observer, level, delivery)
 
 
 def pipeline_remove_observer(observer, phase: PipelinePhase, level: PipelineLevel):
@@ -98,6 +118,15 @@ def pipeline_remove_observer(observer, phase: PipelinePhase, level: PipelineLeve
     handlers[0].remove_observer(observer, level)
 
 
+@functools.lru_cache(maxsize=None)
+def pipeline_level(levelno: int) -> PipelineLevel:
+    """Return the highest PipelineLevel at or below logging ``levelno``."""
+    for level in PipelineLevel:
+        if level.value <= levelno:
+            return level
+    return PipelineLevel.Debug
+
+
 class PipelineEvent:
     """Represents an event in the ZeffClient pipeline.
 
@@ -106,9 +135,13 @@ class PipelineEvent:
     record to Zeff Cloud.
     """
 
+    __slots__ = ["__phase", "__record", "__level", "__message"]
+
     def __init__(self, phase: PipelinePhase, record: logging.LogRecord):
         self.__phase = phase
         self.__record = record
+        self.__level = pipeline_level(record.levelno)
+        self.__message = None
 
     def __str__(self):
         return f"{self.timestamp.isoformat()} [{self.phase.name}] {self.level.name}: {self.message}"
@@ -126,15 +159,154 @@ class PipelineEvent:
     @property
     def level(self) -> PipelineLevel:
         """Pipeline level for this event."""
-        for level in PipelineLevel:
-            if level.value <= self.__record.levelno:
-                return level
-        return PipelineLevel.Debug
+        return self.__level
 
     @property
     def message(self) -> str:
         """Message that is part of the event."""
-        return self.__record.getMessage()
+        if self.__message is None:
+            self.__message = self.__record.getMessage()
+        return self.__message
+
+    def prepare(self):
+        """Format the message now instead of when it is first used.
+
+        This must be done before the event is passed to another thread,
+        as the log record arguments may be changed by the caller.
+        """
+        if self.__message is None:
+            self.__message = self.__record.getMessage()
+
+
+class AsyncObserver:
+    """Deliver pipeline events to an observer from a background thread.
+
+    Events are placed in a bounded queue when they are emitted, and a
+    daemon thread takes them from the queue and calls the observer. A
+    slow observer will fill the queue, and what happens next is set
+    by the ``policy``:
+
+    ``drop``
+        The new event is discarded and counted in ``dropped``.
+
+    ``block``
+        The pipeline waits until there is room in the queue.
+
+    Events still in the queue are delivered when the observer is
+    closed or the process exits. Events after the observer is closed
+    are discarded and counted in ``dropped``.
+    """
+
+    POLL_INTERVAL = 0.1
+
+    def __init__(
+        self,
+        observer,
+        maxsize: int = 1024,
+        policy: str = "drop",
+        batch_size: int = 0,
+    ):
+        """Create a new asynchronous observer.
+
+        :param observer: A observer object that will accept a single
+            PipelineEvent, or a list of events if ``batch_size`` is set.
+
+        :param maxsize: Maximum number of events waiting for delivery.
+
+        :param policy: What to do with a new event when the queue is
+            full: ``drop`` or ``block``.
+
+        :param batch_size: If greater than zero then events already in
+            the queue, up to ``batch_size``, are delivered together to
+            the observer as a list.
+        """
+        if policy not in ["drop", "block"]:
+            raise ValueError(f"Unknown observer queue policy `{policy}`")
+        self.observer = observer
+        self.policy = policy
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.__closed = False
+        self.__stop = object()
+        self.__queue: queue.Queue = queue.Queue(maxsize)
+        self.__thread = threading.Thread(
+            target=self.__run, name="zeff-observer", daemon=True
+        )
+        self.__thread.start()
+        atexit.register(self.close)
+
+    def __call__(self, event: PipelineEvent):
+        """Queue ``event`` for delivery to the observer."""
+        prepare = getattr(event, "prepare", None)
+        if prepare is not None:
+            prepare()
+        if self.policy == "block":
+            # Wait in intervals so a put never outlives the thread.
+            while not self.__closed:
+                try:
+                    self.__queue.put(event, timeout=self.POLL_INTERVAL)
+                    return
+                except queue.Full:
+                    pass
+            self.dropped += 1
+            return
+        if self.__closed:
+            self.dropped += 1
+            return
+        try:
+            self.__queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Wait until all queued events have been delivered."""
+        self.__queue.join()
+
+    def close(self):
+        """Deliver all queued events and stop the background thread."""
+        if self.__closed or not self.__thread.is_alive():
+            return
+        self.__closed = True
+        atexit.unregister(self.close)
+        self.__queue.put(self.__stop)
+        self.__thread.join()
+
+    def __run(self):
+        stop = False
+        while not stop:
+            events = [self.__queue.get()]
+            while len(events) < max(self.batch_size, 1):
+                try:
+                    events.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(e is self.__stop for e in events)
+            if stop:
+                # Events queued by a put that raced ``close``
+                while True:
+                    try:
+                        events.append(self.__queue.get_nowait())
+                    except queue.Empty:
+                        break
+            count = len(events)
+            events = [e for e in events if e is not self.__stop]
+            try:
+                self.__deliver(events)
+            finally:
+                for _ in range(count):
+                    self.__queue.task_done()
+
+    def __deliver(self, events: List[PipelineEvent]):
+        try:
+            if not events:
+                return
+            if self.batch_size > 0:
+                self.observer(events)
+            else:
+                for event in events:
+                    self.observer(event)
+        except Exception:  # pylint: disable=broad-except
+            traceback.print_exc(file=sys.stderr)
 
 
 class PipelineHandler(logging.Handler):
@@ -153,21 +325,29 @@ class PipelineHandler(logging.Handler):
         self.phase = phase
         self.observers: List[Any] = []
 
-    def add_observer(self, observer, level: PipelineLevel):
-        """Add observer to this handler."""
-        self.observers.append((observer, level))
+    def add_observer(self, observer, level: PipelineLevel, delivery=None):
+        """Add observer to this handler.
+
+        :param delivery: Callable that delivers an event to ``observer``
+            (e.g. an ``AsyncObserver``) instead of calling it directly.
+        """
+        self.observers.append((observer, level, delivery))
 
     def remove_observer(self, observer, level: PipelineLevel):
         """Remove observer from this handler."""
         elems = [t for t in self.observers if t[0] == observer and t[1] == level]
         for elem in elems:
             self.observers.remove(elem)
+            if isinstance(elem[2], AsyncObserver):
+                elem[2].close()
 
     def emit(self, record):
-        event = PipelineEvent(self.phase, record)
-        for observer in (
-            observer
-            for observer, level in self.observers
-            if level.value <= record.levelno
-        ):
-            observer(event)
+        event = None
+        for observer, level, delivery in self.observers:
+            if level.value <= record.levelno:
+                if event is None:
+                    event = PipelineEvent(self.phase, record)
+                if delivery is None:
+                    observer(event)
+                else:
+                    delivery(event)
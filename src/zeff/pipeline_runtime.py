@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff threaded record pipeline runtime.
+
+A ``ThreadedPipeline`` runs each stage of the record pipeline in its
+own worker threads, connected by bounded queues, so a slow stage does
+not stall the others: while records are uploaded the next records are
+being built and validated. A stage is any function that takes an
+upstream iterator and returns an iterator, such as
+``record_builder_generator`` or ``validation_generator``, so the same
+stages may be chained as plain generators or run threaded.
+"""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+__all__ = ["Stage", "ThreadedPipeline", "chain_stages"]
+
+import logging
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, List
+from .metrics import METRICS
+
+LOGGER = logging.getLogger("zeffclient.record.pipeline")
+
+POLL_INTERVAL = 0.1
+
+
+class Stage:
+    """A record pipeline stage.
+
+    :property name: Name of the stage used for thread names and queue
+        metrics.
+
+    :property function: Callable that takes an upstream iterator and
+        returns an iterator of the stage's results. It is called once
+        for each worker, so each worker may have its own state.
+
+    :property workers: Number of worker threads that run the stage
+        when threaded. With more than one worker the order of results
+        is not preserved.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(
+        self, name: str, function: Callable[[Iterator], Iterable], workers: int = 1
+    ):
+        """Create a new stage."""
+        if workers < 1:
+            raise ValueError(f"Stage {name} must have at least one worker")
+        self.name = name
+        self.function = function
+        self.workers = workers
+
+
+def chain_stages(source: Iterable, stages: List[Stage]) -> Iterator:
+    """Chain ``stages`` as plain generators on the calling thread."""
+    generator = source
+    for stage in stages:
+        generator = stage.function(generator)
+    return iter(generator)
+
+
+class _End:
+    """Marker put on a queue after the last item."""
+
+    # pylint: disable=too-few-public-methods
+
+
+class _Stopped(Exception):
+    """The pipeline was stopped while waiting on a queue."""
+
+
+class ThreadedPipeline:
+    """Iterator over the results of stages run in worker threads.
+
+    The ``source`` is read by its own thread, and each stage is run by
+    its workers; items are passed from one stage to the next through
+    a queue of at most ``maxsize`` items. The results of the last
+    stage are returned by iterating over the pipeline on the calling
+    thread.
+
+    An exception raised in any thread stops the pipeline and is raised
+    from the iteration. If the iteration is interrupted (e.g. by
+    ``KeyboardInterrupt``) or the pipeline is closed before it is
+    exhausted, the workers stop after the item they are working on.
+
+    The depth of each queue is recorded in ``registry`` under the name
+    of the stage that reads it, and ``output`` for the last queue.
+    """
+
+    def __init__(
+        self,
+        source: Iterable,
+        stages: List[Stage],
+        maxsize: int = 64,
+        registry=None,
+        output: str = "output",
+    ):
+        """Create and start a new pipeline.
+
+        :param source: The iterable the first stage reads from.
+
+        :param stages: The stages in order.
+
+        :param maxsize: Maximum number of items in each queue.
+
+        :param registry: A ``zeff.metrics.MetricsRegistry`` for queue
+            depths; the default is ``METRICS``.
+
+        :param output: Name of the last queue in queue metrics.
+        """
+        registry = registry if registry is not None else METRICS
+        names = [s.name for s in stages] + [output]
+        self.queues = [queue.Queue(maxsize) for _ in names]
+        self.__metrics = [registry.queue(n, maxsize) for n in names]
+        self.__stop = threading.Event()
+        self.__lock = threading.Lock()
+        self.__error = None
+        self.__done = False
+        self.__threads = [
+            threading.Thread(
+                target=self.__source,
+                args=(source,),
+                name="zeff-source",
+                daemon=True,
+            )
+        ]
+        for index, stage in enumerate(stages):
+            remaining = [stage.workers]
+            for number in range(stage.workers):
+                self.__threads.append(
+                    threading.Thread(
+                        target=self.__worker,
+                        args=(stage, index, remaining),
+                        name=f"zeff-{stage.name}-{number}",
+                        daemon=True,
+                    )
+                )
+        for thread in self.__threads:
+            thread.start()
+
+    def __enter__(self):
+        """Return this object."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop the pipeline."""
+        self.close()
+
+    def __iter__(self):
+        """Return this object."""
+        return self
+
+    def __next__(self):
+        """Return the next result of the last stage."""
+        if self.__done:
+            raise StopIteration()
+        try:
+            item = self.__get(len(self.queues) - 1)
+        except _Stopped:
+            self.close()
+            if self.__error is None:
+                raise StopIteration() from None
+            raise self.__error  # pylint: disable=raising-bad-type
+        except BaseException:
+            self.close()
+            raise
+        if isinstance(item, _End):
+            self.close()
+            raise StopIteration()
+        return item
+
+    def close(self):
+        """Stop all workers and wait for them to finish."""
+        self.__done = True
+        self.__stop.set()
+        for thread in self.__threads:
+            if thread is not threading.current_thread():
+                thread.join()
+
+    def depths(self) -> List[int]:
+        """Return the current number of items in each queue."""
+        return [q.qsize() for q in self.queues]
+
+    def __fail(self, err: BaseException):
+        with self.__lock:
+            if self.__error is None:
+                self.__error = err
+        self.__stop.set()
+
+    def __get(self, index: int):
+        source = self.queues[index]
+        while True:
+            try:
+                return source.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if self.__stop.is_set():
+                    raise _Stopped() from None
+
+    def __put(self, index: int, item):
+        target = self.queues[index]
+        while True:
+            try:
+                target.put(item, timeout=POLL_INTERVAL)
+                break
+            except queue.Full:
+                if self.__stop.is_set():
+                    raise _Stopped() from None
+        if not isinstance(item, _End):
+            self.__metrics[index].observe(target.qsize())
+
+    def __drain(self, index: int):
+        while True:
+            item = self.__get(index)
+            if isinstance(item, _End):
+                # Leave the marker for the other workers of the stage.
+                self.__put(index, item)
+                return
+            yield item
+
+    def __source(self, source):
+        try:
+            for item in source:
+                if self.__stop.is_set():
+                    raise _Stopped()
+                self.__put(0, item)
+            self.__put(0, _End())
+        except _Stopped:
+            # Release resources held by a generator (e.g. a cursor).
+            close = getattr(source, "close", None)
+            if close is not None:
+                close()
+        except BaseException as err:  # pylint: disable=broad-except
+            LOGGER.debug("Pipeline source failed: %s", err)
+            self.__fail(err)
+
+    def __worker(self, stage: Stage, index: int, remaining: List[int]):
+        try:
+            for item in stage.function(self.__drain(index)):
+                self.__put(index + 1, item)
+            with self.__lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self.__put(index + 1, _End())
+        except _Stopped:
+            pass
+        except BaseException as err:  # pylint: disable=broad-except
+            LOGGER.debug("Pipeline stage %s failed: %s", stage.name, err)
+            self.__fail(err)
@@ -41,7 +41,40 @@ class Predictor:
     # pylint: disable=too-few-public-methods
     # pylint: disable=too-many-arguments
 
-    def __init__(self, upstream, server_url, org_id, user_id, dataset_id, version):
+    @classmethod
+    def find_model(cls, dataset, version=None):
+        """Return the model of ``dataset`` to make predictions against.
+
+        :param dataset: The ``Dataset`` that contains the model.
+
+        :param version: The model version. The default is the latest
+            version that has completed training.
+
+        :raises ZeffCloudModelException: No completed model available.
+        """
+        if version is not None:
+            return Model(dataset, version)
+        ret = None
+        for model in dataset.models():
+            if model.status is not TrainingStatus.complete:
+                continue
+            if ret is None or ret.version < model.version:
+                ret = model
+        if ret is None:
+            raise ZeffCloudModelException("No completed models available")
+        return ret
+
+    def __init__(
+        self,
+        upstream,
+        server_url,
+        org_id,
+        user_id,
+        dataset_id,
+        version,
+        resource_map=None,
+        model=None,
+    ):
         """Create a generator that will use a record to infer a prediction.
 
         :param upstream: The upstream record generator.
@@ -56,27 +89,24 @@ class Predictor:
 
         :param version: The model version to make inferences against. The
             default is the latest trained version.
+
+        :param resource_map: A ``ZeffCloudResourceMap`` for ``server_url``
+            to use instead of creating a new one.
+
+        :param model: The ``Model`` to use instead of looking it up in
+            Zeff Cloud with ``find_model``.
         """
         self.upstream = upstream
 
-        info = ZeffCloudResourceMap.default_info()
-        self.resource_map = ZeffCloudResourceMap(
-            info, root=server_url, org_id=org_id, user_id=user_id
-        )
-        dataset = Dataset(dataset_id, self.resource_map)
-        if version is None:
-            self.model = None
-            for model in dataset.models():
-                if model.status is not TrainingStatus.complete:
-                    continue
-                elif self.model is None:
-                    self.model = model
-                elif self.model.version < model.version:
-                    self.model = model
-            if self.model is None:
-                raise ZeffCloudModelException("No completed models available")
-        else:
-            self.model = Model(dataset, version)
+        if resource_map is None:
+            info = ZeffCloudResourceMap.default_info()
+            resource_map = ZeffCloudResourceMap(
+                info, root=server_url, org_id=org_id, user_id=user_id
+            )
+        self.resource_map = resource_map
+        if model is None:
+            model = self.find_model(Dataset(dataset_id, self.resource_map), version)
+        self.model = model
 
     def __iter__(self):
         """Return this object."""
@@ -55,3 +55,4 @@ from .unstructureddata import *
 from .unstructuredtemporaldata import *
 from .file import *
 from .formatter import *
+from .digest import *
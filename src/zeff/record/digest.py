@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff record content digest."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+__all__ = ["record_digest", "file_digest"]
+
+import hashlib
+import json
+import pathlib
+import urllib.parse
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path, chunk_size: int = CHUNK_SIZE) -> str:
+    """Return SHA-256 hex digest of a file's content.
+
+    The file is read in chunks so large files are never held in
+    memory whole.
+
+    :param path: Path to the file.
+
+    :param chunk_size: Number of bytes to read at a time.
+    """
+    hasher = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def record_digest(record) -> str:
+    """Return a stable canonical SHA-256 hex digest of a record.
+
+    The digest is computed from the record name, the structured data
+    items sorted by name, and the unstructured data items sorted by
+    URI. Unstructured data with a ``file`` scheme URI also includes
+    the digest of the file content, so a file changed in place will
+    change the record digest. Items with other schemes use only
+    the URI.
+
+    Two records with the same content will have the same digest
+    regardless of the order items were added to the record.
+
+    :param record: The ``Record`` to digest.
+    """
+    structured = sorted(
+        (
+            [sdi.name, repr(sdi.value), sdi.data_type.name, sdi.target.name]
+            for sdi in record.structured_data
+        ),
+        key=lambda item: item[0],
+    )
+
+    unstructured = []
+    for udi in record.unstructured_data:
+        parts = urllib.parse.urlsplit(udi.data_uri)
+        content = ""
+        if parts[0] == "file":
+            path = pathlib.Path(urllib.parse.unquote(parts[2]))
+            try:
+                content = file_digest(path)
+            except OSError:
+                content = "inaccessible"
+        file_type = getattr(udi.file_type, "name", str(udi.file_type))
+        unstructured.append([udi.data_uri, file_type, udi.group_by, content])
+    unstructured.sort(key=lambda item: (item[0], item[1], str(item[2])))
+
+    canonical = json.dumps(
+        [str(record.name), structured, unstructured],
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -20,21 +20,34 @@ __license__ = """
     See the License for the specific language governing permissions and
     limitations under the License.
 """
-
+__all__ = [
+    "format_record_restructuredtext",
+    "RecordWriter",
+    "JSONLinesRecordWriter",
+    "CSVRecordWriter",
+    "RestructuredTextRecordWriter",
+    "RECORD_WRITERS",
+]
 
 import sys
+import io
+import csv
 import itertools
 import textwrap
 
+BUFFER_SIZE = 256 * 1024
+
 
 def format_record_restructuredtext(
     record,
-    out=sys.stdout,
+    out=None,
     structured_sort=lambda k: k.name,
     unstructured_sort=lambda k: k.group_by if k.group_by is not None else "",
 ):
     """Convert a record to a reStructuedText document.
 
+    The document is written to ``out`` with a single ``write``.
+
     :param record: Record to format.
 
     :param out: A file type object to write the record in. Default `stdout`.
@@ -47,62 +60,68 @@ def format_record_restructuredtext(
         used to sort the unstructured data items. The default is to
         sort on `group_by`.
     """
+    lines = []
 
-    def print_table_header(columns):
-        for name, width in columns:
-            print(f"+-{'-'*width}-", end="", file=out)
-        print("+", file=out)
+    def table_border(columns, char):
+        return "".join(f"+{char}{char*width}{char}" for _, width in columns) + "+"
 
-        for name, width in columns:
-            print(f"| {name}{' '*(width-len(name))} ", end="", file=out)
-        print("|", file=out)
-
-        for name, width in columns:
-            print(f"+={'='*width}=", end="", file=out)
-        print("+", file=out)
+    def table_header(columns):
+        lines.append(table_border(columns, "-"))
+        lines.append(
+            "".join(f"| {name}{' '*(width-len(name))} " for name, width in columns)
+            + "|"
+        )
+        lines.append(table_border(columns, "="))
 
-    def print_table_entry(data, columns):
+    def table_entry(data, columns):
         cstrs = [(str(d), w) for d, (n, w) in zip(data, columns)]
-        cstrs = [textwrap.wrap(s, w) for s, w in cstrs]
+        # A value that fits in its column is the same unwrapped.
+        cstrs = [
+            (
+                [s]
+                if len(s) <= w and s.isprintable() and s.strip()
+                else textwrap.wrap(s, w)
+            )
+            for s, w in cstrs
+        ]
         for rstrs in itertools.zip_longest(*cstrs):
+            line = []
             for index, vstr in enumerate(rstrs):
                 width = columns[index][1]
                 if vstr is None:
-                    print(f"| {' '*width} ", end="", file=out)
+                    line.append(f"| {' '*width} ")
                 else:
-                    print(f"| {vstr:<{width}} ", end="", file=out)
-            print("|", file=out)
-        for _, width in columns:
-            print(f"+-{'-'*width}-", end="", file=out)
-        print("+", file=out)
+                    line.append(f"| {vstr:<{width}} ")
+            lines.append("".join(line) + "|")
+        lines.append(table_border(columns, "-"))
 
-    def print_structured_item_table(record):
+    def structured_item_table(record):
         columns = compute_column_widths(
             record.structured_data,
             ["name", "data_type", "target", "value"],
             [16, 8, 6, 32],
         )
-        print_table_header(columns)
+        table_header(columns)
 
         data_items = list(record.structured_data)
         data_items.sort(key=structured_sort)
         for sdi in data_items:
             data = [sdi.name, sdi.data_type.name, sdi.target.name, sdi.value]
-            print_table_entry(data, columns)
+            table_entry(data, columns)
 
-    def print_unstructured_item_table(record):
+    def unstructured_item_table(record):
         columns = compute_column_widths(
             record.unstructured_data,
             ["file_type", "group_by", "data_uri", "accessible"],
             [8, 8, 8, 16],
         )
-        print_table_header(columns)
+        table_header(columns)
 
         data_items = list(record.unstructured_data)
         data_items.sort(key=unstructured_sort)
         for udi in data_items:
             data = [udi.file_type, udi.group_by, udi.data_uri, udi.accessible]
-            print_table_entry(data, columns)
+            table_entry(data, columns)
 
     def compute_column_widths(items, names, mins):
         widths = list(mins)
@@ -117,16 +136,143 @@ def format_record_restructuredtext(
             widths[widths.index(maxcol)] = maxcol - reduce
         return list(zip(names, widths))
 
-    print("=" * len(str(record)))
-    print(record)
-    print("=" * len(str(record)))
+    title = str(record)
+    lines.extend(["=" * len(title), title, "=" * len(title)])
+
+    lines.extend(["", "Structured Data", "==============="])
+    structured_item_table(record)
+
+    lines.extend(["", "Unstructured Data", "================="])
+    unstructured_item_table(record)
+
+    lines.append("")
+    if out is None:
+        out = sys.stdout
+    out.write("\n".join(lines))
+
+
+class RecordWriter:
+    """Base class of writers that stream records to a text file.
+
+    Formatted records are collected in a buffer that is written to
+    the file when it holds ``buffer_size`` characters, so writing
+    millions of records makes few large writes. A writer is a context
+    manager that flushes the buffer when it exits.
+
+    Subclasses implement ``format`` to write one record to ``buffer``,
+    and may implement ``header`` to write text before the first record.
+    """
+
+    def __init__(self, out=None, buffer_size: int = BUFFER_SIZE):
+        """Create a new record writer.
+
+        :param out: A file type object to write records in. Default
+            `stdout`.
+
+        :param buffer_size: Number of characters to collect before they
+            are written to ``out``.
+        """
+        self.out = out if out is not None else sys.stdout
+        self.buffer_size = buffer_size
+        self.buffer = io.StringIO()
+        self.count = 0
+
+    def __enter__(self):
+        """Return this writer."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Flush the buffered records."""
+        self.close()
+
+    def header(self):
+        """Write text that comes before the first record to ``buffer``."""
+
+    def format(self, record):
+        """Write a single record to ``buffer``."""
+        raise NotImplementedError()
+
+    def write(self, record):
+        """Write a record."""
+        if self.count == 0:
+            self.header()
+        self.format(record)
+        self.count += 1
+        if self.buffer.tell() >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Write buffered records to the file."""
+        self.out.write(self.buffer.getvalue())
+        self.buffer.seek(0)
+        self.buffer.truncate()
+
+    def close(self):
+        """Write buffered records and flush the file."""
+        self.flush()
+        self.out.flush()
+
+
+class JSONLinesRecordWriter(RecordWriter):
+    """Write each record as a line of the JSON sent to Zeff Cloud."""
+
+    def __init__(self, *argv, **kwargs):
+        """See RecordWriter.__init__."""
+        # pylint: disable=import-outside-toplevel
+        from ..cloud.encoder import RecordEncoder
+
+        super().__init__(*argv, **kwargs)
+        self.encode = RecordEncoder().encode
+
+    def format(self, record):
+        """See RecordWriter.format."""
+        self.buffer.write(self.encode(record))
+        self.buffer.write("\n")
+
+
+class CSVRecordWriter(RecordWriter):
+    """Write the structured data of records as CSV.
+
+    There is a row for each structured data item, sorted by name, with
+    the columns ``record``, ``name``, ``value``, ``data_type``, and
+    ``target``, so records with different items share one table.
+    """
+
+    COLUMNS = ["record", "name", "value", "data_type", "target"]
+
+    def __init__(self, *argv, **kwargs):
+        """See RecordWriter.__init__."""
+        super().__init__(*argv, **kwargs)
+        self.writer = csv.writer(self.buffer, lineterminator="\n")
+
+    def header(self):
+        """See RecordWriter.header."""
+        self.writer.writerow(self.COLUMNS)
+
+    def format(self, record):
+        """See RecordWriter.format."""
+        name = str(record.name)
+        self.writer.writerows(
+            [name, sdi.name, sdi.value, sdi.data_type.name, sdi.target.name]
+            for sdi in sorted(record.structured_data, key=lambda k: k.name)
+        )
+
+
+class RestructuredTextRecordWriter(RecordWriter):
+    """Write records as reStructuredText documents.
+
+    See ``format_record_restructuredtext``.
+    """
+
+    def format(self, record):
+        """See RecordWriter.format."""
+        if self.count > 0:
+            self.buffer.write("\n")
+        format_record_restructuredtext(record, out=self.buffer)
 
-    print()
-    print("Structured Data")
-    print("===============")
-    print_structured_item_table(record)
 
-    print(file=out)
-    print("Unstructured Data", file=out)
-    print("=================", file=out)
-    print_unstructured_item_table(record)
+RECORD_WRITERS = {
+    "jsonl": JSONLinesRecordWriter,
+    "csv": CSVRecordWriter,
+    "rst": RestructuredTextRecordWriter,
+}
@@ -52,6 +52,9 @@ class UnstructuredData:
     :property accessible: Flag set during validation that the
         location given by ``data_uri`` is accessible.
 
+    :property location: URL to the data in Zeff Cloud that is set
+        when the data has been uploaded (see ``upload``).
+
     :property record: The record for this data item. Setting this
         property will add this item to ``Record.unstructured_data``
         list automatically.
@@ -64,6 +67,9 @@ class UnstructuredData:
     accessible: str = dataclasses.field(
         default="", init=False, repr=False, compare=False
     )
+    location: str = dataclasses.field(
+        default="", init=False, repr=False, compare=False
+    )
     __record: object = None
 
     @property
@@ -23,3 +23,5 @@ __license__ = """
 
 from .generate import generate
 from .urlgenerators import *
+from .sourceindex import *
+from .lines import *
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff line oriented record config generator."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+__all__ = ["lines_generator"]
+
+import mmap
+import os
+from typing import Tuple
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def lines_generator(
+    path,
+    shard: Tuple[int, int] = None,
+    skip: int = 0,
+    encoding: str = "utf-8",
+    chunk_size: int = CHUNK_SIZE,
+):
+    """Config generator of the lines in a text file.
+
+    Each line, with surrounding whitespace removed, is a record
+    configuration string; blank lines are skipped. The file is memory
+    mapped and split into lines a chunk at a time, so a file of tens
+    of millions of lines is read without per-line file I/O and without
+    being loaded into memory.
+
+    It may be used directly in ``zeff.conf``::
+
+        [records]
+        records_config_generator = zeff.recordgenerator.lines_generator
+        records_config_arg = record_ids.txt
+
+    :param path: Path to the text file.
+
+    :param shard: A ``(shard, shards)`` tuple to only generate the
+        lines that start in that part of the file when it is divided
+        into ``shards`` byte ranges of equal size, so parallel workers
+        each take a shard without reading the others.
+
+    :param skip: Number of lines to skip before the first line is
+        generated, e.g. to resume after that many lines were
+        processed. With ``shard`` this counts lines of the shard.
+
+    :param encoding: Text encoding of the file.
+
+    :param chunk_size: Approximate number of bytes split at a time.
+    """
+    # pylint: disable=too-many-arguments
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start, end = 0, size
+            if shard is not None:
+                index, count = shard
+                if not 0 <= index < count:
+                    raise ValueError(f"Shard {index} is not in [0, {count})")
+                start, end = size * index // count, size * (index + 1) // count
+                # A line belongs to the shard its first byte is in.
+                if start > 0 and data[start - 1 : start] != b"\n":
+                    newline = data.find(b"\n", start)
+                    start = size if newline == -1 else newline + 1
+            pos = start
+            while pos < end:
+                # Extend the chunk to the end of the line it stops in.
+                newline = data.find(b"\n", min(pos + chunk_size, end) - 1)
+                stop = size if newline == -1 else newline + 1
+                lines = data[pos:stop].decode(encoding).split("\n")
+                lines = list(filter(None, map(str.strip, lines)))
+                if skip > 0:
+                    skipped = min(skip, len(lines))
+                    lines, skip = lines[skipped:], skip - skipped
+                yield from lines
+                pos = stop
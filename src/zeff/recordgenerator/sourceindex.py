@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff index of source entries from the previous generator run."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+__all__ = ["SourceIndex"]
+
+import os
+import sqlite3
+from typing import List, Tuple
+
+# Entries looked up in one query; below SQLite's limit on parameters.
+BATCH_SIZE = 500
+
+
+class SourceIndex:
+    """Index of source entries listed by the previous run of a generator.
+
+    The index is a SQLite database that maps the URL of an entry to the
+    modification time, size, and inode of the entry when it was last
+    generated. An entry whose ``os.stat`` matches the index is unchanged
+    since the previous run and does not need to be generated again.
+
+    Lookups use the database's primary key so the index is never read
+    into memory, and updates are held in a single transaction until
+    ``commit`` so an interrupted run leaves the previous index intact.
+    The owner of the index should only commit once the generated
+    entries have been processed downstream (e.g. every record was
+    uploaded), so entries of failed records are generated again.
+
+    Entries looked up or updated are marked as seen, and ``prune``
+    removes entries of a directory that were not seen, i.e. that were
+    deleted since the previous run.
+
+    An index may be used from any thread, but only by one at a time.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            url TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            inode INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """
+
+    SEEN_SCHEMA = """
+        CREATE TEMP TABLE IF NOT EXISTS seen (
+            url TEXT PRIMARY KEY
+        ) WITHOUT ROWID
+    """
+
+    def __init__(self, path):
+        """Open or create an index.
+
+        :param path: Path to the index database file.
+        """
+        self.path = path
+        dirpath = os.path.dirname(os.fspath(path))
+        if dirpath:
+            os.makedirs(dirpath, exist_ok=True)
+        self.__conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.__conn.execute(self.SCHEMA)
+        self.__conn.execute(self.SEEN_SCHEMA)
+        self.__conn.commit()
+
+    def __enter__(self):
+        """Return this object."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the index."""
+        self.close()
+
+    def __len__(self):
+        """Return number of entries in the index."""
+        cursor = self.__conn.execute("SELECT COUNT(*) FROM entries")
+        return cursor.fetchone()[0]
+
+    def is_current(self, url: str, stat: os.stat_result) -> bool:
+        """Return true if ``stat`` matches the indexed entry ``url``."""
+        self.__conn.execute("INSERT OR IGNORE INTO seen VALUES (?)", (url,))
+        cursor = self.__conn.execute(
+            "SELECT mtime_ns, size, inode FROM entries WHERE url = ?", (url,)
+        )
+        row = cursor.fetchone()
+        return row == (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def changed(self, entries: List[Tuple[str, os.stat_result]]) -> List[str]:
+        """Return URLs of ``entries`` that are new or changed and update them.
+
+        This looks up many entries per query, so it is much faster
+        than ``is_current`` and ``update`` for each entry.
+
+        :param entries: Sequence of ``(url, stat)`` of listed entries.
+        """
+        current = {}
+        for start in range(0, len(entries), BATCH_SIZE):
+            urls = [url for url, _ in entries[start : start + BATCH_SIZE]]
+            marks = ",".join("?" * len(urls))
+            cursor = self.__conn.execute(
+                "SELECT url, mtime_ns, size, inode FROM entries "
+                f"WHERE url IN ({marks})",
+                urls,
+            )
+            current.update((row[0], row[1:]) for row in cursor)
+        self.__conn.executemany(
+            "INSERT OR IGNORE INTO seen VALUES (?)", ((url,) for url, _ in entries)
+        )
+        rows = [
+            (url, stat.st_mtime_ns, stat.st_size, stat.st_ino) for url, stat in entries
+        ]
+        rows = [row for row in rows if current.get(row[0]) != row[1:]]
+        self.__conn.executemany(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", rows
+        )
+        return [row[0] for row in rows]
+
+    def update(self, url: str, stat: os.stat_result):
+        """Record ``stat`` of entry ``url``; it is saved by ``commit``."""
+        self.__conn.execute("INSERT OR IGNORE INTO seen VALUES (?)", (url,))
+        self.__conn.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+            (url, stat.st_mtime_ns, stat.st_size, stat.st_ino),
+        )
+
+    def prune(self, dirurl: str) -> int:
+        """Remove entries of directory ``dirurl`` that were not seen.
+
+        Only entries directly in the directory are removed, so one index
+        may be shared by the generators of nested directories. The
+        removal is saved by ``commit``.
+
+        :param dirurl: URL of the listed directory.
+
+        :return: Number of entries removed.
+        """
+        prefix = dirurl.rstrip("/") + "/"
+        cursor = self.__conn.execute(
+            "DELETE FROM entries "
+            "WHERE substr(url, 1, ?) = ? "
+            "AND instr(substr(url, ? + 1), '/') = 0 "
+            "AND url NOT IN (SELECT url FROM seen)",
+            (len(prefix), prefix, len(prefix)),
+        )
+        return cursor.rowcount
+
+    def commit(self):
+        """Save all updates since the last commit."""
+        self.__conn.execute("DELETE FROM seen")
+        self.__conn.commit()
+
+    def rollback(self):
+        """Discard all updates since the last commit."""
+        self.__conn.rollback()
+        self.__conn.execute("DELETE FROM seen")
+        self.__conn.commit()
+
+    def close(self):
+        """Close the index discarding updates that were not committed."""
+        self.__conn.close()
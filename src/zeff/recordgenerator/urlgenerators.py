@@ -20,16 +20,28 @@ __license__ = """
     See the License for the specific language governing permissions and
     limitations under the License.
 """
+import os
+import fnmatch
+import logging
 import pathlib
 import urllib
+import urllib.parse
+import concurrent.futures
+from html.parser import HTMLParser
+from .sourceindex import SourceIndex, BATCH_SIZE
 
-__all__ = ["entry_generator", "file_generator", "directory_generator"]
+__all__ = [
+    "entry_generator",
+    "file_generator",
+    "directory_generator",
+    "scan_generator",
+    "http_index_generator",
+]
 
-# To Do Generators
-# 1. HTTP index URL generator
+LOGGER = logging.getLogger("zeffclient.record.generator")
 
 
-def entry_generator(dirpath, allow=lambda p: True):
+def entry_generator(dirpath, allow=lambda p: True, index=None):
     """URL generator of entries in a path.
 
     Given a directory this will generate a URL to each entry in the
@@ -41,16 +53,21 @@ def entry_generator(dirpath, allow=lambda p: True):
     :param allow: A filter that accepts a ``pathlib.Path`` and returns
         ``True`` if it is acceptable: i.e. if only files are wanted then
         the using ``lambda p: p.is_file()`` would filter out any non-files.
+
+    :param index: A ``SourceIndex``, or the path to one, of entries
+        generated by a previous run. Only entries that are new or whose
+        modification time, size, or inode changed are generated, and
+        entries that no longer exist are pruned once every entry has
+        been listed. A ``SourceIndex`` is not committed, so commit it
+        after the generated entries are processed downstream. An index
+        given by path is committed once every entry has been listed. A
+        directory is only changed when entries are added to or removed
+        from it, not when the content of its entries changes.
     """
-    dirpath = pathlib.Path(dirpath)
-    for path in (p for p in dirpath.iterdir() if allow(p)):
-        if path.name.startswith("."):
-            continue
-        url = urllib.parse.urlunsplit(("file", "", str(path), "", ""))
-        yield url
+    return scan_generator(dirpath, lambda e: allow(pathlib.Path(e.path)), index)
 
 
-def file_generator(dirpath):
+def file_generator(dirpath, index=None):
     """URL generator of files in a path.
 
     Given a directory this will generate a URL to each file in the
@@ -58,12 +75,14 @@ def file_generator(dirpath):
 
     :param dirpath: The URL to the directory. This may be an explicit or
         implicit ``file`` URL.
+
+    :param index: Generate only new or changed files (see
+        ``entry_generator``).
     """
-    for entry in entry_generator(dirpath, allow=lambda p: p.is_file()):
-        yield entry
+    return scan_generator(dirpath, lambda e: e.is_file(), index)
 
 
-def directory_generator(dirpath):
+def directory_generator(dirpath, index=None):
     """URL generator of directories in a path.
 
     Each directory in the ``dirpath`` will be generated as a file
@@ -71,6 +90,182 @@ def directory_generator(dirpath):
 
     :param dirpath: The URL to the directory. This may be an explicit or
         implicit ``file`` URL.
+
+    :param index: Generate only new or changed directories (see
+        ``entry_generator``).
+    """
+    return scan_generator(dirpath, lambda e: e.is_dir(), index)
+
+
+def scan_generator(dirpath, allow, index=None):
+    """URL generator of entries in a path filtered by ``os.DirEntry``.
+
+    This is ``entry_generator`` with an ``allow`` filter that accepts
+    an ``os.DirEntry``, whose type is usually known without another
+    system call, so large directories are listed quickly.
+    """
+    opened = index is not None and not isinstance(index, SourceIndex)
+    if opened:
+        index = SourceIndex(index)
+    try:
+        batch = []
+        dirpath = pathlib.Path(dirpath)
+        with os.scandir(dirpath) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or not allow(entry):
+                    continue
+                url = file_url(entry.path)
+                if index is None:
+                    yield url
+                    continue
+                batch.append((url, entry.stat()))
+                if len(batch) >= BATCH_SIZE:
+                    yield from index.changed(batch)
+                    batch = []
+        if index is not None:
+            yield from index.changed(batch)
+            index.prune(file_url(str(dirpath)))
+            if opened:
+                index.commit()
+    finally:
+        if opened:
+            index.close()
+
+
+def file_url(path: str) -> str:
+    """Return the ``file`` URL of ``path``."""
+    return urllib.parse.urlunsplit(("file", "", path, "", ""))
+
+
+class _LinkParser(HTMLParser):
+    """Collect the ``href`` of every anchor in an HTML document."""
+
+    def __init__(self):
+        super().__init__()
+        self.links = []
+
+    def error(self, message):
+        """Ignore malformed markup."""
+
+    def handle_starttag(self, tag, attrs):
+        """Add the link of an anchor start tag."""
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.links.append(href)
+
+
+def index_links(url: str, text: str):
+    """Return ``(files, indexes)`` URLs linked from the HTTP index at ``url``.
+
+    A link that ends with ``/`` is a subindex. Links to queries (e.g.
+    column sort links), fragments, and URLs outside of ``url`` (e.g.
+    the parent directory) are ignored.
     """
-    for entry in entry_generator(dirpath, allow=lambda p: p.is_dir()):
-        yield entry
+    parser = _LinkParser()
+    parser.feed(text)
+    parser.close()
+    files, indexes = [], []
+    for href in parser.links:
+        if href.startswith(("?", "#")):
+            continue
+        link, _ = urllib.parse.urldefrag(urllib.parse.urljoin(url, href))
+        if link == url or not link.startswith(url) or "?" in link:
+            continue
+        (indexes if link.endswith("/") else files).append(link)
+    return files, indexes
+
+
+def http_index_generator(
+    url: str,
+    depth: int = 1,
+    pattern: str = None,
+    max_workers: int = 8,
+    session=None,
+    timeout: float = 10.0,
+):
+    """URL generator of files in an HTTP index (directory listing).
+
+    The index at ``url`` and its subindexes, to ``depth`` levels, are
+    fetched concurrently over a pooled session, and the URL of each
+    file is generated as soon as the index that links it is parsed,
+    so records may be built while the crawl continues.
+
+    A subindex that cannot be fetched is logged and skipped.
+
+    :param url: The URL of the index; a trailing ``/`` is added if
+        missing.
+
+    :param depth: Number of index levels to list: ``1`` lists only the
+        files in ``url``, ``2`` also lists the files of its subindexes,
+        and so on. ``None`` crawls every subindex.
+
+    :param pattern: A ``fnmatch`` pattern the last path segment of a
+        file must match, e.g. ``*.jpeg``; the default is every file.
+
+    :param max_workers: Maximum number of concurrent index requests.
+
+    :param session: A ``requests.Session`` to fetch indexes with; the
+        default is a new session pooling ``max_workers`` connections.
+
+    :param timeout: Seconds to wait for a response to each index request.
+
+    :raises requests.RequestException: The index at ``url`` could not
+        be fetched, or did not respond in ``timeout`` seconds.
+    """
+    # pylint: disable=import-outside-toplevel
+    # pylint: disable=too-many-locals
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+    url = url if url.endswith("/") else url + "/"
+
+    def fetch(index_url):
+        resp = session.get(index_url, timeout=timeout)
+        resp.raise_for_status()
+        return resp.text
+
+    def matches(link):
+        if pattern is None:
+            return True
+        name = urllib.parse.unquote(urllib.parse.urlsplit(link).path.rsplit("/", 1)[-1])
+        return fnmatch.fnmatchcase(name, pattern)
+
+    seen = {url}
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="zeff-crawl"
+    )
+    running = {executor.submit(fetch, url): (url, 1)}
+    try:
+        while running:
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                index_url, level = running.pop(future)
+                try:
+                    text = future.result()
+                except requests.RequestException as err:
+                    if index_url == url:
+                        raise
+                    LOGGER.error("Unable to fetch index %s: %s", index_url, err)
+                    continue
+                files, indexes = index_links(index_url, text)
+                if depth is None or level < depth:
+                    for link in indexes:
+                        if link not in seen:
+                            seen.add(link)
+                            running[executor.submit(fetch, link)] = (link, level + 1)
+                for link in files:
+                    if link not in seen and matches(link):
+                        seen.add(link)
+                        yield link
+    finally:
+        for future in running:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff record pipeline tracing.
+
+A trace is made of spans: each timed operation of a record (build,
+validate, encode, request, and response parse) is a span, and the
+span of a record covers all of its operations. Tracing is sampled by
+record name, so a record is either traced through every stage or not
+traced at all.
+
+Traces are exported as Chrome trace-event JSON that can be opened in
+``chrome://tracing`` or Perfetto.
+"""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+__all__ = ["TRACER", "Tracer"]
+
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+
+CURRENT_RECORD: contextvars.ContextVar = contextvars.ContextVar(
+    "zeff_current_record", default=None
+)
+
+
+class Tracer:
+    """Collect sampled spans of records in the pipeline.
+
+    Hooks in the pipeline check ``enabled`` before doing any work, so
+    a tracer with a zero sample rate has almost no cost.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, max_spans: int = 1000000):
+        """Create a new tracer.
+
+        :param sample_rate: Fraction [0, 1] of records that are traced.
+
+        :param max_spans: Maximum number of spans kept; spans after
+            this are discarded.
+        """
+        self.__sample_rate = 0.0
+        self.__threshold = 0
+        self.enabled = False
+        self.sample_rate = sample_rate
+        self.max_spans = max_spans
+        self.dropped = 0
+        self.__spans: List[tuple] = []
+        self.__lock = threading.Lock()
+        self.__origin = time.perf_counter_ns()
+
+    @property
+    def sample_rate(self) -> float:
+        """Return fraction of records that are traced."""
+        return self.__sample_rate
+
+    @sample_rate.setter
+    def sample_rate(self, value: float):
+        self.__sample_rate = min(max(float(value), 0.0), 1.0)
+        self.__threshold = int(self.__sample_rate * 0xFFFFFFFF)
+        self.enabled = self.__sample_rate > 0.0
+
+    def sampled(self, name) -> bool:
+        """Return true if record ``name`` is traced.
+
+        The decision is a hash of the name, so every stage makes the
+        same decision for a record without sharing state.
+        """
+        if not self.enabled:
+            return False
+        if self.__threshold >= 0xFFFFFFFF:
+            return True
+        return zlib.crc32(str(name).encode("utf-8")) <= self.__threshold
+
+    def add(self, name: str, record, start: int, end: int, **args):
+        """Add a span of ``record`` if it is sampled.
+
+        :param name: Name of the operation.
+
+        :param record: Name of the record the operation was for.
+
+        :param start: Start time from ``time.perf_counter_ns``.
+
+        :param end: End time from ``time.perf_counter_ns``.
+
+        :param **args: Additional information about the span.
+        """
+        if not self.sampled(record):
+            return
+        span = (name, str(record), start, end, threading.get_ident(), args)
+        with self.__lock:
+            if len(self.__spans) < self.max_spans:
+                self.__spans.append(span)
+            else:
+                self.dropped += 1
+
+    @contextlib.contextmanager
+    def record(self, name):
+        """Make record ``name`` the current record of spans in the context."""
+        token = CURRENT_RECORD.set(name if self.sampled(name) else None)
+        try:
+            yield
+        finally:
+            CURRENT_RECORD.reset(token)
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args):
+        """Time a span of the current record if it is sampled.
+
+        The ``args`` dictionary may be updated inside the context to
+        add information that is only known at the end of the span.
+        """
+        record = CURRENT_RECORD.get()
+        if record is None:
+            yield args
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield args
+        finally:
+            self.add(name, record, start, time.perf_counter_ns(), **args)
+
+    def reset(self):
+        """Remove all spans."""
+        with self.__lock:
+            self.__spans = []
+            self.dropped = 0
+
+    def events(self) -> List[dict]:
+        """Return spans as Chrome trace events.
+
+        Each span is a complete (``X``) event on the thread it was
+        recorded on, and each record is an async (``b``/``e``) event
+        pair from the start of its first span to the end of its last.
+        """
+        with self.__lock:
+            spans = list(self.__spans)
+        pid = os.getpid()
+        origin = self.__origin
+        records: Dict[str, List[int]] = {}
+        events = []
+        for name, record, start, end, tid, args in spans:
+            events.append(
+                {
+                    "name": name,
+                    "cat": "zeff",
+                    "ph": "X",
+                    "ts": (start - origin) / 1000.0,
+                    "dur": (end - start) / 1000.0,
+                    "pid": pid,
+                    "tid": tid,
+                    "args": dict(args, record=record),
+                }
+            )
+            extent = records.setdefault(record, [start, end])
+            extent[0] = min(extent[0], start)
+            extent[1] = max(extent[1], end)
+        for record, (start, end) in records.items():
+            for phase, timestamp in [("b", start), ("e", end)]:
+                events.append(
+                    {
+                        "name": record,
+                        "cat": "record",
+                        "ph": phase,
+                        "id": record,
+                        "ts": (timestamp - origin) / 1000.0,
+                        "pid": pid,
+                        "tid": 0,
+                    }
+                )
+        events.sort(key=lambda e: e["ts"])
+        return events
+
+    def write_chrome(self, path, metadata: Optional[dict] = None):
+        """Write all spans to a Chrome trace-event JSON file at ``path``."""
+        trace = {"traceEvents": self.events(), "displayTimeUnit": "ms"}
+        if metadata:
+            trace["otherData"] = metadata
+        with open(path, "w") as file:
+            json.dump(trace, file)
+
+
+TRACER = Tracer()
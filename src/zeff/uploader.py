@@ -23,9 +23,14 @@ __license__ = """
 __all__ = ["Uploader"]
 
 import logging
+import concurrent.futures
+import urllib.parse
+import pathlib
 from .zeffcloud import ZeffCloudResourceMap
 from .cloud.exception import ZeffCloudException
 from .cloud.dataset import Dataset
+from .record import record_digest
+from .pipeline_events import EVENTS, UploadFailed
 
 LOGGER_UPLOADER = logging.getLogger("zeffclient.record.uploader")
 
@@ -36,7 +41,18 @@ class Uploader:
     # pylint: disable=too-few-public-methods
     # pylint: disable=too-many-arguments
 
-    def __init__(self, upstream, server_url, org_id, user_id, dataset_id):
+    def __init__(
+        self,
+        upstream,
+        server_url,
+        org_id,
+        user_id,
+        dataset_id,
+        index=None,
+        max_file_uploads=4,
+        resource_map=None,
+        dataset=None,
+    ):
         """Create new uploader.
 
         :param upstream: Generator of records to be uploaded.
@@ -48,18 +64,43 @@ class Uploader:
         :param user_id: The user id for authorization access.
 
         :param dataset_id: The dataset id that all uploads will be sent to.
+
+        :param index: An ``UploadIndex`` of records previously uploaded
+            to the dataset. Records whose content digest matches the
+            index are skipped, and successful uploads are added to the
+            index. File uploads interrupted in an earlier run are
+            resumed. The default is to upload every record.
+
+        :param max_file_uploads: Maximum number of files that will be
+            uploaded concurrently for unstructured data items that have
+            ``upload`` set.
+
+        :param resource_map: A ``ZeffCloudResourceMap`` for ``server_url``
+            to use instead of creating a new one.
+
+        :param dataset: The loaded ``Dataset`` for ``dataset_id`` to use
+            instead of loading it from Zeff Cloud.
         """
         self.server_url = server_url
         self.org_id = org_id
         self.user_id = user_id
         self.dataset_id = dataset_id
         self.upstream = upstream
-
-        info = ZeffCloudResourceMap.default_info()
-        self.resource_map = ZeffCloudResourceMap(
-            info, root=server_url, org_id=org_id, user_id=user_id
-        )
-        self.dataset = Dataset(self.dataset_id, self.resource_map)
+        self.index = index
+        self.skipped = 0
+        self.failed = 0
+        self.max_file_uploads = max_file_uploads
+        self.__executor = None
+
+        if resource_map is None:
+            info = ZeffCloudResourceMap.default_info()
+            resource_map = ZeffCloudResourceMap(
+                info, root=server_url, org_id=org_id, user_id=user_id
+            )
+        self.resource_map = resource_map
+        if dataset is None:
+            dataset = Dataset(self.dataset_id, self.resource_map)
+        self.dataset = dataset
 
     def __iter__(self):
         """Return this object."""
@@ -70,6 +111,68 @@ class Uploader:
         while True:
             try:
                 record = next(self.upstream)
-                return self.dataset.add_record(record)
+            except StopIteration:
+                self.close()
+                raise
+            try:
+                digest = None
+                if self.index is not None:
+                    digest = record_digest(record)
+                    if self.index.is_current(record.name, digest):
+                        LOGGER_UPLOADER.info("Skip upload of unchanged %s", record.name)
+                        self.skipped = self.skipped + 1
+                        continue
+                try:
+                    self.upload_files(record)
+                except ZeffCloudException as err:
+                    if EVENTS.active:
+                        EVENTS.emit(UploadFailed(record.name, error=str(err)))
+                    raise
+                ret = self.dataset.add_record(record)
+                if self.index is not None:
+                    self.index.update(record.name, digest, ret.record_id)
+                return ret
             except ZeffCloudException as err:
+                self.failed = self.failed + 1
                 LOGGER_UPLOADER.exception(err)
+
+    def close(self):
+        """Release file upload workers and flush the upload index."""
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+        if self.index is not None:
+            self.index.flush()
+
+    def upload_files(self, record):
+        """Upload content of unstructured data that has ``upload`` set.
+
+        Files in the record are uploaded concurrently, bounded by
+        ``max_file_uploads``, and this will return when all have
+        completed. Each uploaded item has ``location`` set to the
+        content's URL in Zeff Cloud.
+
+        :raises ZeffCloudException: Exception in communication with Zeff Cloud.
+        """
+        items = [udi for udi in record.unstructured_data if udi.upload]
+        if not items:
+            return
+        if self.__executor is None:
+            self.__executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_file_uploads
+            )
+        futures = [self.__executor.submit(self.upload_file, udi) for udi in items]
+        for future in concurrent.futures.as_completed(futures):
+            future.result()
+
+    def upload_file(self, udi):
+        """Upload content of a single unstructured data item."""
+        parts = urllib.parse.urlsplit(udi.data_uri)
+        if parts[0] != "file":
+            LOGGER_UPLOADER.warning(
+                "Unable to upload content of non-file URL %s", udi.data_uri
+            )
+            return
+        path = pathlib.Path(urllib.parse.unquote(parts[2]))
+        file_type = getattr(udi.file_type, "name", None)
+        udi.location = self.dataset.add_file(path, file_type, self.index).location
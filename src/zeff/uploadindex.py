@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff local index of records uploaded to a dataset."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+__all__ = ["UploadIndex"]
+
+import os
+import pathlib
+import sqlite3
+import datetime
+import threading
+from typing import List, Optional, Tuple
+
+
+class UploadIndex:
+    """Index of record digests from the last successful upload.
+
+    The index is a SQLite database that maps a record name to the
+    digest of the record content (see ``zeff.record.record_digest``)
+    and the record id assigned by Zeff Cloud when it was last
+    successfully uploaded. A record whose digest matches the index
+    is unchanged and does not need to be uploaded again.
+
+    There should be one index per dataset.
+
+    The index also holds the Zeff Cloud ``fileId`` of each unstructured
+    data file upload that was started, so an upload interrupted by the
+    process exiting resumes from the bytes the server already has.
+
+    A shard of a sharded upload (see ``zeff.shard_generator``) records
+    its uploads in a journal of its own next to the dataset index, and
+    looks up records in the journal then the dataset index. Journals
+    are added to the dataset index with ``merge``.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS uploads (
+            name TEXT PRIMARY KEY,
+            digest TEXT NOT NULL,
+            record_id TEXT,
+            uploaded_at TEXT NOT NULL
+        )
+    """
+
+    FILES_SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            file_id TEXT NOT NULL
+        )
+    """
+
+    @staticmethod
+    def dataset_dirpath(dirpath=None) -> pathlib.Path:
+        """Return the directory of dataset indices, creating it if necessary.
+
+        :param dirpath: Directory that contains dataset indices. The
+            default is ``${PWD}/var/index``.
+        """
+        if dirpath is None:
+            dirpath = pathlib.Path.cwd() / "var" / "index"
+        dirpath = pathlib.Path(dirpath)
+        os.makedirs(dirpath, exist_ok=True)
+        return dirpath
+
+    @classmethod
+    def for_dataset(
+        cls, dataset_id: str, dirpath=None, shard: Tuple[int, int] = None
+    ) -> "UploadIndex":
+        """Open the index for a dataset.
+
+        :param dataset_id: Dataset the index is for.
+
+        :param dirpath: Directory that contains dataset indices. The
+            default is ``${PWD}/var/index``.
+
+        :param shard: A ``(shard, shards)`` tuple to open the journal
+            of that shard instead of the dataset index.
+        """
+        dirpath = cls.dataset_dirpath(dirpath)
+        path = dirpath / f"{dataset_id}.sqlite3"
+        if shard is None:
+            return cls(path)
+        journal = dirpath / f"{dataset_id}.shard-{shard[0]}-of-{shard[1]}.sqlite3"
+        return cls(journal, base=path)
+
+    @classmethod
+    def journals(cls, dataset_id: str, dirpath=None) -> List[pathlib.Path]:
+        """Return paths of all shard journals of a dataset."""
+        dirpath = cls.dataset_dirpath(dirpath)
+        return sorted(dirpath.glob(f"{dataset_id}.shard-*.sqlite3"))
+
+    def __init__(self, path, commit_interval: int = 64, base=None):
+        """Open or create an index.
+
+        :param path: Path to the index database file.
+
+        :param commit_interval: Number of updates to hold before they
+            are committed to the database. Updates not committed when
+            the process exits are lost, which only causes those records
+            to be uploaded again.
+
+        :param base: Path to an index that is searched, but not
+            updated, for records not in this index.
+        """
+        self.path = path
+        self.commit_interval = commit_interval
+        self.__pending = 0
+        # The index is used from the uploader's worker threads, so every
+        # use of the shared connection holds the lock.
+        self.__lock = threading.RLock()
+        self.__conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.__conn.execute(self.SCHEMA)
+        self.__conn.execute(self.FILES_SCHEMA)
+        self.__conn.commit()
+        self.__tables = ["uploads"]
+        self.__file_tables = ["files"]
+        if base is not None and os.path.exists(base):
+            self.__conn.execute("ATTACH DATABASE ? AS base", (str(base),))
+            self.__tables.append("base.uploads")
+            cursor = self.__conn.execute(
+                "SELECT 1 FROM base.sqlite_master WHERE type = 'table' AND name = ?",
+                ("files",),
+            )
+            if cursor.fetchone():
+                self.__file_tables.append("base.files")
+
+    def __enter__(self):
+        """Return this object."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the index."""
+        self.close()
+
+    def __len__(self):
+        """Return number of records in the index."""
+        with self.__lock:
+            cursor = self.__conn.execute("SELECT COUNT(*) FROM uploads")
+            return cursor.fetchone()[0]
+
+    def __lookup(self, column: str, name: str) -> Optional[str]:
+        with self.__lock:
+            for table in self.__tables:
+                cursor = self.__conn.execute(
+                    f"SELECT {column} FROM {table} WHERE name = ?", (str(name),)
+                )
+                row = cursor.fetchone()
+                if row:
+                    return row[0]
+        return None
+
+    def digest(self, name: str) -> Optional[str]:
+        """Return digest of last successful upload of record ``name``."""
+        return self.__lookup("digest", name)
+
+    def record_id(self, name: str) -> Optional[str]:
+        """Return Zeff Cloud record id of last upload of record ``name``."""
+        return self.__lookup("record_id", name)
+
+    def is_current(self, name: str, digest: str) -> bool:
+        """Return true if ``digest`` matches last upload of record ``name``."""
+        return self.digest(name) == digest
+
+    def update(self, name: str, digest: str, record_id: Optional[str] = None):
+        """Record a successful upload of record ``name``."""
+        with self.__lock:
+            self.__conn.execute(
+                "INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?)",
+                (
+                    str(name),
+                    digest,
+                    record_id,
+                    datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                ),
+            )
+            self.__pending += 1
+            if self.__pending >= self.commit_interval:
+                self.flush()
+
+    def file_id(self, path) -> Optional[str]:
+        """Return ``fileId`` of the upload of the file at ``path``.
+
+        ``None`` is returned if no upload was started or the file has
+        changed since it was. A shard journal also looks in the dataset
+        index.
+        """
+        stat = os.stat(path)
+        with self.__lock:
+            for table in self.__file_tables:
+                cursor = self.__conn.execute(
+                    f"SELECT file_id FROM {table} "
+                    "WHERE path = ? AND size = ? AND mtime_ns = ?",
+                    (str(path), stat.st_size, stat.st_mtime_ns),
+                )
+                row = cursor.fetchone()
+                if row:
+                    return row[0]
+        return None
+
+    def update_file(self, path, file_id: str):
+        """Record that an upload of the file at ``path`` started as ``file_id``.
+
+        This is committed immediately so it outlives the process.
+        """
+        stat = os.stat(path)
+        with self.__lock:
+            self.__conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                (str(path), stat.st_size, stat.st_mtime_ns, file_id),
+            )
+            self.__conn.commit()
+
+    def remove(self, name: str):
+        """Remove record ``name`` from the index."""
+        with self.__lock:
+            self.__conn.execute("DELETE FROM uploads WHERE name = ?", (str(name),))
+            self.flush()
+
+    def merge(self, path):
+        """Add every upload recorded in the index at ``path`` to this index.
+
+        Uploads in ``path`` replace uploads of the same record name.
+        """
+        with self.__lock:
+            self.flush()
+            self.__conn.execute("ATTACH DATABASE ? AS journal", (str(path),))
+            try:
+                self.__conn.execute(
+                    "INSERT OR REPLACE INTO uploads SELECT * FROM journal.uploads"
+                )
+                self.__conn.execute(
+                    "INSERT OR REPLACE INTO files SELECT * FROM journal.files"
+                )
+                self.__conn.commit()
+            finally:
+                self.__conn.execute("DETACH DATABASE journal")
+
+    def flush(self):
+        """Commit pending updates to the database."""
+        with self.__lock:
+            self.__conn.commit()
+            self.__pending = 0
+
+    def close(self):
+        """Commit pending updates and close the database."""
+        with self.__lock:
+            self.flush()
+            self.__conn.close()
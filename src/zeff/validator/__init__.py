@@ -27,6 +27,8 @@ __license__ = """
 """
 
 from .record import *
+from .accessibility import *
 from .generic import *
 from .temporal import *
 from .geospatial import *
+from .schema import *
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff unstructured data accessibility probe."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+__all__ = ["AccessibilityProbe"]
+
+import os
+import stat
+import time
+import threading
+import urllib.parse
+import concurrent.futures
+from collections import OrderedDict
+from typing import Iterable, Dict, Tuple, Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class AccessibilityProbe:
+    """Check that unstructured data URIs are accessible.
+
+    Results are cached by URI for ``ttl`` seconds. A cached result for
+    a ``file`` URI is also discarded if the file modification time has
+    changed, so records that share files are only probed once while
+    the files stay the same. The cache holds at most ``max_entries``
+    results, discarding the least recently used. An HTTP request that
+    fails without a response (e.g. a timeout) is not cached, so the
+    next probe of the URI tries again.
+
+    ``http`` and ``https`` URIs are checked with a ``HEAD`` request on
+    a pooled session, and ``probe_all`` will check many URIs
+    concurrently.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        max_workers: int = 8,
+        timeout=10.0,
+        max_entries: int = 65536,
+    ):
+        """Create a new probe.
+
+        :param ttl: Seconds a probe result remains valid.
+
+        :param max_workers: Maximum number of concurrent HTTP probes,
+            which is also the size of the connection pool.
+
+        :param timeout: Seconds to wait for an HTTP response.
+
+        :param max_entries: Maximum number of cached results.
+        """
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.__cache: "OrderedDict[str, Tuple[str, float, Optional[int]]]"
+        self.__cache = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__session = None
+        self.__executor = None
+
+    def __call__(self, uri: str) -> str:
+        """Return accessibility of ``uri``: ``OK`` or reason not accessible."""
+        parts = urllib.parse.urlsplit(uri)
+        if parts[0] == "file":
+            return self.probe_file(uri, urllib.parse.unquote(parts[2]))
+        if parts[0] in ["http", "https"]:
+            return self.probe_http(uri)
+        return f"Unknown URL scheme {parts[0]}"
+
+    def probe_all(self, uris: Iterable[str]) -> Dict[str, str]:
+        """Probe each of ``uris`` concurrently and return mapping to results."""
+        uris = list(dict.fromkeys(uris))
+        pending = [
+            u
+            for u in uris
+            if urllib.parse.urlsplit(u)[0] in ["http", "https"]
+            and self.cached(u) is None
+        ]
+        if len(pending) > 1:
+            if self.__executor is None:
+                self.__executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers
+                )
+            list(self.__executor.map(self, pending))
+        return {u: self(u) for u in uris}
+
+    def cached(self, uri: str, mtime: Optional[int] = None) -> Optional[str]:
+        """Return cached result for ``uri`` or ``None`` if not valid."""
+        with self.__lock:
+            entry = self.__cache.get(uri)
+            if entry is None:
+                return None
+            value, expires, cmtime = entry
+            if expires < time.monotonic():
+                del self.__cache[uri]
+                return None
+            self.__cache.move_to_end(uri)
+        if cmtime != mtime:
+            return None
+        return value
+
+    def clear(self):
+        """Remove all cached results."""
+        with self.__lock:
+            self.__cache.clear()
+
+    def store(self, uri: str, value: str, mtime: Optional[int] = None):
+        """Cache result ``value`` for ``uri``."""
+        with self.__lock:
+            self.__cache[uri] = (value, time.monotonic() + self.ttl, mtime)
+            self.__cache.move_to_end(uri)
+            while len(self.__cache) > self.max_entries:
+                self.__cache.popitem(last=False)
+
+    def __len__(self):
+        """Return number of cached results."""
+        return len(self.__cache)
+
+    def close(self):
+        """Shut down the probe workers and close the HTTP session.
+
+        The probe may be used again after it is closed.
+        """
+        with self.__lock:
+            executor, self.__executor = self.__executor, None
+            session, self.__session = self.__session, None
+        if executor is not None:
+            executor.shutdown()
+        if session is not None:
+            session.close()
+
+    def probe_file(self, uri: str, path: str) -> str:
+        """Return accessibility of a local file."""
+        try:
+            fstat = os.stat(path)
+        except FileNotFoundError:
+            return "file missing"
+        except OSError as err:
+            return str(err)
+
+        value = self.cached(uri, fstat.st_mtime_ns)
+        if value is not None:
+            return value
+        if not stat.S_ISREG(fstat.st_mode):
+            value = "not a file"
+        else:
+            try:
+                open(path, "rb").close()
+                value = "OK"
+            except OSError as err:
+                value = str(err)
+        self.store(uri, value, fstat.st_mtime_ns)
+        return value
+
+    def probe_http(self, uri: str) -> str:
+        """Return accessibility of an HTTP resource."""
+        value = self.cached(uri)
+        if value is not None:
+            return value
+        try:
+            resp = self.session.head(uri, allow_redirects=True, timeout=self.timeout)
+        except requests.RequestException as err:
+            # A transport failure may be transient so it is not cached.
+            return str(err)
+        value = resp.reason
+        self.store(uri, value)
+        return value
+
+    @property
+    def session(self) -> requests.Session:
+        """Return the HTTP session with a connection pool for probes."""
+        with self.__lock:
+            if self.__session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.max_workers, pool_maxsize=self.max_workers
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self.__session = session
+        return self.__session
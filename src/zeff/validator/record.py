@@ -23,10 +23,9 @@ __license__ = """
 __all__ = ["RecordValidator"]
 
 
+import atexit
 import logging
 import typing
-import urllib.parse
-import pathlib
 from ..record import (
     Record,
     StructuredData,
@@ -36,6 +35,10 @@ from ..record import (
     FileType,
 )
 from ..pipeline import LOGGER_VALIDATOR
+from .accessibility import AccessibilityProbe
+
+DEFAULT_PROBE = AccessibilityProbe()
+atexit.register(DEFAULT_PROBE.close)
 
 
 class RecordValidator:
@@ -44,12 +47,25 @@ class RecordValidator:
     This validator will check that required items are in a generic
     record.
 
+    Records may be validated one at a time by calling the validator,
+    or in batches with ``validate_batch``. Batch validation will also
+    reject any record with the same name as a record accepted by an
+    earlier batch of the same dataset, until ``reset_dataset`` is
+    called. ``validate_dataset`` may be overridden to check aggregate
+    properties of all records accepted (e.g. the dataset must contain
+    at least one record with a target).
+
     .. WARNING::
         Only one record whould be validated at a time by a single
         validator object.
     """
 
-    def __init__(self, model: bool, logger: logging.Logger = LOGGER_VALIDATOR):
+    def __init__(
+        self,
+        model: bool,
+        logger: logging.Logger = LOGGER_VALIDATOR,
+        probe: AccessibilityProbe = None,
+    ):
         """Initialize a new record validator.
 
         :param model: Will this record be added to a dataset model or to
@@ -58,9 +74,16 @@ class RecordValidator:
 
         :param logger: A ``logging.Logger`` instance to assign to this
             validator. The default is ``zeffclient.record.validator``.
+
+        :param probe: An ``AccessibilityProbe`` that checks unstructured
+            data URIs. The default is a probe shared by all validators
+            so results are cached across validators.
         """
         self.__model = model
         self.__logger = logger
+        self.__probe = probe if probe is not None else DEFAULT_PROBE
+        self.record_names: typing.Set[str] = set()
+        self.__accessible: typing.Dict[str, str] = {}
 
     @property
     def model(self) -> bool:
@@ -72,6 +95,11 @@ class RecordValidator:
         """Logger assigned to this validator."""
         return self.__logger
 
+    @property
+    def probe(self) -> AccessibilityProbe:
+        """Accessibility probe assigned to this validator."""
+        return self.__probe
+
     def __call__(self, record: Record):
         """Validate an individual record.
 
@@ -91,6 +119,64 @@ class RecordValidator:
             integer but gets a descrete value such as a string).
         """
         self.logger.info("Begin validating record %s", record.name)
+        try:
+            self.__validate(record)
+        finally:
+            self.__accessible = {}
+        self.logger.info("End validating record %s", record.name)
+
+    def reset_dataset(self):
+        """Forget the record names accepted by ``validate_batch``.
+
+        ``zeff.validation_generator`` calls this before the first batch
+        and after ``validate_dataset``, so each run is a new dataset.
+        """
+        self.record_names.clear()
+
+    def validate_batch(
+        self, records: typing.Iterable[Record]
+    ) -> typing.List[typing.Tuple[Record, typing.Optional[Exception]]]:
+        """Validate a batch of records.
+
+        Each record is validated as if by calling the validator, but
+        the unstructured data of the entire batch is probed for
+        accessibility concurrently, and progress is logged once per
+        batch rather than for each record. A record with the name of a
+        record already accepted in this dataset (see ``reset_dataset``)
+        is invalid.
+
+        .. CAUTION::
+            Subclasses should not override this method; ``validate_yyz``
+            method should be overriden instead.
+
+        :return: A list of ``(record, error)`` tuples in the same order
+            as ``records``, where ``error`` is ``None`` if the record is
+            valid, or the ``TypeError`` or ``ValueError`` describing why
+            it is invalid.
+        """
+        records = list(records)
+        self.logger.info("Begin validating batch of %d records", len(records))
+        self.__accessible = self.probe.probe_all(
+            d.data_uri for r in records for d in r.unstructured_data
+        )
+        results: typing.List[typing.Tuple[Record, typing.Optional[Exception]]] = []
+        try:
+            for record in records:
+                try:
+                    if record.name in self.record_names:
+                        raise ValueError(f"Record {record.name}: duplicate record name")
+                    self.__validate(record)
+                    self.record_names.add(record.name)
+                    results.append((record, None))
+                except (TypeError, ValueError) as err:
+                    results.append((record, err))
+        finally:
+            self.__accessible = {}
+        self.logger.info("End validating batch of %d records", len(records))
+        return results
+
+    def __validate(self, record: Record):
+        """Validate a record without progress logging."""
         self.reset()
         try:
             self.validate_properties(record)
@@ -103,6 +189,13 @@ class RecordValidator:
                 raise ValueError(
                     "Record must have at least one UnstructuredData object."
                 )
+            missing = [
+                d.data_uri
+                for d in record.unstructured_data
+                if d.data_uri not in self.__accessible
+            ]
+            if missing:
+                self.__accessible.update(self.probe.probe_all(missing))
             for udata in record.unstructured_data:
                 self.validate_unstructured_data(udata)
             self.validate_record(record)
@@ -110,7 +203,6 @@ class RecordValidator:
             raise TypeError(f"Record {record.name}: {err}")
         except ValueError as err:
             raise ValueError(f"Record {record.name}: {err}")
-        self.logger.info("End validating record %s", record.name)
 
     def reset(self):
         """Reset the validator to an initial state for record validation.
@@ -119,6 +211,17 @@ class RecordValidator:
         the validator object.
         """
 
+    def validate_dataset(self):
+        """Validate the aggregate of all records accepted by this validator.
+
+        This is called after the last record has been validated.
+        Subclasses should override this method for checks that need
+        every record (e.g. at least one record has a target), keeping
+        any state they need in ``validate_record``.
+
+        :exception ValueError: If the records as a whole are invalid.
+        """
+
     def validate_record(self, record: Record):
         """Validate the entire record.
 
@@ -174,24 +277,7 @@ class RecordValidator:
         if data.file_type not in FileType:
             raise TypeError(f"file_type `{data.file_type}` is not FileType")
 
-        parts = urllib.parse.urlsplit(data.data_uri)
-        if parts[0] == "file":
-            value = "OK"
-            path = pathlib.Path(urllib.parse.unquote(parts[2]))
-            if not path.exists():
-                value = "file missing"
-            elif not path.is_file():
-                value = "not a file"
-            else:
-                try:
-                    path.open("r").close()
-                except OSError as err:
-                    value = str(err)
-        elif parts[0] in ["http", "https"]:
-            url = "https://docs.python.org/3/library/urllib.request.html"
-            req = urllib.request.Request(url, method="HEAD")
-            resp = urllib.request.urlopen(req)
-            value = resp.reason
-        else:
-            value = f"Unknown URL scheme {parts[0]}"
-        data.accessible = value
+        accessible = self.__accessible.get(data.data_uri)
+        data.accessible = (
+            accessible if accessible is not None else self.probe(data.data_uri)
+        )
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff record validation against a fixed structured data schema."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+__all__ = ["ColumnSchema", "RecordSchema", "RecordSchemaValidator"]
+
+import dataclasses
+import typing
+from .record import RecordValidator
+from ..record import Record, StructuredData, Target, DataType
+
+NUMERIC = (int, float)
+
+
+@dataclasses.dataclass(frozen=True)
+class ColumnSchema:
+    """Schema of a single named structured data item.
+
+    :property name: Name of the structured data item.
+
+    :property data_type: Required ``DataType`` of the item.
+
+    :property target: Required ``Target`` of the item.
+
+    :property required: Item must be in every record.
+
+    :property minimum: Smallest allowed value of a continuous item.
+
+    :property maximum: Largest allowed value of a continuous item.
+
+    :property categories: Allowed values of a category item.
+    """
+
+    name: str
+    data_type: DataType
+    target: Target = Target.IGNORE
+    required: bool = True
+    minimum: typing.Optional[float] = None
+    maximum: typing.Optional[float] = None
+    categories: typing.Optional[typing.FrozenSet[object]] = None
+
+    def compile(self) -> typing.Callable[[StructuredData], typing.List[str]]:
+        """Return a function that checks a structured data item.
+
+        The function returns a list of violation messages that will
+        be empty if the item is valid.
+        """
+        # pylint: disable=too-many-locals
+        name = self.name
+        data_type = self.data_type
+        target = self.target
+        minimum = self.minimum
+        maximum = self.maximum
+        categories = frozenset(self.categories) if self.categories is not None else None
+        continuous = data_type is DataType.CONTINUOUS
+
+        def check(data: StructuredData) -> typing.List[str]:
+            errors = []
+            if data.data_type is not data_type:
+                errors.append(
+                    f"{name}: data_type `{data.data_type}` is not {data_type}"
+                )
+            if data.target is not target:
+                errors.append(f"{name}: target `{data.target}` is not {target}")
+            value = data.value
+            if continuous:
+                vtype = type(value)
+                if vtype not in NUMERIC and (
+                    vtype is bool or not isinstance(value, NUMERIC)
+                ):
+                    errors.append(f"{name}: value `{value}` is not continuous")
+                    return errors
+                if minimum is not None and value < minimum:
+                    errors.append(f"{name}: value `{value}` is less than {minimum}")
+                if maximum is not None and value > maximum:
+                    errors.append(f"{name}: value `{value}` is greater than {maximum}")
+            elif categories is not None and value not in categories:
+                errors.append(f"{name}: value `{value}` is not an allowed category")
+            return errors
+
+        return check
+
+    def violations(
+        self, values: typing.Sequence[object]
+    ) -> typing.Iterator[typing.Tuple[int, str]]:
+        """Check all values of a column in a single pass.
+
+        :return: Iterator of ``(index, message)`` for each value that
+            is invalid, in the order of the values.
+        """
+        if self.data_type is DataType.CONTINUOUS:
+            minimum = self.minimum
+            maximum = self.maximum
+            for i, v in enumerate(values):
+                vtype = type(v)
+                if vtype not in NUMERIC and (
+                    vtype is bool or not isinstance(v, NUMERIC)
+                ):
+                    yield i, f"value `{v}` is not continuous"
+                elif minimum is not None and v < minimum:
+                    yield i, f"value `{v}` is less than {minimum}"
+                elif maximum is not None and v > maximum:
+                    yield i, f"value `{v}` is greater than {maximum}"
+        elif self.categories is not None:
+            categories = frozenset(self.categories)
+            for i, v in enumerate(values):
+                if v not in categories:
+                    yield i, f"value `{v}` is not an allowed category"
+
+    def check_column(self, values: typing.Sequence[object]) -> typing.List[str]:
+        """Check all values of a column and return violation messages.
+
+        The values are checked in a single pass, and messages are in
+        the order of the values.
+        """
+        name = self.name
+        return [f"{name}[{i}]: {msg}" for i, msg in self.violations(values)]
+
+
+class RecordSchema:
+    """Fixed schema of the structured data in every record of a dataset.
+
+    The schema is compiled once into a check per column so a record
+    is validated in a single pass over its structured data.
+    """
+
+    def __init__(
+        self, columns: typing.Iterable[ColumnSchema], allow_unknown: bool = True
+    ):
+        """Create a new schema.
+
+        :param columns: Schema for each named structured data item.
+
+        :param allow_unknown: Allow structured data items that are
+            not in the schema.
+        """
+        self.columns = {c.name: c for c in columns}
+        self.allow_unknown = allow_unknown
+        self.checks = {name: c.compile() for name, c in self.columns.items()}
+        self.required = frozenset(c.name for c in self.columns.values() if c.required)
+
+    def check_names(self, names: typing.Iterable[str], model: bool = False):
+        """Return violation messages for missing or unknown item names.
+
+        :param model: Records are for a model so target items are not
+            required.
+        """
+        names = set(names)
+        required = self.required
+        if model:
+            required = {n for n in required if self.columns[n].target is not Target.YES}
+        errors = [f"{n}: required item missing" for n in sorted(required - names)]
+        if not self.allow_unknown:
+            unknown = names - self.columns.keys()
+            errors.extend(f"{n}: item not in schema" for n in sorted(unknown))
+        return errors
+
+    def check_item(self, data: StructuredData) -> typing.List[str]:
+        """Return violation messages for a single structured data item."""
+        check = self.checks.get(data.name)
+        if check is None:
+            return []
+        return check(data)
+
+    def check(self, record: Record, model: bool = False) -> typing.List[str]:
+        """Return all violation messages for the record's structured data."""
+        errors = self.check_names((d.name for d in record.structured_data), model)
+        checks = self.checks
+        for data in record.structured_data:
+            check = checks.get(data.name)
+            if check is not None:
+                errors.extend(check(data))
+        return errors
+
+    def check_columns(
+        self, columns: typing.Mapping[str, typing.Sequence[object]]
+    ) -> typing.List[str]:
+        """Return all violation messages for a columnar batch of values.
+
+        Each column is checked in a single pass over its values.
+
+        :param columns: Mapping of structured data name to the sequence
+            of values for that name, one value per record.
+        """
+        errors = self.check_names(columns.keys())
+        for name, values in columns.items():
+            column = self.columns.get(name)
+            if column is not None:
+                errors.extend(column.check_column(values))
+        return errors
+
+    def check_batch(
+        self, records: typing.Sequence[Record], model: bool = False
+    ) -> typing.List[typing.List[str]]:
+        """Return all violation messages for each record of a batch.
+
+        The messages are those of ``check``, but the values of the
+        batch are gathered into columns and each column is checked in
+        a single pass.
+
+        :return: A list of violation messages for each record, in the
+            order of ``records``.
+        """
+        errors = [
+            self.check_names((d.name for d in r.structured_data), model)
+            for r in records
+        ]
+        columns: typing.Dict[str, typing.List[object]] = {}
+        rows: typing.Dict[str, typing.List[int]] = {}
+        for i, record in enumerate(records):
+            for data in record.structured_data:
+                name = data.name
+                column = self.columns.get(name)
+                if column is None:
+                    continue
+                data_type, target = column.data_type, column.target
+                if data.data_type is not data_type:
+                    errors[i].append(
+                        f"{name}: data_type `{data.data_type}` is not {data_type}"
+                    )
+                if data.target is not target:
+                    errors[i].append(f"{name}: target `{data.target}` is not {target}")
+                columns.setdefault(name, []).append(data.value)
+                rows.setdefault(name, []).append(i)
+        for name, values in columns.items():
+            row = rows[name]
+            for j, msg in self.columns[name].violations(values):
+                errors[row[j]].append(f"{name}: {msg}")
+        return errors
+
+
+class RecordSchemaValidator(RecordValidator):
+    """Zeff Record Validator for a dataset with a fixed schema.
+
+    Subclass and set the ``schema`` class attribute to declare the
+    schema once for all records::
+
+        class HouseValidator(RecordSchemaValidator):
+            schema = RecordSchema([
+                ColumnSchema("price", DataType.CONTINUOUS, Target.YES, minimum=0),
+                ColumnSchema("style", DataType.CATEGORY, Target.NO,
+                             categories={"ranch", "colonial"}),
+            ])
+
+    All schema violations in a record are reported together in a
+    single ``ValueError``. The records of a ``validate_batch`` are
+    checked together with ``RecordSchema.check_batch``.
+
+    .. WARNING::
+        Only one record whould be validated at a time by a single
+        validator object.
+    """
+
+    schema: typing.Optional[RecordSchema] = None
+
+    def __init__(self, *argv, schema: RecordSchema = None, **kwargs):
+        """See RecordValidator.__init__.
+
+        :param schema: Schema for records. The default is the ``schema``
+            class attribute.
+        """
+        super().__init__(*argv, **kwargs)
+        if schema is not None:
+            self.schema = schema
+        if self.schema is None:
+            raise TypeError(f"{type(self).__name__} requires a RecordSchema")
+        self.violations: typing.List[str] = []
+        self.batch: typing.Optional[typing.Dict[int, typing.List[str]]] = None
+
+    def validate_batch(self, records: typing.Iterable[Record]):
+        """See RecordValidator.validate_batch.
+
+        The structured data of the batch is checked column by column
+        with ``RecordSchema.check_batch`` before the records are
+        validated.
+        """
+        records = list(records)
+        violations = self.schema.check_batch(records, self.model)
+        self.batch = {id(r): v for r, v in zip(records, violations)}
+        try:
+            return super().validate_batch(records)
+        finally:
+            self.batch = None
+
+    def reset(self):
+        """See RecordValidator.reset."""
+        super().reset()
+        self.violations = []
+
+    def validate_structured_data_aggregation(self, names: typing.Iterable[str]):
+        """See RecordValidator.validate_structured_data_aggregation."""
+        if self.batch is None:
+            self.violations.extend(self.schema.check_names(names, self.model))
+
+    def validate_structured_data(self, data: StructuredData):
+        """See RecordValidator.validate_structured_data."""
+        check = self.schema.checks.get(data.name)
+        if check is None:
+            super().validate_structured_data(data)
+        elif self.batch is None:
+            self.violations.extend(check(data))
+
+    def validate_record(self, record: Record):
+        """See RecordValidator.validate_record."""
+        if self.batch is not None:
+            self.violations.extend(self.batch.get(id(record), []))
+        if self.violations:
+            raise ValueError("; ".join(self.violations))
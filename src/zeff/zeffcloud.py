@@ -21,12 +21,12 @@ __license__ = """
     limitations under the License.
 """
 
+import copy
 import re
 import dataclasses
 from typing import List, Dict
 from pathlib import Path
 import urllib.parse
-import yaml
 
 
 @dataclasses.dataclass
@@ -76,15 +76,25 @@ class ZeffCloudResource:
 class ZeffCloudResourceMap(dict):
     """Zeff Cloud map of tag URI to resources."""
 
+    __default_info = None
+
     @classmethod
     def default_info(cls):
-        """Return the default zeffcloud YAML configuration file."""
+        """Return the default zeffcloud YAML configuration file.
 
-        dpath = Path(__file__).parent
-        path = dpath / "zeffcloud.yml"
-        with open(path, "r") as yfile:
-            info = yaml.load(yfile, Loader=yaml.SafeLoader)
-        return info
+        The file is parsed once and a copy of the parsed information is
+        returned on each call.
+        """
+        # pylint: disable=import-outside-toplevel
+        if ZeffCloudResourceMap.__default_info is None:
+            import yaml
+
+            dpath = Path(__file__).parent
+            path = dpath / "zeffcloud.yml"
+            with open(path, "r") as yfile:
+                info = yaml.load(yfile, Loader=yaml.SafeLoader)
+            ZeffCloudResourceMap.__default_info = info
+        return copy.deepcopy(ZeffCloudResourceMap.__default_info)
 
     def __init__(self, info, root="https://api.zeff.ai/", **argv):
         """Create mapping of tag URL to ZeffCloudResource objects.
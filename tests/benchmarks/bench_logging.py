@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff benchmark of logging overhead in the record upload loop.
+
+Run with ``python -m tests.benchmarks.bench_logging``. Each record in
+the loop makes the same log calls as the pipeline (build, begin and
+end validating, begin and end upload), and the loop is timed with the
+default CLI logging configuration written synchronously, through the
+queue listener, and through the queue listener with INFO sampling.
+
+On fast local storage the queue listener alone is only about 1.05x
+faster than synchronous file handlers, as formatting still happens on
+one thread; nearly all of the gain comes from sampling, which drops
+records before they are copied and queued. The queue mainly hides
+disk latency from the pipeline thread on slow storage."""
+
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import argparse
+import ast
+import logging
+import logging.config
+import pathlib
+import tempfile
+import time
+
+from zeff.cli.logqueue import queue_file_handlers
+
+STAGES = ["generator", "builder", "validator", "uploader"]
+
+
+def load_config(logdir, queue: bool, sample: bool) -> dict:
+    """Return the default CLI logging configuration with logs in ``logdir``."""
+    package = pathlib.Path(__file__).parents[2] / "src" / "zeff" / "cli"
+    with open(package / "logging_default.txt", "r") as file:
+        conf = ast.literal_eval(file.read())
+    for name in ["master"] + STAGES:
+        conf["handlers"][name]["filename"] = str(logdir / f"{name}.log")
+    if not sample:
+        for logger in conf["loggers"].values():
+            logger.pop("filters", None)
+    conf["queue"] = queue
+    return conf
+
+
+def upload_loop(count: int):
+    """Make the log calls of uploading ``count`` records."""
+    builder = logging.getLogger("zeffclient.record.builder")
+    validator = logging.getLogger("zeffclient.record.validator")
+    uploader = logging.getLogger("zeffclient.record.uploader")
+    for i in range(count):
+        name = f"record_{i}"
+        builder.debug("Build record %s", name)
+        validator.info("Begin validating record %s", name)
+        validator.info("End validating record %s", name)
+        uploader.info("Begin upload %s %s", "Record", name)
+        uploader.info(
+            "End upload %s %s: recordId = %s location = %s",
+            "Record",
+            name,
+            i,
+            f"/records/{i}",
+        )
+
+
+def run(count: int, queue: bool, sample: bool) -> float:
+    """Return seconds per record of ``upload_loop`` for a configuration."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logging.config.dictConfig(load_config(pathlib.Path(tmpdir), queue, sample))
+        listener = None
+        if queue:
+            listener = queue_file_handlers(
+                [""] + [f"zeffclient.record.{name}" for name in STAGES]
+            )
+        start = time.perf_counter()
+        upload_loop(count)
+        elapsed = time.perf_counter() - start
+        if listener is not None:
+            listener.stop()
+        logging.shutdown()
+    return elapsed / count
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000)
+    options = parser.parse_args()
+
+    baseline = None
+    for label, queue, sample in [
+        ("synchronous file handlers", False, False),
+        ("queue listener", True, False),
+        ("queue listener with sampling", True, True),
+    ]:
+        per_record = run(options.records, queue, sample)
+        baseline = baseline or per_record
+        print(
+            f"{label:30s} {per_record * 1e6:8.1f} µs/record "
+            f"{baseline / per_record:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff end-to-end benchmarks of the record pipeline.
+
+Run with ``python -m tests.benchmarks.bench_pipeline``. Each benchmark
+is timed ``--repeat`` times on synthetic data built in a temporary
+directory, and the results are written as JSON with ``--output`` so a
+later run can be compared against them with ``--compare``. A
+benchmark is reported as a regression when its median time per item
+is more than ``--threshold`` times the baseline."""
+
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import argparse
+import csv
+import datetime
+import importlib.util
+import io
+import json
+import logging
+import pathlib
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+import zeff
+from zeff import Uploader
+from zeff.cloud.dataset import Dataset
+from zeff.cloud.encoder import RecordEncoder
+from zeff.cloud.mockserver import MockZeffCloud, MockZeffCloudServer
+from zeff.record import (
+    Record,
+    StructuredData,
+    UnstructuredData,
+    DataType,
+    FileType,
+    Target,
+    format_record_restructuredtext,
+    RECORD_WRITERS,
+)
+from zeff.recordgenerator import file_generator
+from zeff.validator import RecordValidator
+from zeff.zeffcloud import ZeffCloudResourceMap
+from zeff.zeffdatasettype import ZeffDatasetType
+
+EXAMPLES = pathlib.Path(__file__).parents[2] / "docs" / "source" / "examples"
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str, size: int):
+    """Register a benchmark of ``size`` items.
+
+    The decorated function is called as ``func(size, tmpdir)`` to
+    set up the benchmark and must return a callable that runs it once
+    and returns the number of items processed.
+    """
+
+    def decorator(func):
+        BENCHMARKS[name] = (func, size)
+        return func
+
+    return decorator
+
+
+def load_example(name: str, module: str):
+    """Import ``module`` from the example project directory ``name``."""
+    path = EXAMPLES / name / f"{module}.py"
+    spec = importlib.util.spec_from_file_location(f"{name}_{module}", path)
+    ret = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(ret)
+    return ret
+
+
+def make_record(name, paths) -> Record:
+    """Return a house price record with images at ``paths``."""
+    record = Record(name=name)
+    for key, value, dtype, target in [
+        ("sold_price", 1368411.0, DataType.CONTINUOUS, Target.YES),
+        ("sq_ft", 6562.0, DataType.CONTINUOUS, Target.NO),
+        ("beds", 5.0, DataType.CONTINUOUS, Target.NO),
+        ("baths", 6.0, DataType.CONTINUOUS, Target.NO),
+        ("year_built", 2011, DataType.CONTINUOUS, Target.NO),
+        ("addressLocality", "midway", DataType.CATEGORY, Target.NO),
+        ("type_style", "single family / 2-story", DataType.CATEGORY, Target.NO),
+        ("roof", "asphalt shingles", DataType.CATEGORY, Target.NO),
+    ]:
+        sdata = StructuredData(name=key, value=value, data_type=dtype, target=target)
+        sdata.record = record
+    for path in paths:
+        udata = UnstructuredData(
+            f"file://{path}", FileType.IMAGE, group_by="home_photo"
+        )
+        udata.record = record
+    return record
+
+
+def make_records(size: int, tmpdir: pathlib.Path):
+    """Return ``size`` records that each have two existing image files."""
+    images = tmpdir / "images"
+    images.mkdir(exist_ok=True)
+    paths = []
+    for i in range(2):
+        path = images / f"property{i:03d}.jpeg"
+        path.write_bytes(b"\xff\xd8\xff" + bytes(1021))
+        paths.append(path)
+    return [make_record(f"record_{i}", paths) for i in range(size)]
+
+
+def example_rows(size: int):
+    """Return header and ``size`` rows copied from the example CSV."""
+    with open(EXAMPLES / "zeffclient_example_csv" / "properties.csv") as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        row = next(reader)
+    return header, [[str(1000000 + i)] + row[1:] for i in range(size)]
+
+
+@benchmark("url_generation", 20000)
+def bench_url_generation(size, tmpdir):
+    """URL generation over a large directory of files."""
+    dirpath = tmpdir / "files"
+    dirpath.mkdir()
+    for i in range(size):
+        (dirpath / f"record_{i:06d}.json").touch()
+
+    def run():
+        return sum(1 for _ in file_generator(dirpath))
+
+    return run
+
+
+@benchmark("build_csv", 200)
+def bench_build_csv(size, tmpdir):
+    """Record building with the CSV example builder."""
+    header, rows = example_rows(size)
+    path = tmpdir / "properties.csv"
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        writer.writerows(rows)
+    builder = load_example("zeffclient_example_csv", "builder")
+    build = builder.HousePriceRecordBuilder("")
+    configs = [f"file://{path}?id={row[0]}" for row in rows]
+
+    def run():
+        return sum(1 for c in configs if build(False, c) is not None)
+
+    return run
+
+
+@benchmark("build_sqlite", 2000)
+def bench_build_sqlite(size, tmpdir):
+    """Record building with the RDBMS example builder and generator."""
+    path = tmpdir / "db.sqlite3"
+    example = sqlite3.connect(str(EXAMPLES / "zeffclient_example_rdbms" / "db.sqlite3"))
+    conn = sqlite3.connect(str(path))
+    for (sql,) in example.execute("SELECT sql FROM sqlite_master WHERE type='table'"):
+        conn.execute(sql)
+    row = example.execute("SELECT * FROM properties").fetchone()
+    marks = ",".join("?" * len(row))
+    conn.executemany(
+        f"INSERT INTO properties VALUES ({marks})",
+        ((1000000 + i,) + tuple(row[1:]) for i in range(size)),
+    )
+    conn.executemany(
+        "INSERT INTO property_images (property_id, url, image_type) VALUES (?,?,?)",
+        (
+            (1000000 + i, f"https://www.example.com/properties/{i}_{j}.jpg", "photo")
+            for i in range(size)
+            for j in range(3)
+        ),
+    )
+    conn.commit()
+    conn.close()
+    example.close()
+    generator = load_example("zeffclient_example_rdbms", "generator")
+    builder = load_example("zeffclient_example_rdbms", "builder")
+    build = builder.HousePriceRecordBuilder(str(path))
+
+    def run():
+        configs = generator.HousePriceRecordGenerator(str(path))
+        return sum(1 for c in configs if build(False, str(c)) is not None)
+
+    return run
+
+
+@benchmark("validate", 5000)
+def bench_validate(size, tmpdir):
+    """RecordValidator throughput of records with image files."""
+    records = make_records(size, tmpdir)
+
+    def run():
+        validator = RecordValidator(False)
+        for record in records:
+            validator(record)
+        return len(records)
+
+    return run
+
+
+@benchmark("encode", 5000)
+def bench_encode(size, tmpdir):
+    """RecordEncoder JSON encoding of records."""
+    records = make_records(size, tmpdir)
+
+    def run():
+        for record in records:
+            json.dumps(record, cls=RecordEncoder)
+        return len(records)
+
+    return run
+
+
+def bench_upload(latency: float):
+    """Return benchmark of Uploader against a server with ``latency``."""
+
+    def setup(size, tmpdir):
+        records = make_records(size, tmpdir)
+        server = MockZeffCloudServer(cloud=MockZeffCloud(latency=latency))
+        server.start()
+        resource_map = ZeffCloudResourceMap(
+            ZeffCloudResourceMap.default_info(),
+            root=server.url,
+            org_id="org",
+            user_id="user",
+        )
+
+        def run():
+            # A new dataset each run so record names do not collide.
+            dataset = Dataset.create_dataset(
+                resource_map, ZeffDatasetType.generic, "Benchmark", ""
+            )
+            uploader = Uploader(
+                iter(records), server.url, "org", "user", dataset.dataset_id
+            )
+            return sum(1 for _ in uploader)
+
+        run.close = server.stop
+        return run
+
+    return setup
+
+
+for _latency, _size in [(0.0, 500), (0.001, 300), (0.005, 100)]:
+    benchmark(f"upload_{int(_latency * 1000)}ms", _size)(bench_upload(_latency))
+
+
+@benchmark("format_restructuredtext", 2000)
+def bench_format_restructuredtext(size, tmpdir):
+    """format_record_restructuredtext output of records."""
+    records = make_records(size, tmpdir)
+
+    def run():
+        out = io.StringIO()
+        for record in records:
+            format_record_restructuredtext(record, out=out)
+        return len(records)
+
+    return run
+
+
+def bench_record_writer(fmt: str):
+    """Return benchmark of the ``--dry-run-format`` record writer ``fmt``."""
+
+    def setup(size, tmpdir):
+        records = make_records(size, tmpdir)
+
+        def run():
+            with RECORD_WRITERS[fmt](io.StringIO()) as writer:
+                for record in records:
+                    writer.write(record)
+            return len(records)
+
+        return run
+
+    return setup
+
+
+for _fmt in RECORD_WRITERS:
+    benchmark(f"write_{_fmt}", 2000)(bench_record_writer(_fmt))
+
+
+def measure(name: str, repeat: int, scale: float) -> dict:
+    """Set up and run benchmark ``name`` and return its results."""
+    func, size = BENCHMARKS[name]
+    size = max(1, int(size * scale))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        run = func(size, pathlib.Path(tmpdir))
+        try:
+            run()
+            seconds = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                items = run()
+                seconds.append(time.perf_counter() - start)
+        finally:
+            if hasattr(run, "close"):
+                run.close()
+    median = statistics.median(seconds)
+    return {
+        "description": func.__doc__,
+        "items": items,
+        "seconds": seconds,
+        "median": median,
+        "min": min(seconds),
+        "per_item_us": median / items * 1e6 if items else 0.0,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Print comparison of ``results`` with ``baseline``.
+
+    :return: List of names of benchmarks that regressed.
+    """
+    regressions = []
+    print(f"\nCompared with ZeffClient {baseline.get('version')}:")
+    for name, data in results["benchmarks"].items():
+        old = baseline["benchmarks"].get(name)
+        if old is None or not old["per_item_us"]:
+            print(f"  {name:26s} no baseline")
+            continue
+        ratio = data["per_item_us"] / old["per_item_us"]
+        flag = ""
+        if ratio > threshold:
+            flag = "REGRESSION"
+            regressions.append(name)
+        print(f"  {name:26s} {ratio:6.2f}x {flag}")
+    return regressions
+
+
+def main():
+    """Run the benchmarks and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "benchmarks", nargs="*", help="Benchmarks to run (default all)."
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiplier of items per run."
+    )
+    parser.add_argument("--output", type=pathlib.Path, help="Write JSON results.")
+    parser.add_argument(
+        "--compare", type=pathlib.Path, help="JSON results of a baseline run."
+    )
+    parser.add_argument("--threshold", type=float, default=1.10)
+    parser.add_argument("--list", action="store_true", help="List benchmarks.")
+    options = parser.parse_args()
+
+    if options.list:
+        for name, (func, size) in BENCHMARKS.items():
+            print(f"{name:26s} {size:6d}  {func.__doc__}")
+        return
+
+    # Benchmark the pipeline, not the pipeline's logging.
+    logging.disable(logging.CRITICAL)
+
+    names = options.benchmarks or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results = {
+        "version": zeff.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.datetime.utcnow().isoformat(),
+        "benchmarks": {},
+    }
+    for name in names:
+        data = measure(name, options.repeat, options.scale)
+        results["benchmarks"][name] = data
+        print(
+            f"{name:26s} {data['items']:6d} items {data['median']:8.3f} s "
+            f"{data['per_item_us']:10.1f} µs/item"
+        )
+
+    if options.output:
+        options.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(options.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if options.compare:
+        with open(options.compare) as file:
+            baseline = json.load(file)
+        if compare(results, baseline, options.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
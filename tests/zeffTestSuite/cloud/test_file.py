@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test Zeff Cloud file upload."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import re
+import types
+from unittest.mock import MagicMock
+import pytest
+import requests
+from zeff.cloud.exception import ZeffCloudException
+from zeff.cloud.file import File, read_chunks
+
+
+def test_read_chunks(tmp_path):
+    path = tmp_path / "content.bin"
+    content = bytes(range(256)) * 40
+    path.write_bytes(content)
+    chunks = list(read_chunks(path, 100, 5000, chunk_size=1024))
+    assert [len(c) for c in chunks] == [1024, 1024, 1024, 1024, 904]
+    assert b"".join(chunks) == content[100:5100]
+    assert b"".join(read_chunks(path, 10000, 1000)) == content[10000:]
+
+
+class MockServer:
+    """Accept byte ranges and fail each ``fail_every`` request."""
+
+    def __init__(self, size, fail_every=0):
+        self.content = bytearray()
+        self.size = size
+        self.fail_every = fail_every
+        self.requests = 0
+
+    def status(self, code=200):
+        data = {"fileId": "f1", "size": self.size, "received": len(self.content)}
+        data["location"] = "https://example.com/f1"
+        return MagicMock(status_code=code, json=lambda: {"data": data})
+
+    def __call__(self, tag, method="GET", data=None, headers=None, **kwargs):
+        if method == "GET":
+            return self.status()
+        self.requests += 1
+        body = b"".join(data)
+        if self.fail_every and self.requests % self.fail_every == 0:
+            # Partial receipt, then failure
+            self.content.extend(body[: len(body) // 2])
+            return self.status(500)
+        start = int(re.match(r"bytes (\d+)-", headers["Content-Range"]).group(1))
+        assert start == len(self.content)
+        self.content.extend(body)
+        return self.status(308)
+
+
+@pytest.mark.parametrize("fail_every", [0, 3])
+def test_send_resumes(tmp_path, fail_every):
+    path = tmp_path / "content.bin"
+    content = bytes(range(256)) * 400
+    path.write_bytes(content)
+    server = MockServer(len(content), fail_every=fail_every)
+    dataset = types.SimpleNamespace(resource_map={}, dataset_id="d1")
+    file = File(dataset, "f1", data=server.status().json()["data"])
+    file.request = server
+    file.send(path, part_size=10000)
+    assert file.complete
+    assert bytes(server.content) == content
+    assert file.location == "https://example.com/f1"
+
+
+def test_send_connection_error(tmp_path):
+    path = tmp_path / "content.bin"
+    path.write_bytes(b"content")
+    server = MockServer(7)
+    dataset = types.SimpleNamespace(resource_map={}, dataset_id="d1")
+    file = File(dataset, "f1", data=server.status().json()["data"])
+
+    def request(tag, method="GET", **kwargs):
+        if method == "GET":
+            return server.status()
+        raise requests.ConnectionError("connection reset")
+
+    file.request = request
+    with pytest.raises(ZeffCloudException) as err:
+        file.send(path, retries=2)
+    assert isinstance(err.value.__cause__, requests.ConnectionError)
+    assert "send failed: connection reset" in str(err.value)
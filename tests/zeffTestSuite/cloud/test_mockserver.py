@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test Zeff Cloud stand-in server."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import time
+import pytest
+import requests
+from zeff import Uploader, UploadIndex
+from zeff.zeffcloud import ZeffCloudResourceMap
+from zeff.zeffdatasettype import ZeffDatasetType
+from zeff.cloud.dataset import Dataset
+from zeff.cloud.exception import ZeffCloudException
+from zeff.cloud.file import File
+from zeff.cloud.training import TrainingStatus
+from zeff.cloud.mockserver import MockZeffCloud, MockZeffCloudServer
+from zeff.record import Record, StructuredData, Target, DataType
+
+
+def build_record(name):
+    record = Record(name)
+    sd = StructuredData("value", 1.0, DataType.CONTINUOUS, Target.YES)
+    sd.record = record
+    return record
+
+
+def resource_map(server):
+    info = ZeffCloudResourceMap.default_info()
+    return ZeffCloudResourceMap(info, root=server.url, org_id="org", user_id="user")
+
+
+def test_upload_and_train(tmp_path):
+    cloud = MockZeffCloud(training_time=0.2)
+    with MockZeffCloudServer(cloud=cloud) as server:
+        dataset = Dataset.create_dataset(
+            resource_map(server), ZeffDatasetType.generic, "Houses", "Test dataset"
+        )
+        records = [build_record(f"record_{i}") for i in range(5)]
+        uploaded = list(
+            Uploader(iter(records), server.url, "org", "user", dataset.dataset_id)
+        )
+        assert len(uploaded) == 5
+        assert len(list(dataset.records())) == 5
+        assert uploaded[0].structured_data[0]["name"] == "value"
+
+        assert dataset.training_status.status is TrainingStatus.unknown
+        dataset.start_training()
+        assert dataset.training_status.status is not TrainingStatus.complete
+        time.sleep(0.3)
+        status = dataset.training_status
+        assert status.status is TrainingStatus.complete
+        assert status.progress == 1.0
+        models = list(dataset.models())
+        assert [m.version for m in models] == [1]
+        assert models[0].status is TrainingStatus.complete
+
+
+def test_file_upload(tmp_path):
+    path = tmp_path / "content.bin"
+    path.write_bytes(bytes(range(256)) * 100)
+    with MockZeffCloudServer() as server:
+        dataset = Dataset.create_dataset(
+            resource_map(server), ZeffDatasetType.generic, "Files", ""
+        )
+        file = dataset.add_file(path, "TEXT")
+        assert file.complete
+        content = server.cloud.datasets[dataset.dataset_id]["files"][file.file_id]
+        assert bytes(content["content"]) == path.read_bytes()
+
+
+def test_file_upload_resumes(tmp_path):
+    path = tmp_path / "content.bin"
+    path.write_bytes(bytes(range(256)) * 100)
+    with MockZeffCloudServer() as server:
+        dataset = Dataset.create_dataset(
+            resource_map(server), ZeffDatasetType.generic, "Files", ""
+        )
+        files = server.cloud.datasets[dataset.dataset_id]["files"]
+        file = File.create_file(dataset, path, "TEXT")
+        files[file.file_id]["content"].extend(path.read_bytes()[:1000])
+        with UploadIndex(tmp_path / "index.sqlite3") as index:
+            index.update_file(path, file.file_id)
+
+        # A later process resumes the upload
+        with UploadIndex(tmp_path / "index.sqlite3") as index:
+            resumed = dataset.add_file(path, "TEXT", index)
+        assert resumed.file_id == file.file_id
+        assert list(files) == [file.file_id]
+        assert bytes(files[file.file_id]["content"]) == path.read_bytes()
+
+
+def test_errors_and_throttling():
+    headers = {"x-api-key": "org#user"}
+    cloud = MockZeffCloud(error_rate=1.0, seed=1)
+    status, _, _ = cloud.handle("GET", "/v2.6/datasets", headers, b"")
+    assert status == 500
+    assert cloud.failed == 1
+
+    cloud = MockZeffCloud(rate_limit=5)
+    statuses = [cloud.handle("GET", "/v2.6/datasets", headers, b"") for _ in range(20)]
+    assert [s for s, _, _ in statuses].count(429) >= 10
+    assert statuses[-1][1]["Retry-After"] == "1"
+
+    assert cloud.handle("GET", "/v2.6/datasets", {}, b"")[0] in [401, 429]
+    assert cloud.handle("GET", "/v2.6/unknown", headers, b"")[0] == 404
+
+
+def test_latency():
+    with MockZeffCloudServer(cloud=MockZeffCloud(latency=0.05)) as server:
+        start = time.perf_counter()
+        resp = requests.get(f"{server.url}v2.6/datasets", headers={"x-api-key": "a"})
+        assert resp.status_code == 200
+        assert time.perf_counter() - start >= 0.05
+        with pytest.raises(ZeffCloudException):
+            Dataset("missing", resource_map(server))
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test concurrent training monitor."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import time
+from zeff.zeffcloud import ZeffCloudResourceMap
+from zeff.zeffdatasettype import ZeffDatasetType
+from zeff.cloud.dataset import Dataset
+from zeff.cloud.monitor import TrainingMonitor
+from zeff.cloud.training import TrainingPoller, TrainingStatus
+from zeff.cloud.mockserver import MockZeffCloud, MockZeffCloudServer
+
+
+def create_datasets(server, count):
+    info = ZeffCloudResourceMap.default_info()
+    resource_map = ZeffCloudResourceMap(
+        info, root=server.url, org_id="org", user_id="user"
+    )
+    return [
+        Dataset.create_dataset(resource_map, ZeffDatasetType.generic, f"T{i}", "")
+        for i in range(count)
+    ]
+
+
+def test_monitor_waits_for_all():
+    with MockZeffCloudServer(cloud=MockZeffCloud(training_time=0.3)) as server:
+        datasets = create_datasets(server, 3)
+        for dataset in datasets:
+            dataset.start_training()
+        seen = {}
+        monitor = TrainingMonitor(
+            datasets,
+            max_rate=200.0,
+            poller=lambda: TrainingPoller(minimum=0.01, maximum=0.1),
+        )
+        statuses = monitor.wait(
+            timeout=5.0, callback=lambda i, s: seen.setdefault(i, []).append(s)
+        )
+        assert set(statuses) == {d.dataset_id for d in datasets}
+        for dataset_id, info in statuses.items():
+            assert info.status is TrainingStatus.complete
+            assert seen[dataset_id][-1] is info
+
+
+def test_monitor_bounds_request_rate():
+    cloud = MockZeffCloud(training_time=60.0)
+    with MockZeffCloudServer(cloud=cloud) as server:
+        datasets = create_datasets(server, 5)
+        for dataset in datasets:
+            dataset.start_training()
+        monitor = TrainingMonitor(
+            datasets,
+            max_rate=20.0,
+            poller=lambda: TrainingPoller(minimum=0.0, maximum=0.0),
+        )
+        before = cloud.requests
+        start = time.monotonic()
+        statuses = monitor.wait(timeout=0.5)
+        elapsed = time.monotonic() - start
+        assert all(s.status is not TrainingStatus.complete for s in statuses.values())
+        assert cloud.requests - before <= 20.0 * elapsed + 1
+
+
+def test_monitor_poll():
+    with MockZeffCloudServer(cloud=MockZeffCloud()) as server:
+        datasets = create_datasets(server, 2)
+        statuses = TrainingMonitor(datasets).poll()
+        assert [s.status for s in statuses.values()] == [TrainingStatus.unknown] * 2
+
+
+def test_monitor_not_started_expires():
+    with MockZeffCloudServer(cloud=MockZeffCloud()) as server:
+        datasets = create_datasets(server, 2)
+        monitor = TrainingMonitor(
+            datasets,
+            max_rate=200.0,
+            poller=lambda: TrainingPoller(minimum=0.01, maximum=0.05),
+        )
+        start = time.monotonic()
+        statuses = monitor.wait(queued_timeout=0.3)
+        assert time.monotonic() - start < 5.0
+        assert monitor.expired == {d.dataset_id for d in datasets}
+        assert all(s.status is TrainingStatus.unknown for s in statuses.values())
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test training status polling."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import time
+import pytest
+from zeff.zeffcloud import ZeffCloudResourceMap
+from zeff.zeffdatasettype import ZeffDatasetType
+from zeff.cloud.dataset import Dataset
+from zeff.cloud.training import TrainingPoller, TrainingSessionInfo, TrainingStatus
+from zeff.cloud.mockserver import MockZeffCloud, MockZeffCloudServer
+
+
+def info(status, progress):
+    return TrainingSessionInfo({"status": status, "percentComplete": progress})
+
+
+def create_dataset(server):
+    info = ZeffCloudResourceMap.default_info()
+    resource_map = ZeffCloudResourceMap(
+        info, root=server.url, org_id="org", user_id="user"
+    )
+    return Dataset.create_dataset(resource_map, ZeffDatasetType.generic, "Test", "")
+
+
+def test_poller_backs_off_when_flat():
+    poller = TrainingPoller(minimum=1.0, maximum=8.0, backoff=2.0)
+    intervals = [poller.interval(info("QUEUED", 0.0), now=t) for t in range(6)]
+    assert intervals == [1.0, 2.0, 4.0, 8.0, 8.0, 8.0]
+
+
+def test_poller_tightens_near_completion():
+    poller = TrainingPoller(minimum=0.5, maximum=60.0)
+    poller.interval(info("PCT_COMPLETE", 0.1), now=0.0)
+    # 40% in 40s leaves 50s at 50%, so poll again in 25s.
+    assert poller.interval(info("PCT_COMPLETE", 0.5), now=40.0) == 25.0
+    assert poller.interval(info("PCT_COMPLETE", 0.9), now=50.0) == pytest.approx(1.25)
+    assert poller.interval(info("PCT_COMPLETE", 0.99), now=51.0) == 0.5
+
+
+def test_conditional_training_status():
+    cloud = MockZeffCloud()
+    with MockZeffCloudServer(cloud=cloud) as server:
+        dataset = create_dataset(server)
+        first = dataset.fetch_training_status()
+        assert first.etag
+        assert dataset.fetch_training_status(first) is first
+        assert cloud.not_modified == 1
+
+
+def test_wait_for_training():
+    with MockZeffCloudServer(cloud=MockZeffCloud(training_time=0.3)) as server:
+        dataset = create_dataset(server)
+        dataset.start_training()
+        seen = []
+        final = dataset.wait_for_training(
+            timeout=5.0,
+            callback=seen.append,
+            poller=TrainingPoller(minimum=0.01, maximum=0.1),
+        )
+        assert final.status is TrainingStatus.complete
+        assert seen[-1] is final
+        progress = [s.progress for s in seen]
+        assert progress == sorted(progress)
+
+        dataset.start_training()
+        with pytest.raises(TimeoutError):
+            dataset.wait_for_training(timeout=0.05)
+
+
+def test_wait_for_training_queued():
+    with MockZeffCloudServer(cloud=MockZeffCloud(training_time=100.0)) as server:
+        dataset = create_dataset(server)
+        dataset.start_training()
+        start = time.monotonic()
+        with pytest.raises(TimeoutError, match="not started"):
+            dataset.wait_for_training(
+                poller=TrainingPoller(minimum=0.01, maximum=0.05),
+                queued_timeout=0.2,
+            )
+        assert time.monotonic() - start < 2.0
+
+
+def test_wait_for_training_no_session():
+    with MockZeffCloudServer(cloud=MockZeffCloud()) as server:
+        dataset = create_dataset(server)
+        start = time.monotonic()
+        with pytest.raises(TimeoutError, match="not started"):
+            dataset.wait_for_training(
+                poller=TrainingPoller(minimum=0.01, maximum=0.05),
+                queued_timeout=0.2,
+            )
+        assert time.monotonic() - start < 2.0
+
+
+def test_wait_for_training_previous_session():
+    with MockZeffCloudServer(cloud=MockZeffCloud(training_time=0.0)) as server:
+        dataset = create_dataset(server)
+        dataset.start_training()
+        previous = dataset.wait_for_training()
+        assert previous.status is TrainingStatus.complete
+        # The completed session is not the one waited for.
+        with pytest.raises(TimeoutError, match="not started"):
+            dataset.wait_for_training(
+                poller=TrainingPoller(minimum=0.01, maximum=0.05),
+                queued_timeout=0.2,
+                previous=previous,
+            )
+        dataset.start_training()
+        final = dataset.wait_for_training(previous=previous)
+        assert final.status is TrainingStatus.complete
+        assert final.model_version != previous.model_version
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test record digest."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import pytest
+from zeff.record import (
+    Record,
+    StructuredData,
+    UnstructuredData,
+    Target,
+    DataType,
+    FileType,
+    record_digest,
+)
+
+
+def build_record(path, order=(0, 1)):
+    r = Record("Digest Record")
+    sd_info = [
+        ("sold_price", 1368411.0, DataType.CONTINUOUS, Target.YES),
+        ("lot", "auto-part; private", DataType.CATEGORY, Target.NO),
+    ]
+    for index in order:
+        sd = StructuredData(*sd_info[index])
+        sd.record = r
+    ud_info = [
+        (f"file://{path}", FileType.IMAGE, "home_photo"),
+        ("https://www.example.com/properties/photo_5.jpg", FileType.IMAGE, None),
+    ]
+    for index in order:
+        ud = UnstructuredData(*ud_info[index])
+        ud.record = r
+    return r
+
+
+def test_digest_stable(tmp_path):
+    """Item order does not change the digest."""
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"spam")
+    assert record_digest(build_record(path)) == record_digest(
+        build_record(path, order=(1, 0))
+    )
+
+
+def test_digest_structured_change(tmp_path):
+    """A change in a structured value changes the digest."""
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"spam")
+    r = build_record(path)
+    digest = record_digest(r)
+    r.structured_data[0].value = 1368412.0
+    assert record_digest(r) != digest
+
+
+def test_digest_file_content_change(tmp_path):
+    """A change in file content changes the digest."""
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"spam")
+    digest = record_digest(build_record(path))
+    path.write_bytes(b"eggs")
+    assert record_digest(build_record(path)) != digest
@@ -21,6 +21,8 @@ __license__ = """
     limitations under the License.
 """
 
+import csv
+import json
 import pytest
 from io import StringIO
 from zeff.record import (
@@ -29,12 +31,16 @@ from zeff.record import (
     UnstructuredData,
     Target,
     DataType,
+    FileType,
     format_record_restructuredtext,
+    JSONLinesRecordWriter,
+    CSVRecordWriter,
+    RestructuredTextRecordWriter,
 )
 
 
-def test_format_record_restructuredtext():
-    """TBW."""
+@pytest.fixture
+def record():
     r = Record("Formatted Record")
 
     sd_info = [
@@ -61,5 +67,60 @@ def test_format_record_restructuredtext():
         ud = UnstructuredData(*info)
         ud.record = r
 
+    return r
+
+
+def test_format_record_restructuredtext(record, capsys):
+    """TBW."""
+    result = StringIO()
+    format_record_restructuredtext(record, out=result)
+    lines = result.getvalue().splitlines()
+    assert lines[:3] == ["================", "Formatted Record", "================"]
+    assert "Structured Data" in lines
+    assert "Unstructured Data" in lines
+    assert "| garage_parking   | CATEGORY " in result.getvalue()
+    assert capsys.readouterr().out == ""
+
+
+def test_jsonl_writer(record):
+    for udi in record.unstructured_data:
+        udi.file_type = FileType.IMAGE
+    result = StringIO()
+    with JSONLinesRecordWriter(result, buffer_size=16) as writer:
+        writer.write(record)
+        writer.write(record)
+    lines = result.getvalue().splitlines()
+    assert len(lines) == 2
+    data = json.loads(lines[0])
+    assert data["name"]["uniqueName"] == "Formatted Record"
+    assert len(data["structuredData"]) == 4
+    assert len(data["unstructuredData"]) == 3
+    assert data["unstructuredData"][0]["fileType"] == "IMAGE"
+
+
+def test_csv_writer(record):
+    result = StringIO()
+    with CSVRecordWriter(result) as writer:
+        writer.write(record)
+    rows = list(csv.reader(StringIO(result.getvalue())))
+    assert rows[0] == CSVRecordWriter.COLUMNS
+    assert [row[1] for row in rows[1:]] == [
+        "basement",
+        "garage_parking",
+        "lot",
+        "sold_price",
+    ]
+    assert rows[1] == ["Formatted Record", "basement", "2412.0", "CONTINUOUS", "NO"]
+
+
+def test_rst_writer(record, capsys):
+    single = StringIO()
+    format_record_restructuredtext(record, out=single)
     result = StringIO()
-    format_record_restructuredtext(r, out=result)
+    writer = RestructuredTextRecordWriter(result)
+    writer.write(record)
+    writer.write(record)
+    assert result.getvalue() == ""
+    writer.close()
+    assert result.getvalue() == single.getvalue() + "\n" + single.getvalue()
+    assert capsys.readouterr().out == ""
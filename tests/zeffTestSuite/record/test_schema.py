@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test schema validation."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import pytest
+
+from zeff.record import Record, StructuredData, UnstructuredData, Target, DataType
+from zeff.record import FileType
+from zeff.validator import ColumnSchema, RecordSchema, RecordSchemaValidator
+
+SCHEMA = RecordSchema(
+    [
+        ColumnSchema("price", DataType.CONTINUOUS, Target.YES, minimum=0),
+        ColumnSchema("rooms", DataType.CONTINUOUS, Target.NO, maximum=20),
+        ColumnSchema(
+            "style", DataType.CATEGORY, Target.NO, categories={"ranch", "colonial"}
+        ),
+        ColumnSchema("notes", DataType.CATEGORY, required=False),
+    ]
+)
+
+
+class HouseValidator(RecordSchemaValidator):
+    schema = SCHEMA
+
+
+def build_record(**values):
+    r = Record("House")
+    for column in SCHEMA.columns.values():
+        if column.name in values:
+            value = values[column.name]
+            sd = StructuredData(column.name, value, column.data_type, column.target)
+            sd.record = r
+    ud = UnstructuredData(f"file://{__file__}", FileType.TEXT)
+    ud.record = r
+    return r
+
+
+def test_valid_record():
+    record = build_record(price=100000.0, rooms=4, style="ranch")
+    assert SCHEMA.check(record) == []
+    HouseValidator(False)(record)
+
+
+def test_all_violations_reported():
+    record = build_record(price=-1.0, rooms="four", style="igloo")
+    errors = SCHEMA.check(record)
+    assert len(errors) == 3
+    with pytest.raises(ValueError) as err:
+        HouseValidator(False)(record)
+    for error in errors:
+        assert error in str(err.value)
+
+
+def test_required_items():
+    record = build_record(rooms=4, style="ranch")
+    assert SCHEMA.check(record) == ["price: required item missing"]
+    assert SCHEMA.check(record, model=True) == []
+    HouseValidator(True)(record)
+
+
+def test_check_columns():
+    columns = {
+        "price": [1.0, 2.0, -3.0],
+        "rooms": [1, 21, "x"],
+        "style": ["ranch", "colonial", "igloo"],
+    }
+    errors = SCHEMA.check_columns(columns)
+    assert errors == [
+        "price[2]: value `-3.0` is less than 0",
+        "rooms[1]: value `21` is greater than 20",
+        "rooms[2]: value `x` is not continuous",
+        "style[2]: value `igloo` is not an allowed category",
+    ]
+
+
+def test_bool_not_continuous():
+    record = build_record(price=True, rooms=4, style="ranch")
+    assert SCHEMA.check(record) == ["price: value `True` is not continuous"]
+    errors = SCHEMA.check_columns({"price": [1.0, False], "rooms": [1, 2]})
+    assert errors == [
+        "style: required item missing",
+        "price[1]: value `False` is not continuous",
+    ]
+
+
+def test_schema_required():
+    with pytest.raises(TypeError):
+        RecordSchemaValidator(False)
+
+
+def test_check_batch():
+    records = [
+        build_record(price=1.0, rooms=4, style="ranch"),
+        build_record(price=-1.0, rooms="four", style="igloo"),
+        build_record(rooms=4, style="colonial"),
+    ]
+    errors = SCHEMA.check_batch(records)
+    assert errors[0] == []
+    assert [sorted(e) for e in errors] == [sorted(SCHEMA.check(r)) for r in records]
+
+
+def test_validate_batch_schema():
+    records = [
+        build_record(price=1.0, rooms=4, style="ranch"),
+        build_record(price=-1.0, rooms="four", style="igloo"),
+    ]
+    records[1].name = "Igloo"
+    results = HouseValidator(False).validate_batch(records)
+    assert results[0][1] is None
+    assert isinstance(results[1][1], ValueError)
+    for error in SCHEMA.check(records[1]):
+        assert error in str(results[1][1])
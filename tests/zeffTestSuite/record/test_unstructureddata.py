@@ -21,17 +21,48 @@ __license__ = """
     limitations under the License.
 """
 
+import os
+import threading
+import http.server
 import pytest
 import enum
 
-from zeff.record import UnstructuredData, FileType
-from zeff.validator import RecordValidator
+from zeff.record import Record, StructuredData, UnstructuredData
+from zeff.record import Target, DataType, FileType
+from zeff.validator import RecordValidator, AccessibilityProbe
 
 
-def test_valid_http():
+class Handler(http.server.BaseHTTPRequestHandler):
+    """Answer ``HEAD`` with 404 for ``/missing`` and 200 otherwise."""
+
+    paths = []
+
+    def do_HEAD(self):
+        self.paths.append(self.path)
+        self.send_response(200 if self.path != "/missing" else 404)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_root():
+    Handler.paths = []
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_valid_http(http_root):
     """Test building a UnstructuredData."""
     validator = RecordValidator(True)
-    ud = UnstructuredData("http://example.com", FileType.TEXT)
+    ud = UnstructuredData(f"{http_root}/valid", FileType.TEXT)
     assert ud.record is None
     validator.validate_unstructured_data(ud)
     assert ud.accessible == "OK"
@@ -84,3 +115,82 @@ def test_invalid_mediatype():
     with pytest.raises(TypeError):
         ud = UnstructuredData("http://example.com", "InvalidMedia")
         validator.validate_unstructured_data(ud)
+
+
+def test_probe_cache_file(tmp_path):
+    """Cached file result is discarded when the file changes."""
+    probe = AccessibilityProbe()
+    path = tmp_path / "spam.txt"
+    path.write_text("spam")
+    uri = f"file://{path}"
+    assert probe(uri) == "OK"
+    assert probe.cached(uri, os.stat(path).st_mtime_ns) == "OK"
+    os.utime(path, ns=(0, 0))
+    assert probe.cached(uri, os.stat(path).st_mtime_ns) is None
+    path.unlink()
+    assert probe(uri) == "file missing"
+
+
+def test_probe_http_concurrent(http_root):
+    """HTTP probes are sent to each item's URI."""
+    root = http_root
+    uris = [f"{root}/a", f"{root}/b", f"{root}/missing", f"{root}/a"]
+    probe = AccessibilityProbe()
+    result = probe.probe_all(uris)
+    assert result[f"{root}/a"] == "OK"
+    assert result[f"{root}/missing"] == "Not Found"
+    assert sorted(Handler.paths) == ["/a", "/b", "/missing"]
+    probe.close()
+
+
+def test_probe_cache_bounded(tmp_path):
+    """Least recently used results are discarded."""
+    probe = AccessibilityProbe(max_entries=2)
+    for name in "abc":
+        probe.store(f"file:///{name}", "OK")
+        probe.cached("file:///a")
+    assert len(probe) == 2
+    assert probe.cached("file:///a") == "OK"
+    assert probe.cached("file:///b") is None
+
+
+def test_probe_cache_expires():
+    """Expired results are removed when looked up."""
+    probe = AccessibilityProbe(ttl=-1.0)
+    probe.store("file:///a", "OK")
+    assert probe.cached("file:///a") is None
+    assert len(probe) == 0
+
+
+def test_probe_http_error_not_cached():
+    """Transient HTTP failures are probed again."""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    uri = f"http://127.0.0.1:{server.server_address[1]}/a"
+    server.server_close()
+    probe = AccessibilityProbe(timeout=1.0)
+    assert probe(uri) != "OK"
+    assert probe.cached(uri) is None
+    probe.close()
+
+
+def test_validate_batch_probes_once():
+    """A batch probes each unstructured data URI only once."""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    uri = f"http://127.0.0.1:{server.server_address[1]}/a"
+    server.server_close()
+    calls = []
+
+    class CountingProbe(AccessibilityProbe):
+        def __call__(self, uri):
+            calls.append(uri)
+            return super().__call__(uri)
+
+    probe = CountingProbe(timeout=1.0)
+    validator = RecordValidator(True, probe=probe)
+    record = Record("a")
+    StructuredData("value", 1.0, DataType.CONTINUOUS, Target.YES).record = record
+    UnstructuredData(uri, FileType.TEXT).record = record
+    validator.validate_batch([record])
+    assert calls == [uri]
+    assert record.unstructured_data[0].accessible != "OK"
+    probe.close()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test suite."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import pytest
+
+from zeff.recordgenerator import lines_generator
+
+LINES = [f"record-{i:05d}" + "x" * (i % 37) for i in range(2000)]
+
+
+@pytest.fixture
+def lines_path(tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_text("\n".join(LINES) + "\n")
+    return path
+
+
+def test_lines(lines_path):
+    assert list(lines_generator(lines_path)) == LINES
+    assert list(lines_generator(str(lines_path), chunk_size=7)) == LINES
+
+
+def test_lines_format(tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_bytes("a\r\n\n  b  \r\n\ncé\nlast".encode("utf-8"))
+    assert list(lines_generator(path)) == ["a", "b", "cé", "last"]
+    assert list(lines_generator(path, chunk_size=1)) == ["a", "b", "cé", "last"]
+
+
+def test_lines_empty(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    assert list(lines_generator(path)) == []
+    assert list(lines_generator(path, shard=(0, 3))) == []
+
+
+@pytest.mark.parametrize("shards", [1, 2, 3, 7, 64])
+@pytest.mark.parametrize("chunk_size", [16, 1024 * 1024])
+def test_lines_shard(lines_path, shards, chunk_size):
+    parts = [
+        list(lines_generator(lines_path, shard=(i, shards), chunk_size=chunk_size))
+        for i in range(shards)
+    ]
+    assert [line for part in parts for line in part] == LINES
+
+
+def test_lines_shard_invalid(lines_path):
+    with pytest.raises(ValueError):
+        list(lines_generator(lines_path, shard=(3, 3)))
+
+
+def test_lines_skip(lines_path):
+    assert list(lines_generator(lines_path, skip=1500, chunk_size=64)) == LINES[1500:]
+    assert list(lines_generator(lines_path, skip=5000)) == []
+    shard = list(lines_generator(lines_path, shard=(1, 4)))
+    assert list(lines_generator(lines_path, shard=(1, 4), skip=10)) == shard[10:]
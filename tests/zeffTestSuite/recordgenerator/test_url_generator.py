@@ -23,10 +23,16 @@ __license__ = """
 
 import os
 import pathlib
+import socket
+import functools
+import threading
 import urllib.parse
+import http.server
 import pytest
+import requests
 
 from zeff.recordgenerator import entry_generator, file_generator, directory_generator
+from zeff.recordgenerator import SourceIndex, http_index_generator
 
 
 def test_entries():
@@ -56,3 +62,113 @@ def test_dir_entries():
         assert entry in entries
         entries.remove(entry)
     assert len(entries) == 0
+
+
+def test_incremental_files(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    for name in ["a", "b", "c"]:
+        (source / name).write_text(name)
+    index = tmp_path / "index.sqlite3"
+    names = lambda: sorted(os.path.basename(p) for p in file_generator(source, index))
+    assert names() == ["a", "b", "c"]
+    assert names() == []
+
+    (source / "b").write_text("changed")
+    (source / "d").write_text("d")
+    assert names() == ["b", "d"]
+    assert names() == []
+    with SourceIndex(index) as entries:
+        assert len(entries) == 4
+
+    (source / "a").unlink()
+    assert names() == []
+    with SourceIndex(index) as entries:
+        assert len(entries) == 3
+
+
+def test_incremental_commit_downstream(tmp_path):
+    source = tmp_path / "source"
+    (source / "sub").mkdir(parents=True)
+    for path in ["a", "b", "sub/c"]:
+        (source / path).write_text(path)
+    path = tmp_path / "index.sqlite3"
+    with SourceIndex(path) as index:
+        assert len(list(file_generator(source / "sub", index))) == 1
+        index.commit()
+    with SourceIndex(path) as index:
+        assert len(list(file_generator(source, index))) == 2
+    with SourceIndex(path) as index:
+        assert len(list(file_generator(source, index))) == 2
+        index.commit()
+    with SourceIndex(path) as index:
+        assert list(file_generator(source, index)) == []
+        assert len(index) == 3
+
+
+def test_incremental_interrupted(tmp_path):
+    for name in ["a", "b"]:
+        (tmp_path / name).write_text(name)
+    index = tmp_path / "var" / "source.sqlite3"
+    generator = file_generator(tmp_path, index)
+    next(generator)
+    generator.close()
+    assert len(list(file_generator(tmp_path, index))) == 2
+
+
+@pytest.fixture
+def http_index(tmp_path):
+    for dirpath in ["images", "images/2019", "images/2019/12", "docs"]:
+        (tmp_path / dirpath).mkdir()
+    for path in [
+        "top.jpeg",
+        "images/a.jpeg",
+        "images/b.png",
+        "images/2019/c.jpeg",
+        "images/2019/12/d jpeg.jpeg",
+        "docs/readme.txt",
+    ]:
+        (tmp_path / path).write_text(path)
+    handler = functools.partial(
+        http.server.SimpleHTTPRequestHandler, directory=str(tmp_path)
+    )
+    handler.log_message = lambda *args: None
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_http_index(http_index):
+    names = lambda urls: sorted(
+        urllib.parse.unquote(u[len(http_index) :]) for u in urls
+    )
+    assert names(http_index_generator(http_index)) == ["top.jpeg"]
+    assert names(http_index_generator(http_index + "images", depth=2)) == [
+        "images/2019/c.jpeg",
+        "images/a.jpeg",
+        "images/b.png",
+    ]
+    assert names(http_index_generator(http_index, None, "*.jpeg")) == [
+        "images/2019/12/d jpeg.jpeg",
+        "images/2019/c.jpeg",
+        "images/a.jpeg",
+        "top.jpeg",
+    ]
+
+
+def test_http_index_streams(http_index):
+    urls = http_index_generator(http_index, depth=None, max_workers=2)
+    assert next(urls).startswith(http_index)
+    urls.close()
+
+
+def test_http_index_timeout():
+    with socket.socket() as server:
+        server.bind(("127.0.0.1", 0))
+        server.listen(1)
+        url = f"http://127.0.0.1:{server.getsockname()[1]}/"
+        with pytest.raises(requests.Timeout):
+            list(http_index_generator(url, timeout=0.2))
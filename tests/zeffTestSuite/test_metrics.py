@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test pipeline metrics."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import threading
+import pytest
+from zeff.metrics import Histogram, MetricsRegistry, PrometheusWriter, StageMetrics
+from zeff.pipeline import Counter
+
+
+def test_histogram_percentiles():
+    hist = Histogram()
+    for value in range(1, 10001):
+        hist.record(value)
+    assert hist.count == 10000
+    assert hist.minimum == 1
+    assert hist.maximum == 10000
+    assert hist.mean() == pytest.approx(5000.5)
+    for percent in [50, 90, 99]:
+        assert hist.percentile(percent) == pytest.approx(percent * 100, rel=0.07)
+
+
+def test_histogram_buckets():
+    hist = Histogram()
+    for value in [0, 1, 31, 32, 1000, 2**20, 2**39]:
+        assert hist.value(hist.index(value)) <= value
+        assert hist.value(hist.index(value) + 1) > value
+    hist.record(2**50)
+    assert hist.counts[-1] == 1
+
+
+def test_registry_snapshot():
+    registry = MetricsRegistry()
+    stage = registry.stage("upload")
+    stage.observe(1000, nbytes=10)
+    stage.observe(3000, nbytes=20)
+    stage.retry()
+    stage.error(ValueError("bad"))
+    stage.error("HTTP500")
+    snapshot = registry.snapshot()
+    assert set(snapshot) == {"generate", "build", "validate", "encode", "upload"}
+    upload = snapshot["upload"]
+    assert upload["count"] == 2
+    assert upload["bytes"] == 30
+    assert upload["retries"] == 1
+    assert upload["errors"] == {"ValueError": 1, "HTTP500": 1}
+    assert upload["latency_ns"]["sum"] == 4000
+    registry.reset()
+    assert registry.snapshot()["upload"]["count"] == 0
+
+
+def test_prometheus(tmp_path):
+    registry = MetricsRegistry(["build"])
+    registry.stage("build").observe(2000000, count=3)
+    registry.stage("build").error("KeyError")
+    text = registry.prometheus()
+    assert 'zeff_stage_events_total{stage="build"} 3' in text
+    assert 'zeff_stage_errors_total{stage="build",error="KeyError"} 1' in text
+    assert 'zeff_stage_latency_seconds_count{stage="build"} 3' in text
+    path = tmp_path / "metrics.prom"
+    with PrometheusWriter(registry, path, interval=60):
+        pass
+    assert path.read_text() == text
+
+
+def test_counter_stage():
+    registry = MetricsRegistry()
+    counter = Counter(iter(range(5)), stage=registry.stage("generate"))
+    assert list(counter) == list(range(5))
+    assert counter.count == 5
+    assert registry.snapshot()["generate"]["count"] == 5
+
+
+def test_registry_merge(tmp_path):
+    worker = MetricsRegistry(["upload"])
+    for value in range(1, 101):
+        worker.stage("upload").observe(value * 1000, nbytes=1)
+    worker.stage("upload").error("HTTP500")
+    path = tmp_path / "metrics.json"
+    worker.write_json(path)
+
+    registry = MetricsRegistry(["upload"])
+    registry.stage("upload").observe(500, nbytes=1)
+    registry.stage("upload").error("HTTP500")
+    registry.merge_json(path)
+    upload = registry.snapshot()["upload"]
+    assert upload["count"] == 101
+    assert upload["bytes"] == 101
+    assert upload["errors"] == {"HTTP500": 2}
+    assert upload["latency_ns"]["min"] == 500
+    assert upload["latency_ns"]["max"] == 100000
+
+
+def test_stage_retires_thread_shards():
+    stage = StageMetrics("upload")
+
+    def work():
+        for _ in range(10):
+            stage.observe(1000, nbytes=5)
+
+    for _ in range(3):
+        threads = [threading.Thread(target=work) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert stage.shards == 0
+    assert stage.count == 600
+    assert stage.bytes == 3000
+    assert stage.snapshot()["latency_ns"]["max"] == 1000
+    stage.reset()
+    assert stage.count == 0
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test record pipeline."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import pytest
+
+import zeff
+from zeff.record import Record, StructuredData, UnstructuredData
+from zeff.record import Target, DataType, FileType
+from zeff.validator import RecordValidator
+
+
+def build_record(name, value=1.0):
+    r = Record(name)
+    sd = StructuredData("value", value, DataType.CONTINUOUS, Target.YES)
+    sd.record = r
+    ud = UnstructuredData(f"file://{__file__}", FileType.TEXT)
+    ud.record = r
+    return r
+
+
+class CountingValidator(RecordValidator):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.accepted = 0
+
+    def validate_record(self, record):
+        self.accepted += 1
+
+    def validate_dataset(self):
+        if self.accepted < 5:
+            raise ValueError("Too few records")
+
+
+def test_validate_batch():
+    validator = RecordValidator(False)
+    records = [build_record("a"), build_record("b", "x"), build_record("a")]
+    results = validator.validate_batch(records)
+    assert [r for r, _ in results] == records
+    assert results[0][1] is None
+    assert isinstance(results[1][1], ValueError)
+    assert "duplicate" in str(results[2][1])
+    assert "duplicate" in str(validator.validate_batch(records[:1])[0][1])
+    validator.reset_dataset()
+    assert validator.validate_batch(records[:1])[0][1] is None
+
+
+def test_validate_call_repeated():
+    validator = RecordValidator(False)
+    record = build_record("a")
+    validator(record)
+    validator(record)
+    assert not validator.record_names
+
+
+def test_validation_generator_batches(caplog):
+    names = ["a", "b", "c", "b", "d", "a", "e"]
+    records = [build_record(n) for n in names]
+    validator = CountingValidator(False)
+    valid = list(zeff.validation_generator(records, validator, batch_size=3))
+    assert [r.name for r in valid] == ["a", "b", "c", "d", "e"]
+    assert "Too few records" not in caplog.text
+
+    validator = CountingValidator(False)
+    valid = list(zeff.validation_generator(records[:3], validator, batch_size=2))
+    assert len(valid) == 3
+    assert "Too few records" in caplog.text
+    assert not validator.record_names
+
+    # A second run of the same validator is a new dataset
+    valid = list(zeff.validation_generator(records[:3], validator, batch_size=2))
+    assert len(valid) == 3
+
+
+def test_validation_generator_callable():
+    seen = []
+    records = [build_record(n) for n in "abc"]
+    valid = list(zeff.validation_generator(records, seen.append))
+    assert valid == records
+    assert seen == records
+
+
+def test_shard_generator():
+    configs = [f"record_{i}" for i in range(200)]
+    shards = [list(zeff.shard_generator(configs, i, 3)) for i in range(3)]
+    assert sorted(sum(shards, [])) == sorted(configs)
+    assert all(shards)
+    assert shards[1] == list(zeff.shard_generator(configs, 1, 3))
+    with pytest.raises(ValueError):
+        list(zeff.shard_generator(configs, 3, 3))
+
+
+def test_prefetch():
+    assert list(zeff.prefetch(iter(range(100)), depth=4)) == list(range(100))
+
+
+def test_prefetch_error():
+    def source():
+        yield from range(3)
+        raise KeyError("source failed")
+
+    fetched = zeff.prefetch(source(), depth=8)
+    assert [next(fetched) for _ in range(3)] == [0, 1, 2]
+    with pytest.raises(KeyError):
+        next(fetched)
+
+
+def test_prefetch_close():
+    closed = []
+
+    def source():
+        try:
+            yield from range(10**9)
+        finally:
+            closed.append(True)
+
+    fetched = zeff.prefetch(source(), depth=2)
+    assert next(fetched) == 0
+    fetched.close()
+    assert closed == [True]
+    assert list(fetched) == []
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test typed pipeline events."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import pytest
+
+import zeff
+from zeff.pipeline_events import (
+    EVENTS,
+    EventDispatcher,
+    RecordBuilt,
+    RecordEvent,
+    RecordValidated,
+    UploadFailed,
+)
+from zeff.validator import RecordValidator
+from .test_pipeline import build_record
+
+
+@pytest.fixture
+def events():
+    received = []
+    EVENTS.subscribe(received.append)
+    yield received
+    EVENTS.unsubscribe(received.append)
+
+
+def test_dispatcher_inactive():
+    dispatcher = EventDispatcher()
+    assert not dispatcher.active
+    received = []
+    dispatcher.subscribe(received.append, UploadFailed)
+    assert dispatcher.active
+    dispatcher.emit(RecordBuilt("a", 0.1))
+    dispatcher.emit(UploadFailed("b", error="timeout"))
+    assert received == [UploadFailed("b", error="timeout")]
+    dispatcher.unsubscribe(received.append)
+    assert not dispatcher.active
+
+
+def test_dispatcher_async():
+    dispatcher = EventDispatcher()
+    received = []
+    dispatcher.subscribe(received.append, async_=True, batch_size=0)
+    for name in "abc":
+        dispatcher.emit(RecordBuilt(name))
+    dispatcher.unsubscribe(received.append)
+    assert [e.record_name for e in received] == ["a", "b", "c"]
+
+
+def test_builder_events(events):
+    def builder(model, config):
+        return build_record(config) if config != "skip" else None
+
+    built = list(zeff.record_builder_generator(False, ["a", "skip", "b"], builder))
+    assert len(built) == 2
+    assert [type(e) for e in events] == [RecordBuilt, RecordBuilt]
+    assert [e.record_name for e in events] == ["a", "b"]
+    assert all(e.duration >= 0 for e in events)
+
+
+def test_validation_events(events):
+    records = [build_record("a"), build_record("b", "x")]
+    valid = list(zeff.validation_generator(records, RecordValidator(False)))
+    assert len(valid) == 1
+    validated = [e for e in events if isinstance(e, RecordValidated)]
+    assert [e.record_name for e in validated] == ["a", "b"]
+    assert validated[0].valid
+    assert not validated[1].valid
+    assert validated[1].error
+    assert all(isinstance(e, RecordEvent) for e in events)
@@ -24,3 +24,137 @@ __license__ = """
 import unittest
 from unittest.mock import Mock
 import logging
+import threading
+import time
+import pytest
+from zeff.pipeline_observation import (
+    AsyncObserver,
+    PipelineEvent,
+    PipelineHandler,
+    PipelineLevel,
+    PipelinePhase,
+    pipeline_add_observer,
+    pipeline_remove_observer,
+)
+
+
+def make_record(levelno, msg="message %d", args=(1,)):
+    return logging.LogRecord("zeffclient", levelno, __file__, 0, msg, args, None)
+
+
+def test_event_level():
+    for levelno, level in [
+        (logging.CRITICAL, PipelineLevel.Critical),
+        (logging.ERROR + 5, PipelineLevel.Error),
+        (logging.WARNING, PipelineLevel.Warning),
+        (logging.INFO, PipelineLevel.Info),
+        (logging.DEBUG, PipelineLevel.Debug),
+        (logging.NOTSET, PipelineLevel.Debug),
+    ]:
+        event = PipelineEvent(PipelinePhase.Build, make_record(levelno))
+        assert event.level is level
+        assert event.message == "message 1"
+
+
+def test_sync_observer():
+    observer = Mock()
+    handler = PipelineHandler(PipelinePhase.Build)
+    handler.add_observer(observer, PipelineLevel.Warning)
+    handler.emit(make_record(logging.INFO))
+    handler.emit(make_record(logging.ERROR))
+    assert observer.call_count == 1
+    assert observer.call_args[0][0].level is PipelineLevel.Error
+
+
+def test_async_observer():
+    main = threading.current_thread()
+    threads = []
+    events = []
+
+    def observer(event):
+        threads.append(threading.current_thread())
+        events.append(event)
+
+    phase = PipelinePhase.Validate
+    phase.value.setLevel(logging.DEBUG)
+    pipeline_add_observer(observer, phase, PipelineLevel.Info, async_=True)
+    try:
+        for i in range(10):
+            phase.value.info("event %d", i)
+    finally:
+        pipeline_remove_observer(observer, phase, PipelineLevel.Info)
+        phase.value.setLevel(logging.NOTSET)
+    assert [e.message for e in events] == [f"event {i}" for i in range(10)]
+    assert main not in threads
+
+
+def test_async_observer_batch():
+    batches = []
+    gate = threading.Event()
+
+    def observer(events):
+        gate.wait()
+        batches.append(events)
+
+    delivery = AsyncObserver(observer, batch_size=8)
+    for i in range(17):
+        delivery(PipelineEvent(PipelinePhase.Build, make_record(logging.INFO)))
+    gate.set()
+    delivery.close()
+    assert sum(len(b) for b in batches) == 17
+    assert max(len(b) for b in batches) == 8
+
+
+def test_async_observer_drop():
+    gate = threading.Event()
+    delivered = []
+
+    def observer(event):
+        gate.wait()
+        delivered.append(event)
+
+    delivery = AsyncObserver(observer, maxsize=2, policy="drop")
+    start = time.perf_counter()
+    for i in range(10):
+        delivery(PipelineEvent(PipelinePhase.Build, make_record(logging.INFO)))
+    assert time.perf_counter() - start < 1.0
+    gate.set()
+    delivery.close()
+    assert delivery.dropped > 0
+    assert len(delivered) + delivery.dropped == 10
+
+
+def test_async_observer_policy():
+    with pytest.raises(ValueError):
+        AsyncObserver(Mock(), policy="spill")
+
+
+def test_async_observer_formats_early():
+    delivered = []
+    gate = threading.Event()
+
+    def observer(event):
+        gate.wait()
+        delivered.append(event)
+
+    delivery = AsyncObserver(observer)
+    value = [1]
+    delivery(
+        PipelineEvent(PipelinePhase.Build, make_record(logging.INFO, "%s", (value,)))
+    )
+    value.append(2)
+    gate.set()
+    delivery.close()
+    assert delivered[0].message == "[1]"
+
+
+def test_async_observer_block_after_close():
+    observer = Mock()
+    delivery = AsyncObserver(observer, maxsize=1, policy="block")
+    delivery.close()
+    start = time.perf_counter()
+    for i in range(3):
+        delivery(PipelineEvent(PipelinePhase.Build, make_record(logging.INFO)))
+    assert time.perf_counter() - start < 1.0
+    assert delivery.dropped == 3
+    assert observer.call_count == 0
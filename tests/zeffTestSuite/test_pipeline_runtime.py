@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test threaded pipeline runtime."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import threading
+import time
+import pytest
+
+import zeff
+from zeff.metrics import MetricsRegistry
+
+
+def double(upstream):
+    for item in upstream:
+        yield item * 2
+
+
+def slow(upstream):
+    for item in upstream:
+        time.sleep(0.001)
+        yield item
+
+
+def test_chain_stages():
+    stages = [zeff.Stage("double", double), zeff.Stage("more", double)]
+    assert list(zeff.chain_stages(range(5), stages)) == [0, 4, 8, 12, 16]
+
+
+def test_threaded_preserves_order():
+    registry = MetricsRegistry()
+    stages = [zeff.Stage("double", double), zeff.Stage("slow", slow)]
+    with zeff.ThreadedPipeline(range(100), stages, 4, registry) as pipeline:
+        assert list(pipeline) == [i * 2 for i in range(100)]
+    queues = registry.queue_snapshot()
+    assert list(queues) == ["double", "slow", "output"]
+    assert queues["double"]["samples"] == 100
+    assert all(q["max"] <= 4 for q in queues.values())
+    assert "queue" in registry.summary()
+    assert 'zeff_queue_depth{queue="slow",quantile="0.9"}' in registry.prometheus()
+
+
+def test_threaded_parallel_workers():
+    seen = set()
+
+    def record_thread(upstream):
+        for item in upstream:
+            seen.add(threading.current_thread().name)
+            time.sleep(0.001)
+            yield item
+
+    stages = [zeff.Stage("work", record_thread, workers=3)]
+    pipeline = zeff.ThreadedPipeline(range(60), stages, 2, MetricsRegistry())
+    assert sorted(pipeline) == list(range(60))
+    assert len(seen) == 3
+
+
+def test_threaded_error_propagates():
+    def fail(upstream):
+        for item in upstream:
+            if item == 5:
+                raise ValueError("bad item")
+            yield item
+
+    stages = [zeff.Stage("fail", fail), zeff.Stage("slow", slow)]
+    pipeline = zeff.ThreadedPipeline(range(100), stages, 2, MetricsRegistry())
+    with pytest.raises(ValueError, match="bad item"):
+        list(pipeline)
+    assert not any(t.name.startswith("zeff-") for t in threading.enumerate())
+
+
+def test_threaded_close_early():
+    stages = [zeff.Stage("slow", slow)]
+    pipeline = zeff.ThreadedPipeline(iter(range(10**9)), stages, 2, MetricsRegistry())
+    assert next(pipeline) == 0
+    pipeline.close()
+    assert list(pipeline) == []
+    assert not any(t.name.startswith("zeff-") for t in threading.enumerate())
+
+
+def test_stage_requires_worker():
+    with pytest.raises(ValueError):
+        zeff.Stage("none", double, workers=0)
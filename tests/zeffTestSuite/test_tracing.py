@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test record pipeline tracing."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import json
+import pytest
+
+import zeff
+from zeff.tracing import TRACER, Tracer
+from zeff.validator import RecordValidator
+from .test_pipeline import build_record
+
+
+@pytest.fixture
+def tracer():
+    TRACER.sample_rate = 1.0
+    yield TRACER
+    TRACER.sample_rate = 0.0
+    TRACER.reset()
+
+
+def test_sampling():
+    names = [f"record_{i}" for i in range(1000)]
+    assert not any(Tracer(0.0).sampled(n) for n in names)
+    assert all(Tracer(1.0).sampled(n) for n in names)
+    tracer = Tracer(0.25)
+    sampled = [n for n in names if tracer.sampled(n)]
+    assert 150 < len(sampled) < 350
+    assert sampled == [n for n in names if tracer.sampled(n)]
+
+
+def test_span_context():
+    tracer = Tracer(1.0)
+    with tracer.span("request"):
+        pass
+    assert tracer.events() == []
+    with tracer.record("a"):
+        with tracer.span("request", method="POST") as args:
+            args["status"] = 201
+    events = tracer.events()
+    spans = [e for e in events if e["ph"] == "X"]
+    assert len(spans) == 1
+    assert spans[0]["name"] == "request"
+    assert spans[0]["args"] == {"method": "POST", "status": 201, "record": "a"}
+    assert [e["ph"] for e in events if e["cat"] == "record"] == ["b", "e"]
+
+
+def test_pipeline_spans(tracer, tmp_path):
+    def builder(model, config):
+        return build_record(config)
+
+    records = zeff.record_builder_generator(False, ["a", "b"], builder)
+    records = zeff.validation_generator(records, RecordValidator(False))
+    assert len(list(records)) == 2
+
+    path = tmp_path / "trace.json"
+    tracer.write_chrome(path)
+    with open(path) as file:
+        trace = json.load(file)
+    spans = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    assert sorted((e["args"]["record"], e["name"]) for e in spans) == [
+        ("a", "build"),
+        ("a", "validate_batch"),
+        ("b", "build"),
+        ("b", "validate_batch"),
+    ]
+    assert all(e["dur"] >= 0 for e in spans)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test upload index."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import threading
+import pytest
+from zeff import UploadIndex
+
+
+def test_index_update(tmp_path):
+    with UploadIndex.for_dataset("dataset_1", dirpath=tmp_path) as index:
+        assert index.digest("record_1") is None
+        assert not index.is_current("record_1", "abc")
+        index.update("record_1", "abc", "id_1")
+        assert index.is_current("record_1", "abc")
+        assert not index.is_current("record_1", "def")
+        assert index.record_id("record_1") == "id_1"
+    assert (tmp_path / "dataset_1.sqlite3").exists()
+
+
+def test_index_persists(tmp_path):
+    path = tmp_path / "dataset.sqlite3"
+    with UploadIndex(path) as index:
+        index.update("record_1", "abc", "id_1")
+        index.update("record_1", "def", "id_2")
+    with UploadIndex(path) as index:
+        assert len(index) == 1
+        assert index.is_current("record_1", "def")
+        index.remove("record_1")
+        assert index.digest("record_1") is None
+
+
+def test_index_journals(tmp_path):
+    with UploadIndex.for_dataset("dataset", dirpath=tmp_path) as index:
+        index.update("record_1", "abc", "id_1")
+    with UploadIndex.for_dataset("dataset", tmp_path, shard=(1, 2)) as journal:
+        assert journal.is_current("record_1", "abc")
+        journal.update("record_1", "def", "id_2")
+        journal.update("record_2", "ghi", "id_3")
+        assert journal.is_current("record_1", "def")
+    journals = UploadIndex.journals("dataset", dirpath=tmp_path)
+    assert [p.name for p in journals] == ["dataset.shard-1-of-2.sqlite3"]
+    with UploadIndex.for_dataset("dataset", dirpath=tmp_path) as index:
+        index.merge(journals[0])
+        assert len(index) == 2
+        assert index.record_id("record_1") == "id_2"
+        assert index.is_current("record_2", "ghi")
+
+
+def test_index_files(tmp_path):
+    path = tmp_path / "content.bin"
+    path.write_bytes(b"content")
+    with UploadIndex(tmp_path / "index.sqlite3") as index:
+        assert index.file_id(path) is None
+        index.update_file(path, "f1")
+        assert index.file_id(path) == "f1"
+        path.write_bytes(b"changed content")
+        assert index.file_id(path) is None
+
+
+def test_index_journal_files(tmp_path):
+    path = tmp_path / "content.bin"
+    path.write_bytes(b"content")
+    with UploadIndex.for_dataset("dataset", dirpath=tmp_path) as index:
+        index.update_file(path, "f1")
+    with UploadIndex.for_dataset("dataset", tmp_path, shard=(0, 2)) as journal:
+        assert journal.file_id(path) == "f1"
+        journal.update_file(path, "f2")
+        assert journal.file_id(path) == "f2"
+
+
+def test_index_threads(tmp_path):
+    path = tmp_path / "content.bin"
+    path.write_bytes(b"content")
+    with UploadIndex(tmp_path / "index.sqlite3", commit_interval=7) as index:
+
+        def upload(worker):
+            for i in range(200):
+                index.update(f"record_{worker}_{i}", "abc", f"id_{i}")
+                index.update_file(path, f"f{worker}")
+                index.file_id(path)
+
+        threads = [threading.Thread(target=upload, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(index) == 800
@@ -22,15 +22,20 @@ __license__ = """
     limitations under the License.
 """
 import sqlite3
+import urllib.parse
 
 
-def MockGenerator(url):
+def MockGenerator(url, arraysize=None):
     """TBW:
     """
+    url, _, query = url.partition("?")
+    if arraysize is None:
+        arraysize = int(urllib.parse.parse_qs(query).get("arraysize", [256])[0])
     conn = sqlite3.connect(url)
     conn.row_factory = sqlite3.Row
 
     cursor = conn.cursor()
+    cursor.arraysize = arraysize
     cursor.execute("SELECT id FROM properties")
     rows = cursor.fetchmany()
     while rows:
@@ -24,12 +24,13 @@ __license__ = """
 import sys
 import os
 import io
+import json
 import types
 import pathlib
 from . import chdir
 import pytest
 import zeff.cli
-from zeff.cli.upload import upload
+from zeff.cli.upload import upload, upload_records
 from zeff.cli.train import train
 from zeff.cli.predict import predict
 
@@ -49,6 +50,74 @@ def test_upload_generate(chdir):
     # Setup mock server to recieve upload
 
 
+def test_upload_generate_prefetch(chdir):
+    args = [
+        "upload",
+        "--no-train",
+        "--dry-run=configuration",
+        "--prefetch=8",
+        "--records-config-generator=tests.zeffcliTestSuite.generator.MockGenerator",
+        f"--records-config-arg={pathlib.Path.cwd() / 'db.sqlite3'}",
+        "--record-builder=tests.zeffcliTestSuite.builder.MockBuilder",
+    ]
+    options = zeff.cli.parse_commandline(args)
+    assert upload_records(options) > 0
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "csv", "rst"])
+def test_upload_generate_format(chdir, capsys, fmt):
+    args = [
+        "upload",
+        "--no-train",
+        "--dry-run=validate",
+        f"--dry-run-format={fmt}",
+        "--records-config-generator=tests.zeffcliTestSuite.generator.MockGenerator",
+        f"--records-config-arg={pathlib.Path.cwd() / 'db.sqlite3'}",
+        "--record-builder=tests.zeffcliTestSuite.builder.MockBuilder",
+    ]
+    options = zeff.cli.parse_commandline(args)
+    count = upload_records(options)
+    out = capsys.readouterr().out
+    assert count > 0
+    if fmt == "jsonl":
+        lines = out.splitlines()
+        assert len(lines) == count
+        assert all("uniqueName" in json.loads(line)["name"] for line in lines)
+    elif fmt == "csv":
+        assert out.startswith("record,name,value,data_type,target\n")
+    else:
+        assert out.count("Structured Data\n===============") == count
+
+
+def test_predict_generate_format(chdir, capsys):
+    args = [
+        "predict",
+        "--dry-run=build",
+        "--dry-run-format=jsonl",
+        "--records-config-generator=tests.zeffcliTestSuite.generator.MockGenerator",
+        f"--records-config-arg={pathlib.Path.cwd() / 'db.sqlite3'}",
+        "--record-builder=tests.zeffcliTestSuite.builder.MockBuilder",
+    ]
+    options = zeff.cli.parse_commandline(args)
+    predict(options)
+    assert len(capsys.readouterr().out.splitlines()) > 0
+
+
+def test_upload_generate_lines(chdir, tmp_path):
+    path = tmp_path / "ids.txt"
+    path.write_text("1\n2\n\n3\n")
+    args = [
+        "upload",
+        "--no-train",
+        "--dry-run=configuration",
+        "--records-config-generator=zeff.recordgenerator.lines_generator",
+        f"--records-config-arg={path}",
+        "--record-builder=tests.zeffcliTestSuite.builder.MockBuilder",
+    ]
+    options = zeff.cli.parse_commandline(args)
+    assert upload_records(options) == 3
+
+
 @pytest.mark.skip(reason="Need mock Zeff Cloud to test")
 def test_train_generate():
     dirpath = os.path.dirname(__file__)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test import time of the package and command line."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import os
+import pathlib
+import subprocess
+import sys
+import pytest
+import zeff
+
+# Budgets in milliseconds, which may be raised on slow machines with
+# ``ZEFF_IMPORT_BUDGET_MS``. Before imports were deferred ``zeff``
+# took about 300ms and ``zeff.cli`` about 350ms.
+BUDGET_MS = {
+    "zeff": 150,
+    "zeff.cli": 250,
+}
+
+HEAVY_MODULES = ["pkg_resources", "requests", "yaml", "tqdm", "http.server"]
+
+
+def import_times(module):
+    """Return cumulative import time in µs of modules imported by ``module``."""
+    env = dict(os.environ)
+    srcpath = str(pathlib.Path(zeff.__file__).parents[1])
+    env["PYTHONPATH"] = os.pathsep.join([srcpath, env.get("PYTHONPATH", "")])
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    ret = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        ret[name.strip()] = int(cumulative)
+    return ret
+
+
+@pytest.mark.parametrize("module", list(BUDGET_MS))
+def test_import_time(module):
+    times = import_times(module)
+    heavy = [m for m in HEAVY_MODULES if m in times]
+    assert not heavy, f"import {module} imports {heavy}"
+    budget = int(os.environ.get("ZEFF_IMPORT_BUDGET_MS", BUDGET_MS[module]))
+    assert times[module] / 1000 < budget
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test queue based logging."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import io
+import logging
+import threading
+import pytest
+from zeff.cli.logqueue import SamplingFilter, queue_file_handlers
+
+
+def make_record(name, levelno, created):
+    record = logging.LogRecord(name, levelno, __file__, 0, "msg %s", ("x",), None)
+    record.created = created
+    return record
+
+
+def test_sampling_filter():
+    sample = SamplingFilter(rate=3, every=5)
+    passed = [sample.filter(make_record("a", logging.INFO, 10.0)) for _ in range(23)]
+    assert passed[:3] == [True, True, True]
+    assert sum(passed) == 3 + 4
+    assert sample.suppressed == 23 - 7
+    assert sample.filter(make_record("b", logging.INFO, 10.0))
+    assert sample.filter(make_record("a", logging.WARNING, 10.0))
+    assert sample.filter(make_record("a", logging.INFO, 11.0))
+
+
+class ThreadHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.records = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.records.append(record.getMessage())
+        self.threads.add(threading.current_thread())
+
+
+def test_queue_file_handlers():
+    root = logging.getLogger("zeffqueuetest")
+    child = logging.getLogger("zeffqueuetest.child")
+    child.propagate = False
+    console = logging.StreamHandler(io.StringIO())
+    master = ThreadHandler()
+    stage = ThreadHandler(logging.INFO)
+    root.addHandler(master)
+    child.addHandler(console)
+    child.addHandler(master)
+    child.addHandler(stage)
+    root.setLevel(logging.DEBUG)
+    child.setLevel(logging.DEBUG)
+    listener = queue_file_handlers(["zeffqueuetest", "zeffqueuetest.child"])
+    try:
+        assert console in child.handlers
+        assert master not in child.handlers
+        child.debug("debug %d", 1)
+        child.info("info %d", 2)
+        root.info("root %d", 3)
+    finally:
+        listener.stop()
+        for logger in [root, child]:
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+    assert sorted(master.records) == ["debug 1", "info 2", "root 3"]
+    assert stage.records == ["info 2"]
+    assert threading.current_thread() not in master.threads | stage.threads
+
+
+def test_queue_handler_sampling():
+    logger = logging.getLogger("zeffqueuetest.sampled")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    sample = SamplingFilter(rate=2, every=1000)
+    master = ThreadHandler()
+    stage = ThreadHandler()
+    for handler in [master, stage]:
+        handler.addFilter(sample)
+        logger.addHandler(handler)
+    listener = queue_file_handlers(["zeffqueuetest.sampled"])
+    try:
+        (routing,) = logger.handlers
+        assert routing.filters == [sample]
+        assert master.filters == stage.filters == []
+        for i in range(5):
+            logger.info("info %d", i)
+    finally:
+        listener.stop()
+        logger.removeHandler(routing)
+    assert master.records == stage.records == ["info 0", "info 1"]
+    assert sample.suppressed == 3
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test profiling of a pipeline run."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import pathlib
+import pstats
+import threading
+from . import chdir
+import pytest
+import zeff.cli
+from zeff.cli.upload import upload
+from zeff.cli.profiling import run_profiled, ThreadProfiler
+
+
+def profile_options(path, *args):
+    return zeff.cli.parse_commandline(
+        [
+            "upload",
+            "--no-train",
+            "--dry-run=validate",
+            "--records-config-generator=tests.zeffcliTestSuite.generator.MockGenerator",
+            f"--records-config-arg={pathlib.Path.cwd() / 'db.sqlite3'}",
+            "--record-builder=tests.zeffcliTestSuite.builder.MockBuilder",
+            f"--profile={path}",
+            *args,
+        ]
+    )
+
+
+def test_profile_pstats(chdir, tmp_path, capsys):
+    path = tmp_path / "upload.prof"
+    run_profiled(upload, profile_options(path))
+    stats = pstats.Stats(str(path))
+    assert any(func[2] == "upload" for func in stats.stats)
+    report = capsys.readouterr().err
+    assert "Profile:" in report
+    assert "\nbuild:" in report
+    assert "builder.py" in report
+
+
+def test_profile_collapsed(chdir, tmp_path):
+    path = tmp_path / "upload.folded"
+    run_profiled(upload, profile_options(path, "--profile-format=collapsed"))
+    lines = path.read_text().splitlines()
+    assert lines
+    for line in lines:
+        stack, weight = line.rsplit(" ", 1)
+        assert int(weight) >= 0
+    assert any("upload (upload.py" in line for line in lines)
+
+
+def test_profile_threads():
+    def worker_only():
+        return sum(range(1000))
+
+    def main():
+        threads = [threading.Thread(target=worker_only) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return "done"
+
+    profiler = ThreadProfiler()
+    assert profiler.runcall(main) == "done"
+    stats = profiler.stats()
+    calls = [v[1] for f, v in stats.stats.items() if f[2] == "worker_only"]
+    assert calls == [3]
+    assert any(func[2] == "main" for func in stats.stats)
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test upload, train, and predict workflow."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import errno
+import pathlib
+import time
+import pytest
+import zeff.cli
+from zeff.cli.run import run, prediction_records
+from zeff.cloud.dataset import Dataset
+from zeff.cloud.mockserver import MockZeffCloud, MockZeffCloudServer
+from zeff.cloud.training import TrainingStatus
+from zeff.record import Record, StructuredData, UnstructuredData
+from zeff.record import DataType, FileType, Target
+from zeff.zeffcloud import ZeffCloudResourceMap
+from zeff.zeffdatasettype import ZeffDatasetType
+
+
+def run_generator(arg):
+    yield from arg.split(",")
+
+
+class RunBuilder:
+    """Build records with a target price for training records."""
+
+    def __init__(self, arg):
+        self.path = pathlib.Path(arg)
+
+    def __call__(self, model, config):
+        record = Record(name=config)
+        StructuredData("rooms", 3, DataType.CONTINUOUS).record = record
+        if not model:
+            price = StructuredData("price", 100, DataType.CONTINUOUS, Target.YES)
+            price.record = record
+        UnstructuredData(f"file://{self.path}", FileType.IMAGE).record = record
+        return record
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "image.jpeg").write_bytes(b"\xff\xd8\xff")
+    (tmp_path / "zeff.conf").write_text(
+        "[records]\n"
+        f"records_config_generator = {__name__}.run_generator\n"
+        "records_config_arg = house_1,house_2,house_3\n"
+        f"record_builder = {__name__}.RunBuilder\n"
+        f"record_builder_arg = {tmp_path / 'image.jpeg'}\n"
+    )
+    return tmp_path
+
+
+@pytest.mark.parametrize("threaded", [[], ["--threaded", "--build-workers=2"]])
+def test_run(project, threaded):
+    with MockZeffCloudServer(cloud=MockZeffCloud(training_time=0.5)) as server:
+        resource_map = ZeffCloudResourceMap(
+            ZeffCloudResourceMap.default_info(),
+            root=server.url,
+            org_id="org",
+            user_id="user",
+        )
+        dataset = Dataset.create_dataset(
+            resource_map, ZeffDatasetType.generic, "Houses", ""
+        )
+        options = zeff.cli.parse_commandline(
+            [
+                "run",
+                "--upload-all",
+                f"--server-url={server.url}",
+                "--org-id=org",
+                "--user-id=user",
+                f"--records-datasetid={dataset.dataset_id}",
+                "--predict-config-arg=house_4,house_5",
+                "--timeout=10",
+                *threaded,
+            ]
+        )
+        run(options)
+
+        assert len(list(dataset.records())) == 3
+        assert dataset.training_status.status is TrainingStatus.complete
+        models = list(dataset.models())
+        assert len(models) == 1
+        assert len(list(models[0].records())) == 2
+
+
+class SlowBuilder(RunBuilder):
+    """Build prediction records slowly."""
+
+    def __call__(self, model, config):
+        if model:
+            time.sleep(0.2)
+        return super().__call__(model, config)
+
+
+def test_prediction_records(project):
+    options = zeff.cli.parse_commandline(
+        ["run", "--predict-config-arg=house_4,house_5"]
+    )
+    records = prediction_records(options)
+    assert not isinstance(records, list)
+    assert [r.name for r in records] == ["house_4", "house_5"]
+
+
+def test_run_timeout_stops_build(project):
+    with MockZeffCloudServer(cloud=MockZeffCloud(training_time=100.0)) as server:
+        resource_map = ZeffCloudResourceMap(
+            ZeffCloudResourceMap.default_info(),
+            root=server.url,
+            org_id="org",
+            user_id="user",
+        )
+        dataset = Dataset.create_dataset(
+            resource_map, ZeffDatasetType.generic, "Houses", ""
+        )
+        houses = ",".join(f"house_{i}" for i in range(100))
+        options = zeff.cli.parse_commandline(
+            [
+                "run",
+                "--upload-all",
+                f"--server-url={server.url}",
+                "--org-id=org",
+                "--user-id=user",
+                f"--records-datasetid={dataset.dataset_id}",
+                f"--record-builder={__name__}.SlowBuilder",
+                f"--predict-config-arg={houses}",
+                "--timeout=0.5",
+            ]
+        )
+        start = time.monotonic()
+        with pytest.raises(SystemExit) as err:
+            run(options)
+        assert err.value.code == errno.ETIMEDOUT
+        assert time.monotonic() - start < 5.0
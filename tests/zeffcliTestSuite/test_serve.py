@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test CLI daemon and forwarding client."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import pathlib
+import socket
+import threading
+import pytest
+from zeff.cli.serve import SessionCache, ZeffDaemon, forward
+from zeff.cloud.dataset import Dataset
+from zeff.cloud.mockserver import MockZeffCloud, MockZeffCloudServer
+from zeff.tracing import TRACER
+from zeff.record import Record, StructuredData, UnstructuredData, DataType, FileType
+from zeff.zeffcloud import ZeffCloudResourceMap
+from zeff.zeffdatasettype import ZeffDatasetType
+
+
+def serve_generator(arg):
+    yield from ["house_1", "house_2"]
+
+
+class ServeBuilder:
+    """Build records with the builder argument as the unstructured data."""
+
+    instances = 0
+
+    def __init__(self, arg):
+        ServeBuilder.instances += 1
+        self.path = pathlib.Path(arg)
+
+    def __call__(self, model, config):
+        record = Record(name=config)
+        StructuredData("rooms", 3, DataType.CONTINUOUS).record = record
+        UnstructuredData(f"file://{self.path}", FileType.IMAGE).record = record
+        return record
+
+
+class CountingCloud(MockZeffCloud):
+    """Count GET requests of each path."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.gets = {}
+
+    def handle(self, method, path, *args, **kwargs):
+        if method == "GET":
+            self.gets[path] = self.gets.get(path, 0) + 1
+        return super().handle(method, path, *args, **kwargs)
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "image.jpeg").write_bytes(b"\xff\xd8\xff")
+    (tmp_path / "zeff.conf").write_text(
+        "[records]\n"
+        f"records_config_generator = {__name__}.serve_generator\n"
+        "records_config_arg =\n"
+        f"record_builder = {__name__}.ServeBuilder\n"
+        f"record_builder_arg = {tmp_path / 'image.jpeg'}\n"
+    )
+    return tmp_path
+
+
+def test_forward_upload(project, capsys):
+    cloud = CountingCloud()
+    with MockZeffCloudServer(cloud=cloud) as server:
+        resource_map = ZeffCloudResourceMap(
+            ZeffCloudResourceMap.default_info(),
+            root=server.url,
+            org_id="org",
+            user_id="user",
+        )
+        dataset = Dataset.create_dataset(
+            resource_map, ZeffDatasetType.generic, "Houses", ""
+        )
+        argv = [
+            "upload",
+            "--no-train",
+            "--upload-all",
+            f"--server-url={server.url}",
+            "--org-id=org",
+            "--user-id=user",
+            f"--records-datasetid={dataset.dataset_id}",
+        ]
+        cache = SessionCache()
+        ServeBuilder.instances = 0
+        with ZeffDaemon(project / "zeff.sock", cache) as daemon:
+            daemon.start()
+            assert forward(project / "zeff.sock", argv) == 0
+            assert forward(project / "zeff.sock", argv) == 0
+        assert not (project / "zeff.sock").exists()
+
+        assert len(list(dataset.records())) == 4
+        assert ServeBuilder.instances == 1
+        assert len(cache.resource_maps) == 1
+        # Loaded once by the test and once by the daemon.
+        gets = [n for p, n in cloud.gets.items() if p.endswith(dataset.dataset_id)]
+        assert gets == [2]
+        assert "upload" in capsys.readouterr().err
+
+
+def test_forward_refused(project, capsys):
+    with ZeffDaemon(project / "zeff.sock") as daemon:
+        daemon.start()
+        assert forward(project / "zeff.sock", ["train", "status"]) == 1
+        assert "only serves" in capsys.readouterr().err
+    assert forward(project / "zeff.sock", ["upload"]) is None
+
+
+def test_execute_streams_and_restores_tracer(project, tmp_path):
+    sent = []
+    sample_rate = TRACER.sample_rate
+    argv = [
+        "upload",
+        "--no-train",
+        "--dry-run=validate",
+        f"--trace-file={tmp_path / 'trace.json'}",
+        "--trace-sample-rate=1.0",
+        "--dry-run-format=jsonl",
+    ]
+    with ZeffDaemon(project / "zeff.sock") as daemon:
+        assert daemon.execute(argv, str(project), sent.append) == 0
+    assert TRACER.sample_rate == sample_rate
+    assert all(len(s) == 1 and set(s) <= {"stdout", "stderr"} for s in sent)
+    assert "house_1" in "".join(s["stdout"] for s in sent if "stdout" in s)
+
+
+def test_execute_builder_per_worker(project):
+    cache = SessionCache()
+    ServeBuilder.instances = 0
+    argv = ["upload", "--no-train", "--dry-run=validate", "--threaded"]
+    with ZeffDaemon(project / "zeff.sock", cache) as daemon:
+        for _ in range(2):
+            status = daemon.execute(argv + ["--build-workers=3"], str(project), print)
+            assert status == 0
+    assert ServeBuilder.instances == 3
+    assert len(cache.builders) == 3
+
+
+def test_forward_no_response(tmp_path, capsys):
+    path = tmp_path / "zeff.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(path))
+        server.listen(1)
+
+        def accept():
+            conn, _ = server.accept()
+            with conn, conn.makefile("rb") as stream:
+                stream.readline()
+
+        thread = threading.Thread(target=accept)
+        thread.start()
+        assert forward(path, ["upload"]) == 1
+        thread.join()
+    assert "without a status" in capsys.readouterr().err
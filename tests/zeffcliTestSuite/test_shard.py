@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test sharded upload."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+import os
+import pathlib
+import pytest
+import zeff
+import zeff.cli
+from zeff.cli.upload import upload, worker_argv
+from zeff.cloud.dataset import Dataset
+from zeff.cloud.mockserver import MockZeffCloud, MockZeffCloudServer
+from zeff.metrics import METRICS
+from zeff.zeffcloud import ZeffCloudResourceMap
+from zeff.zeffdatasettype import ZeffDatasetType
+
+PROJECT = """
+import pathlib
+from zeff.record import Record, StructuredData, UnstructuredData
+from zeff.record import DataType, FileType, Target
+
+
+def generator(arg):
+    yield from (f"house_{i}" for i in range(int(arg)))
+
+
+class Builder:
+    def __init__(self, arg):
+        self.path = pathlib.Path(arg)
+
+    def __call__(self, model, config):
+        record = Record(name=config)
+        StructuredData("price", 100, DataType.CONTINUOUS, Target.YES).record = record
+        UnstructuredData(f"file://{self.path}", FileType.IMAGE).record = record
+        return record
+"""
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv(
+        "PYTHONPATH",
+        os.pathsep.join([str(pathlib.Path(zeff.__file__).parents[1]), str(tmp_path)]),
+    )
+    (tmp_path / "image.jpeg").write_bytes(b"\xff\xd8\xff")
+    (tmp_path / "shardproject.py").write_text(PROJECT)
+    (tmp_path / "zeff.conf").write_text(
+        "[records]\n"
+        "records_config_generator = shardproject.generator\n"
+        "records_config_arg = 30\n"
+        "record_builder = shardproject.Builder\n"
+        f"record_builder_arg = {tmp_path / 'image.jpeg'}\n"
+    )
+    return tmp_path
+
+
+def test_worker_argv():
+    argv = ["upload", "--shards", "4", "--metrics-file=m.prom", "--no-train"]
+    assert worker_argv(argv, 1, 4, "w.json") == [
+        "upload",
+        "--no-train",
+        "--shard=1/4",
+        "--no-train",
+        "--metrics-json=w.json",
+    ]
+
+
+def test_upload_shards(project):
+    with MockZeffCloudServer(cloud=MockZeffCloud()) as server:
+        resource_map = ZeffCloudResourceMap(
+            ZeffCloudResourceMap.default_info(),
+            root=server.url,
+            org_id="org",
+            user_id="user",
+        )
+        dataset = Dataset.create_dataset(
+            resource_map, ZeffDatasetType.generic, "Houses", ""
+        )
+        argv = [
+            "upload",
+            "--shards=3",
+            "--no-train",
+            f"--server-url={server.url}",
+            "--org-id=org",
+            "--user-id=user",
+            f"--records-datasetid={dataset.dataset_id}",
+        ]
+        upload(zeff.cli.parse_commandline(argv))
+        assert len(list(dataset.records())) == 30
+        assert METRICS.snapshot()["upload"]["count"] == 30
+        assert not zeff.UploadIndex.journals(dataset.dataset_id)
+        with zeff.UploadIndex.for_dataset(dataset.dataset_id) as index:
+            assert len(index) == 30
+
+        # Unchanged records are found in the merged index.
+        upload(zeff.cli.parse_commandline(argv))
+        assert len(list(dataset.records())) == 30
+
+
+@pytest.mark.parametrize("command", ["run", "predict"])
+def test_shard_only_upload(command):
+    with pytest.raises(SystemExit):
+        zeff.cli.parse_commandline([command, "--shard=0/2"])
+    with pytest.raises(SystemExit):
+        zeff.cli.parse_commandline([command, "--shards=2"])
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+#  ____     __  __  ___ _ _         _
+# |_  /___ / _|/ _|/ __| (_)___ _ _| |_
+#  / // -_)  _|  _| (__| | / -_) ' \  _|
+# /___\___|_| |_|  \___|_|_\___|_||_\__|
+#
+"""Zeff test upload of records with a source index."""
+__author__ = """Lance Finn Helsten <lanhel@zeff.ai>"""
+__copyright__ = """Copyright © 2019, Ziff, Inc. — All Rights Reserved"""
+__license__ = """
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+import errno
+import pathlib
+import urllib.parse
+import pytest
+import zeff.cli
+from zeff.cli.configuration import ConfigurationValidationException
+from zeff.cli.upload import upload, upload_records
+from zeff.cloud.dataset import Dataset
+from zeff.cloud.mockserver import MockZeffCloud, MockZeffCloudServer
+from zeff.cloud.training import TrainingStatus
+from zeff.record import Record, StructuredData, UnstructuredData
+from zeff.record import DataType, FileType, Target
+from zeff.recordgenerator import SourceIndex
+from zeff.validator import RecordValidator
+from zeff.zeffcloud import ZeffCloudResourceMap
+from zeff.zeffdatasettype import ZeffDatasetType
+
+
+class ImageBuilder:
+    """Build a record of each image file, invalid for ``bad`` images."""
+
+    def __init__(self, arg):
+        pass
+
+    def __call__(self, model, config):
+        name = pathlib.Path(urllib.parse.urlsplit(config).path).stem
+        price = "unknown" if name.startswith("bad") else 100
+        record = Record(name=name)
+        StructuredData("price", price, DataType.CONTINUOUS, Target.YES).record = record
+        UnstructuredData(config, FileType.IMAGE).record = record
+        return record
+
+
+class LargeDatasetValidator(RecordValidator):
+    """Reject every dataset of fewer than 10 records."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.accepted = 0
+
+    def validate_record(self, record):
+        self.accepted += 1
+
+    def validate_dataset(self):
+        if self.accepted < 10:
+            raise ValueError("Too few records")
+
+
+def unindexed_generator(arg):
+    """Generate the image files without taking a source index."""
+    yield from sorted(pathlib.Path(arg).iterdir())
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "images"
+    source.mkdir()
+    for name in ["a", "b"]:
+        (source / f"{name}.jpeg").write_bytes(b"\xff\xd8\xff")
+    (tmp_path / "zeff.conf").write_text(
+        "[records]\n"
+        "records_config_generator = zeff.recordgenerator.file_generator\n"
+        f"records_config_arg = {source}\n"
+        f"records_source_index = {tmp_path / 'source.sqlite3'}\n"
+        f"record_builder = {__name__}.ImageBuilder\n"
+        "record_builder_arg =\n"
+    )
+    return tmp_path
+
+
+def create_dataset(server):
+    resource_map = ZeffCloudResourceMap(
+        ZeffCloudResourceMap.default_info(),
+        root=server.url,
+        org_id="org",
+        user_id="user",
+    )
+    return Dataset.create_dataset(resource_map, ZeffDatasetType.generic, "Images", "")
+
+
+def test_upload_source_index(project):
+    with MockZeffCloudServer(cloud=MockZeffCloud()) as server:
+        dataset = create_dataset(server)
+
+        def upload():
+            options = zeff.cli.parse_commandline(
+                [
+                    "upload",
+                    "--no-train",
+                    f"--server-url={server.url}",
+                    "--org-id=org",
+                    "--user-id=user",
+                    f"--records-datasetid={dataset.dataset_id}",
+                ]
+            )
+            return upload_records(options)
+
+        assert upload() == 2
+        assert upload() == 0
+
+        # A failed record leaves the index as it was, and records uploaded
+        # by the failed run are skipped by the upload index.
+        (project / "images" / "c.jpeg").write_bytes(b"\xff\xd8\xff")
+        (project / "images" / "bad.jpeg").write_bytes(b"\xff\xd8\xff")
+        assert upload() == 2
+        with SourceIndex(project / "source.sqlite3") as index:
+            assert len(index) == 2
+
+        # Deleted entries are pruned.
+        (project / "images" / "bad.jpeg").unlink()
+        (project / "images" / "a.jpeg").unlink()
+        assert upload() == 1
+        with SourceIndex(project / "source.sqlite3") as index:
+            assert len(index) == 2
+        assert len(list(dataset.records())) == 3
+
+
+def test_upload_invalid_dataset(project):
+    with (project / "zeff.conf").open("a") as conf:
+        conf.write(f"record_validator = {__name__}.LargeDatasetValidator\n")
+    with MockZeffCloudServer(cloud=MockZeffCloud()) as server:
+        dataset = create_dataset(server)
+        options = zeff.cli.parse_commandline(
+            [
+                "upload",
+                f"--server-url={server.url}",
+                "--org-id=org",
+                "--user-id=user",
+                f"--records-datasetid={dataset.dataset_id}",
+            ]
+        )
+        with pytest.raises(SystemExit) as exc:
+            upload(options)
+        assert exc.value.code == errno.EINVAL
+        assert len(list(dataset.records())) == 2
+        assert dataset.fetch_training_status().status is TrainingStatus.unknown
+        with SourceIndex(project / "source.sqlite3") as index:
+            assert len(index) == 0
+
+
+def test_upload_source_index_unsupported(project):
+    conf = (project / "zeff.conf").read_text()
+    conf = conf.replace(
+        "zeff.recordgenerator.file_generator", f"{__name__}.unindexed_generator"
+    )
+    (project / "zeff.conf").write_text(conf)
+    options = zeff.cli.parse_commandline(
+        ["upload", "--no-train", "--records-datasetid=images"]
+    )
+    with pytest.raises(ConfigurationValidationException) as exc:
+        upload_records(options)
+    assert f"{__name__}.unindexed_generator" in str(exc.value)
+    assert not (project / "source.sqlite3").exists()